@@ -0,0 +1,96 @@
+"""
+Benchmark for the asyncio facade over the SQLite controllers.
+
+Many coroutines await database calls at once while a heartbeat task measures how late the
+event loop wakes it up. All database work goes through a small thread pool, so only that
+many SQLite connections are ever open at the same time.
+
+Run from the repository root:
+    python -m benchmarks.async_facade
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from src_ruba.utils import async_db_controllers, db_controllers
+
+
+def seed(students: int, courses: int) -> None:
+    conn = db_controllers.get_db_connection()
+    db_controllers.create_tables(conn)
+    conn.executemany('INSERT INTO students (name, age, email) VALUES (?, ?, ?)',
+                     [(f'Student {i}', 20, f'student{i}@school.edu') for i in range(students)])
+    conn.executemany('INSERT INTO courses (name, description) VALUES (?, ?)',
+                     [(f'Course {i}', '') for i in range(courses)])
+    conn.commit()
+    conn.close()
+
+
+async def heartbeat(interval: float, lags: list, done: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not done.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def caller(index: int, operations: int, students: int, latencies: list) -> None:
+    for op in range(operations):
+        start = time.perf_counter()
+        if op % 4 == 3:
+            await async_db_controllers.register_student(f'New {index}-{op}', 21, f'new{index}.{op}@school.edu')
+        else:
+            await async_db_controllers.get_student_id_by_name(f'Student {(index * 31 + op) % students}')
+        latencies.append(time.perf_counter() - start)
+
+
+async def main(callers: int, operations: int, workers: int, students: int) -> None:
+    async_db_controllers.configure(workers)
+    lags, latencies = [], []
+    done = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(0.005, lags, done))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller(i, operations, students, latencies) for i in range(callers)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await beat
+
+    slow = asyncio.create_task(async_db_controllers.get_students())
+    cancelled = [asyncio.create_task(async_db_controllers.get_students()) for _ in range(workers * 4)]
+    for task in cancelled:
+        task.cancel()
+    await asyncio.gather(slow, *cancelled, return_exceptions=True)
+    try:
+        await async_db_controllers.get_students(timeout=0.000001)
+        timed_out = False
+    except asyncio.TimeoutError:
+        timed_out = True
+    async_db_controllers.shutdown()
+
+    latencies.sort()
+    print(f'callers={callers} operations/caller={operations} pool workers={workers}')
+    print(f'elapsed:            {elapsed:.2f}s')
+    print(f'operations/s:       {callers * operations / elapsed:,.0f}')
+    print(f'median latency:     {statistics.median(latencies) * 1000:.2f}ms')
+    print(f'p99 latency:        {latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms')
+    print(f'heartbeat lag max:  {max(lags) * 1000:.2f}ms over {len(lags)} beats')
+    print(f'heartbeat lag mean: {statistics.mean(lags) * 1000:.2f}ms')
+    print(f'cancelled queued:   {sum(task.cancelled() for task in cancelled)}/{len(cancelled)}')
+    print(f'timeout honoured:   {timed_out}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--callers', type=int, default=500)
+    parser.add_argument('--operations', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--students', type=int, default=5000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        db_controllers.DATABASE = os.path.join(directory, 'school_management_system.db')
+        seed(args.students, 20)
+        asyncio.run(main(args.callers, args.operations, args.workers, args.students))
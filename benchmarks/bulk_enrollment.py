@@ -0,0 +1,67 @@
+"""
+Benchmark comparing per-item enrollment calls with enroll_many / unenroll_many.
+
+Both the in-memory controllers (in concurrency mode, where every call takes locks) and
+the SQLite controllers are measured, enrolling a cohort and then removing it again.
+
+Run from the repository root:
+    python -m benchmarks.bulk_enrollment
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from src_ruba.utils import controllers, db_controllers
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def memory_cohort(size: int) -> tuple:
+    controllers.restore({}, {}, {}, os.path.dirname(db_controllers.DATABASE))
+    course_id = controllers.add_course('Cohort', '')[0]["course"].course_id
+    ids = [controllers.register_student(f'Student {i}', 20, f's{i}@school.edu')[0]["student"].student_id for i in range(size)]
+    return course_id, ids
+
+
+def db_cohort(size: int) -> tuple:
+    db_controllers.close_connections()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_controllers.DATABASE + suffix):
+            os.remove(db_controllers.DATABASE + suffix)
+    conn = db_controllers.get_db_connection()
+    db_controllers.create_tables(conn)
+    conn.executemany('INSERT INTO students (name, age, email) VALUES (?, ?, ?)',
+                     [(f'Student {i}', 20, f's{i}@school.edu') for i in range(size)])
+    course_id = conn.execute("INSERT INTO courses (name, description) VALUES ('Cohort', '')").lastrowid
+    conn.commit()
+    conn.close()
+    return course_id, list(range(1, size + 1))
+
+
+def compare(label: str, module, cohort, size: int) -> None:
+    course_id, ids = cohort(size)
+    loop_in = timed(lambda: [module.add_student_to_course(i, course_id) for i in ids])
+    loop_out = timed(lambda: [module.remove_student_from_course(i, course_id) for i in ids])
+    course_id, ids = cohort(size)
+    bulk_in = timed(module.enroll_many, course_id, ids)
+    bulk_out = timed(module.unenroll_many, course_id, ids)
+    print(f'{label:<8} {size:>7}  enroll {loop_in * 1000:9.1f}ms -> {bulk_in * 1000:8.1f}ms ({loop_in / bulk_in:6.1f}x)'
+          f'  unenroll {loop_out * 1000:9.1f}ms -> {bulk_out * 1000:8.1f}ms ({loop_out / bulk_out:6.1f}x)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[300, 3000])
+    args = parser.parse_args()
+    controllers.set_concurrency_mode(True)
+    with tempfile.TemporaryDirectory() as directory:
+        db_controllers.DATABASE = os.path.join(directory, 'school_management_system.db')
+        print('backend    size  per-item loop -> batch call')
+        for size in args.sizes:
+            compare('memory', controllers, memory_cohort, size)
+            compare('sqlite', db_controllers, db_cohort, size)
@@ -0,0 +1,83 @@
+"""
+Benchmark for the bulk insert APIs.
+
+Loads a term's data (students, courses and enrollments) into an empty database twice: once
+with one register_student / add_course / add_student_to_course call per row, each committing
+on its own, and once with register_students / add_courses / enroll_pairs. A few percent of the
+student records reuse an email, to show that failing rows are reported without aborting the
+load.
+
+Run from the repository root:
+    python -m benchmarks.bulk_load
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src_ruba.utils import db_controllers
+
+
+def term_data(args, rng: random.Random) -> tuple:
+    students = [(f'Student {i}', rng.randint(16, 70), f's{i}@school.edu') for i in range(args.students)]
+    for index in rng.sample(range(1, args.students), args.students // 50):
+        students[index] = (students[index][0], students[index][1], students[index - 1][2])
+    courses = [(f'Course {i}', f'Description of course {i}', None) for i in range(args.courses)]
+    pairs = list({(rng.randint(1, args.students), rng.randint(1, args.courses)) for _ in range(args.enrollments)})
+    return students, courses, pairs
+
+
+def fresh_database(directory: str, name: str) -> None:
+    db_controllers.close_connections()
+    db_controllers.DATABASE = os.path.join(directory, name)
+    db_controllers.initialize_database()
+
+
+def per_row(students: list, courses: list, pairs: list) -> dict:
+    timings = {}
+    start = time.perf_counter()
+    failed = sum(db_controllers.register_student(*student)[1] != 200 for student in students)
+    timings["students"] = time.perf_counter() - start, failed
+    start = time.perf_counter()
+    for course in courses:
+        db_controllers.add_course(*course)
+    timings["courses"] = time.perf_counter() - start, 0
+    start = time.perf_counter()
+    failed = sum(db_controllers.add_student_to_course(*pair)[1] != 200 for pair in pairs)
+    timings["enrollments"] = time.perf_counter() - start, failed
+    return timings
+
+
+def bulk(students: list, courses: list, pairs: list) -> dict:
+    timings = {}
+    start = time.perf_counter()
+    response, _ = db_controllers.register_students(students)
+    timings["students"] = time.perf_counter() - start, len(response["failed"])
+    start = time.perf_counter()
+    db_controllers.add_courses(courses)
+    timings["courses"] = time.perf_counter() - start, 0
+    start = time.perf_counter()
+    response, _ = db_controllers.enroll_pairs(pairs)
+    timings["enrollments"] = time.perf_counter() - start, len(response["failed"])
+    return timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=20000)
+    parser.add_argument('--courses', type=int, default=500)
+    parser.add_argument('--enrollments', type=int, default=60000)
+    args = parser.parse_args()
+    students, courses, pairs = term_data(args, random.Random(17))
+
+    with tempfile.TemporaryDirectory() as directory:
+        fresh_database(directory, 'per_row.db')
+        slow = per_row(students, courses, pairs)
+        fresh_database(directory, 'bulk.db')
+        fast = bulk(students, courses, pairs)
+        print(f'{"rows":<12} {"count":>7} {"per-row calls":>14} {"bulk call":>10} {"speedup":>8}  failed rows')
+        for name, count in (("students", len(students)), ("courses", len(courses)), ("enrollments", len(pairs))):
+            print(f'{name:<12} {count:>7} {slow[name][0]:13.2f}s {fast[name][0]:9.2f}s {slow[name][0] / fast[name][0]:7.1f}x'
+                  f'  {slow[name][1]} / {fast[name][1]}')
+        db_controllers.close_connections()
@@ -0,0 +1,102 @@
+"""
+Benchmark for cascading deletes in the SQLite controllers.
+
+Builds a database at the schema version before ON DELETE CASCADE, deletes some students the
+old way so that their registrations are left behind, and upgrades it in place. It reports the
+orphan scan and the row counts before and after the upgrade, then removes the most popular
+course and one of its students, counting the statements each delete ran and checking that
+nothing referencing them is left.
+
+Run from the repository root:
+    python -m benchmarks.cascading_deletes
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from src_ruba.utils import db_controllers
+from src_ruba.utils.migrations import migrate
+
+CHILD_TABLES = ("registrations", "course_instructors", "waitlist", "course_meetings")
+
+
+def counts(conn) -> dict:
+    return {table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in CHILD_TABLES}
+
+
+def build_old_database(path: str, students: int, courses: int, per_student: int, deleted: int) -> None:
+    conn = sqlite3.connect(path)
+    migrate(conn, db_controllers.MIGRATIONS[:db_controllers.MIGRATIONS.index(db_controllers._add_cascading_deletes)])
+    rng = random.Random(7)
+    conn.executemany('INSERT INTO students VALUES (?, ?, ?, ?)', ((i, f'Student {i}', 20, f's{i}@school.edu') for i in range(1, students + 1)))
+    conn.executemany('INSERT INTO instructors VALUES (?, ?, ?, ?)', ((i, f'Instructor {i}', 40, f'i{i}@school.edu') for i in range(1, courses + 1)))
+    conn.executemany('INSERT INTO courses (id, name, description) VALUES (?, ?, ?)', ((i, f'Course {i}', '') for i in range(1, courses + 1)))
+    # Course 1 is the popular one: everybody takes it.
+    conn.executemany('INSERT INTO registrations VALUES (?, ?)', ((student_id, course_id) for student_id in range(1, students + 1)
+                                                                for course_id in {1, *rng.sample(range(2, courses + 1), per_student - 1)}))
+    conn.executemany('INSERT INTO course_instructors VALUES (?, ?)', ((i, i) for i in range(1, courses + 1)))
+    conn.executemany('INSERT INTO course_meetings VALUES (?, ?, ?)', ((i, 600 + i % 40 * 60, 650 + i % 40 * 60) for i in range(1, courses + 1)))
+    conn.executemany('DELETE FROM students WHERE id = ?', ((student_id,) for student_id in rng.sample(range(2, students + 1), deleted)))
+    conn.commit()
+    conn.close()
+
+
+def timed_delete(delete, *args) -> tuple:
+    statements = []
+    conn = db_controllers.get_db_connection()
+    conn.set_trace_callback(statements.append)
+    start = time.perf_counter()
+    response, _ = delete(*args)
+    elapsed = time.perf_counter() - start
+    conn.set_trace_callback(None)
+    conn.close()
+    # The trace repeats a statement for each trigger and cascade it runs, so count distinct ones.
+    return response["message"], elapsed, {statement for statement in statements if statement.lstrip().startswith('DELETE')}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--courses', type=int, default=500)
+    parser.add_argument('--per-student', type=int, default=5)
+    parser.add_argument('--deleted', type=int, default=1000, help='students deleted without their registrations before the upgrade')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'school_management_system.db')
+        build_old_database(path, args.students, args.courses, args.per_student, args.deleted)
+        db_controllers.DATABASE = path
+
+        conn = sqlite3.connect(path)
+        before = counts(conn)
+        conn.close()
+        print(f'before upgrade: {db_controllers.verify_foreign_keys()[0]}')
+        start = time.perf_counter()
+        db_controllers.initialize_database()
+        print(f'upgrade: {time.perf_counter() - start:.2f}s')
+        conn = db_controllers.get_db_connection()
+        after = counts(conn)
+        conn.close()
+        for table in CHILD_TABLES:
+            print(f'  {table:<19} {before[table]:>8} -> {after[table]:>8} rows')
+        print(f'after upgrade: {db_controllers.verify_foreign_keys()[0]}')
+
+        conn = db_controllers.get_db_connection()
+        enrolled = conn.execute('SELECT COUNT(*) FROM registrations WHERE course_id = 1').fetchone()[0]
+        conn.close()
+        message, elapsed, deletes = timed_delete(db_controllers.remove_course, 1)
+        print(f'remove_course with {enrolled} students: {message} in {elapsed * 1000:.1f}ms, {len(deletes)} DELETE statement(s)')
+        message, elapsed, deletes = timed_delete(db_controllers.remove_student, 1)
+        print(f'remove_student with {args.per_student - 1} remaining courses: {message} in {elapsed * 1000:.2f}ms, {len(deletes)} DELETE statement(s)')
+
+        conn = db_controllers.get_db_connection()
+        left = conn.execute('SELECT (SELECT COUNT(*) FROM registrations WHERE course_id = 1 OR student_id = 1) + '
+                            '(SELECT COUNT(*) FROM course_instructors WHERE course_id = 1) + '
+                            '(SELECT COUNT(*) FROM course_meetings WHERE course_id = 1)').fetchone()[0]
+        conn.close()
+        print(f'rows still referencing them: {left}')
+        print(f'final check: {db_controllers.verify_foreign_keys()[0]}  {db_controllers.verify_statistics()[0]}')
+        db_controllers.close_connections()
@@ -0,0 +1,94 @@
+"""
+Stress benchmark for the controllers' concurrency mode.
+
+Writer threads register students and enroll them into random courses while reader
+threads keep listing students and rosters. At the end the rosters are checked against
+every student's registered courses.
+
+Run from the repository root:
+    python -m benchmarks.concurrency_stress
+"""
+import argparse
+import random
+import tempfile
+import threading
+import time
+
+from src_ruba.utils import controllers
+
+
+def reset(course_count: int, directory: str) -> list:
+    controllers.restore({}, {}, {}, directory)
+    return [controllers.add_course(f'Course {i}', '')[0]["course"].course_id for i in range(course_count)]
+
+
+def check_rosters() -> list:
+    errors = []
+    for course in controllers.courses.values():
+        for student_id, student in course.students.items():
+            if course.course_id not in student.registered_courses:
+                errors.append(f'{student_id} is in course {course.course_id} but does not list it')
+    for student in controllers.students.values():
+        for course_id in student.registered_courses:
+            if student.student_id not in controllers.courses[course_id].students:
+                errors.append(f'{student.student_id} lists course {course_id} but is not on its roster')
+    return errors
+
+
+def run(writers: int, readers: int, registrations: int, course_count: int, directory: str) -> None:
+    controllers.set_concurrency_mode(True)
+    course_ids = reset(course_count, directory)
+    reads = [0] * readers
+    done = threading.Event()
+
+    def writer(seed: int):
+        rng = random.Random(seed)
+        for i in range(registrations):
+            response, _ = controllers.register_student(f'Student {seed}-{i}', 20, f's{seed}.{i}@school.edu')
+            student_id = response["student"].student_id
+            for course_id in rng.sample(course_ids, 3):
+                controllers.add_student_to_course(student_id, course_id)
+            if rng.random() < 0.2:
+                controllers.remove_student_from_course(student_id, rng.choice(course_ids))
+
+    def reader(slot: int):
+        rng = random.Random(slot)
+        while not done.is_set():
+            students, _ = controllers.get_students()
+            for student in list(students["students"].values())[:50]:
+                controllers.get_student_courses(student.registered_courses)
+            controllers.get_students_by_course(rng.choice(course_ids))
+            reads[slot] += 1
+
+    reader_threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    writer_threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    start = time.perf_counter()
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+
+    errors = check_rosters()
+    print(f'writers={writers} readers={readers} registrations={writers * registrations} courses={course_count}')
+    print(f'elapsed:         {elapsed:.2f}s')
+    print(f'registrations/s: {writers * registrations / elapsed:,.0f}')
+    print(f'reads/s:         {sum(reads) / elapsed:,.0f}')
+    print(f'roster check:    {"consistent" if not errors else f"{len(errors)} inconsistencies"}')
+    for error in errors[:10]:
+        print(f'  {error}')
+    controllers.set_concurrency_mode(False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--registrations', type=int, default=2000)
+    parser.add_argument('--courses', type=int, default=20)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        run(args.writers, args.readers, args.registrations, args.courses, directory)
@@ -0,0 +1,68 @@
+"""
+Benchmark for importing src_hawraa/database/database.py.
+
+Imports the module in fresh interpreters and reports the import time, apart from loading
+sqlite3 itself, and whether the import touched the disk. It then prices what used to run at
+import and now runs on first use: creating the schema of a new database, checking the schema
+version of an existing one, and a plain connect once the schema is known to be current.
+
+Run from the repository root:
+    python -m benchmarks.database_import
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# sqlite3 is loaded first and timed on its own: any version of the module pays for it.
+IMPORT = '''
+import time
+start = time.perf_counter()
+import sqlite3
+loaded = time.perf_counter()
+import src_hawraa.database.database
+print(loaded - start, time.perf_counter() - loaded)
+'''
+
+
+def import_time(path: str) -> tuple:
+    environment = dict(os.environ, SCHOOL_MANAGEMENT_DB=path)
+    output = subprocess.run([sys.executable, '-c', IMPORT], env=environment, capture_output=True, text=True, check=True)
+    return tuple(map(float, output.stdout.split()))
+
+
+def timed(function, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'nested', 'school_management.db')
+        samples = [import_time(path) for _ in range(args.runs)]
+        print(f'import over {args.runs} fresh interpreters: median {statistics.median(sample[1] for sample in samples) * 1000:.2f}ms '
+              f'after {statistics.median(sample[0] for sample in samples) * 1000:.2f}ms for sqlite3 itself, '
+              f'database file created: {os.path.exists(path)}')
+
+        os.environ['SCHOOL_MANAGEMENT_DB'] = path
+        from src_hawraa.database import database
+
+        first = timed(lambda: database.connect_db().close())
+        database.set_database_path(path)
+        existing = timed(lambda: database.connect_db().close())
+        steady = timed(lambda: database.connect_db().close(), args.repeat)
+        eager = timed(lambda: database.create_database(os.path.join(directory, f'eager-{time.perf_counter_ns()}.db')), 20)
+        print(f'first connect, new database (schema created): {first * 1000:.2f}ms')
+        print(f'first connect, existing database (user_version read): {existing * 1000:.3f}ms')
+        print(f'later connects: {steady * 1000:.3f}ms')
+        print(f'create_database() on a new file, formerly run at every import: {eager * 1000:.2f}ms')
@@ -0,0 +1,73 @@
+"""
+Benchmark for the pooled SQLite connections.
+
+Runs the same point reads (search by ID) and point writes (updating a student) through the
+SQLite controllers twice: once opening a fresh connection with SQLite's default settings for
+every call, as db_controllers did before the pool, and once borrowing the thread's pooled
+connection with the tuned pragmas. Reports operations per second for both.
+
+Run from the repository root:
+    python -m benchmarks.db_pool
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from src_ruba.utils import db_controllers
+from src_ruba.utils.db_pool import PooledConnection
+
+
+def unpooled_connection():
+    # A PooledConnection without a pool: close() really closes it.
+    conn = sqlite3.connect(db_controllers.DATABASE, factory=PooledConnection)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def populate(path: str, students: int) -> None:
+    db_controllers.DATABASE = path
+    conn = db_controllers.get_db_connection()
+    db_controllers.create_tables(conn)
+    conn.executemany('INSERT INTO students (name, age, email) VALUES (?, ?, ?)',
+                     [(f'Student {i}', 20, f's{i}@school.edu') for i in range(students)])
+    conn.commit()
+    conn.close()
+    db_controllers.close_connections()
+
+
+def ops_per_second(operation, count: int, rng: random.Random, students: int) -> float:
+    ids = [rng.randint(1, students) for _ in range(count)]
+    start = time.perf_counter()
+    for student_id in ids:
+        operation(student_id)
+    return count / (time.perf_counter() - start)
+
+
+def run(label: str, path: str, args) -> None:
+    db_controllers.DATABASE = path
+    reads = ops_per_second(lambda student_id: db_controllers.search_students("id", student_id), args.reads, random.Random(1), args.students)
+    writes = ops_per_second(lambda student_id: db_controllers.update_student(student_id, f'Student {student_id}', 21, f's{student_id - 1}@school.edu'),
+                            args.writes, random.Random(2), args.students)
+    print(f'{label:<9} point reads={reads:>9,.0f} ops/s  point writes={writes:>8,.0f} ops/s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--reads', type=int, default=20000)
+    parser.add_argument('--writes', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        before, after = os.path.join(directory, 'before.db'), os.path.join(directory, 'after.db')
+        populate(after, args.students)
+        pooled = db_controllers.get_db_connection
+        db_controllers.get_db_connection = unpooled_connection
+        populate(before, args.students)
+        run('unpooled', before, args)
+        db_controllers.get_db_connection = pooled
+        run('pooled', after, args)
+        db_controllers.close_connections()
@@ -0,0 +1,61 @@
+"""
+Benchmark for duplicate-person detection.
+
+Generates people with a share of planted duplicates (typos in the name, a changed email
+tag, swapped name order, an age off by one, some registered again as instructors) and
+reports the run time and how many planted duplicates were found, for growing sizes.
+
+Run from the repository root:
+    python -m benchmarks.dedup
+"""
+import argparse
+import random
+import string
+import time
+
+from src_ruba.utils.dedup import find_duplicates
+
+FIRST = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "William", "Elizabeth",
+         "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen"]
+
+
+def random_surname(rng: random.Random) -> str:
+    return rng.choice(string.ascii_uppercase) + ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 8)))
+
+
+def typo(word: str, rng: random.Random) -> str:
+    position = rng.randrange(1, len(word))
+    return word[:position] + rng.choice(string.ascii_lowercase) + word[position + 1:]
+
+
+def people(size: int, duplicate_share: float, rng: random.Random) -> tuple:
+    records, planted = [], set()
+    while len(records) < size:
+        first, last = rng.choice(FIRST), random_surname(rng)
+        age = rng.randint(17, 70)
+        record = ("student", len(records) + 1, f'{first} {last}', age, f'{first}.{last}{rng.randint(1, 99)}@school.edu'.lower())
+        records.append(record)
+        if rng.random() < duplicate_share:
+            name = rng.choice([f'{first} {typo(last, rng)}', f'{last} {first}', f'{first[0]}. {last}'])
+            email = rng.choice([record[4].replace('@', '+2@'), f'{first[0]}{last}@other.org'.lower(), record[4]])
+            kind = rng.choice(["student", "instructor"])
+            records.append((kind, len(records) + 1, name, age + rng.choice((-1, 0, 1)), email))
+            planted.add((record[1], len(records)))
+    return records, planted
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 300000, 1000000])
+    parser.add_argument('--duplicates', type=float, default=0.05)
+    parser.add_argument('--threshold', type=float, default=0.65)
+    args = parser.parse_args()
+    for size in args.sizes:
+        records, planted = people(size, args.duplicates, random.Random(size))
+        start = time.perf_counter()
+        candidates = find_duplicates(records, args.threshold)
+        elapsed = time.perf_counter() - start
+        found = {(candidate["first"]["id"], candidate["second"]["id"]) for candidate in candidates}
+        recall = len(planted & found) / len(planted)
+        print(f'records={len(records):>8}  elapsed={elapsed:6.2f}s  per record={elapsed / len(records) * 1e6:5.1f}us'
+              f'  candidates={len(candidates):>7}  planted found={recall:.1%}')
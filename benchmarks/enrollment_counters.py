@@ -0,0 +1,116 @@
+"""
+Benchmark for the trigger-maintained enrollment counters in the SQLite backend.
+
+On a school with a million registrations it compares counting a course's students, a
+student's courses and an instructor's courses with COUNT(*) against reading the counter
+columns, and the ten most popular courses from a GROUP BY over registrations against the
+popularity index. It also measures what the triggers add to inserting registrations, by
+loading the same rows into a copy of the database without them, and how long the consistency
+check over all counters takes.
+
+Run from the repository root:
+    python -m benchmarks.enrollment_counters
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from src_ruba.utils import db_controllers
+
+
+def timed(function, *args, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(*args)
+    return (time.perf_counter() - start) / repeat
+
+
+def count_query(query: str, key: int):
+    conn = db_controllers.get_db_connection()
+    conn.execute(query, (key,)).fetchone()
+    conn.close()
+
+
+def top_courses_by_join(k: int):
+    conn = db_controllers.get_db_connection()
+    conn.execute('SELECT course_id, COUNT(*) AS students FROM registrations GROUP BY course_id ORDER BY students DESC LIMIT ?', (k,)).fetchall()
+    conn.close()
+
+
+def insert_registrations(path: str, pairs: list) -> float:
+    conn = sqlite3.connect(path)
+    start = time.perf_counter()
+    conn.executemany('INSERT INTO registrations (student_id, course_id) VALUES (?, ?)', pairs)
+    conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=200000)
+    parser.add_argument('--courses', type=int, default=2000)
+    parser.add_argument('--per-student', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as directory:
+        db_controllers.DATABASE = os.path.join(directory, 'school_management_system.db')
+        db_controllers.initialize_database()
+        db_controllers.register_students((f'Student {i}', 20, f's{i}@school.edu') for i in range(1, args.students + 1))
+        db_controllers.register_instructors((f'Instructor {i}', 40, f'i{i}@school.edu') for i in range(1, args.courses // 4 + 1))
+        db_controllers.add_courses((f'Course {i}', '') for i in range(1, args.courses + 1))
+        # Popularity follows a power law, so a few courses hold most of the students.
+        weights = [1 / rank for rank in range(1, args.courses + 1)]
+        pairs = [(student_id, course_id) for student_id in range(1, args.students + 1)
+                 for course_id in set(rng.choices(range(1, args.courses + 1), weights, k=args.per_student))]
+        start = time.perf_counter()
+        response, _ = db_controllers.enroll_pairs(pairs)
+        print(f'enrolled {response["inserted"]} registrations in {time.perf_counter() - start:.2f}s')
+        for course_id in range(1, args.courses + 1, 4):
+            db_controllers.assign_many(course_id, [course_id // 4 + 1])
+
+        print(f'{"lookup":<34} {"COUNT(*)":>10} {"counter":>10}')
+        lookups = (
+            ("students in the largest course", 'SELECT COUNT(*) FROM registrations WHERE course_id = ?', 1,
+             db_controllers.get_course_enrollment),
+            ("courses of a student", 'SELECT COUNT(*) FROM registrations WHERE student_id = ?', args.students // 2,
+             db_controllers.get_student_course_count),
+            ("courses of an instructor", 'SELECT COUNT(*) FROM course_instructors WHERE instructor_id = ?', 1,
+             db_controllers.get_instructor_course_count),
+        )
+        for label, query, key, read_counter in lookups:
+            counted = timed(count_query, query, key, repeat=args.repeat)
+            read = timed(read_counter, key, repeat=args.repeat)
+            print(f'{label:<34} {counted * 1000:>8.3f}ms {read * 1000:>8.3f}ms')
+        by_join = timed(top_courses_by_join, 10, repeat=5)
+        by_index = timed(db_controllers.most_popular_courses, 10, repeat=args.repeat)
+        print(f'{"ten most popular courses":<34} {by_join * 1000:>8.3f}ms {by_index * 1000:>8.3f}ms')
+
+        start = time.perf_counter()
+        check = db_controllers.verify_enrollment_counters()[0]["message"]
+        print(f'consistency check: {check} in {time.perf_counter() - start:.2f}s')
+
+        # The trigger cost: the same new registrations into this database and into a copy of
+        # it with the counter triggers dropped.
+        new_course = db_controllers.add_course('New course', '')[0]["course_id"]
+        db_controllers.close_connections()
+        copy = os.path.join(directory, 'without_triggers.db')
+        source = sqlite3.connect(db_controllers.DATABASE)
+        target = sqlite3.connect(copy)
+        source.backup(target)
+        source.close()
+        for trigger in ('insert', 'delete', 'update'):
+            target.execute(f'DROP TRIGGER registrations_count_{trigger}')
+        target.close()
+        extra = [(student_id, new_course) for student_id in range(1, min(args.students, 100000) + 1)]
+        with_triggers = insert_registrations(db_controllers.DATABASE, extra)
+        without_triggers = insert_registrations(copy, extra)
+        print(f'inserting {len(extra)} registrations: {without_triggers:.2f}s without triggers, {with_triggers:.2f}s with')
+        print(db_controllers.verify_enrollment_counters()[0]["message"])
+        db_controllers.close_connections()
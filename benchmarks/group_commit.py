@@ -0,0 +1,81 @@
+"""
+Benchmark for write serialization in the SQLite controllers.
+
+A number of threads each update their own students as fast as they can for a fixed time, once
+with every thread committing through its own connection and once with write serialization on,
+where a single writer thread group-commits the queued writes. It reports writes per second,
+the average number of writes per commit and the writes that failed (for example with
+"database is locked"), with synchronous=NORMAL and with synchronous=FULL.
+
+Run from the repository root:
+    python -m benchmarks.group_commit
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from src_ruba.utils import db_controllers
+from src_ruba.utils.db_pool import PRAGMAS, ConnectionPool
+
+STUDENTS_PER_THREAD = 50
+
+
+def writer(first_id: int, stop: threading.Event, counts: list) -> None:
+    done = failed = 0
+    while not stop.is_set():
+        student_id = first_id + done % STUDENTS_PER_THREAD
+        try:
+            _, status = db_controllers.update_student(student_id, f'Student {student_id}', 20 + done % 5, f's{student_id}@school.edu')
+            done += status == 200
+            failed += status != 200
+        except sqlite3.Error:
+            failed += 1
+    counts.append((done, failed))
+
+
+def run(threads: int, seconds: float) -> tuple:
+    stop, counts = threading.Event(), []
+    workers = [threading.Thread(target=writer, args=(1 + i * STUDENTS_PER_THREAD, stop, counts)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return sum(done for done, _ in counts) / elapsed, sum(failed for _, failed in counts)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-delay', type=float, default=0.0)
+    parser.add_argument('--directory', default=None, help='where to put the database, to measure fsyncs on a particular disk')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        path = os.path.join(directory, 'school_management_system.db')
+        db_controllers.DATABASE = path
+        db_controllers.initialize_database()
+        db_controllers.register_students((f'Student {i}', 20, f's{i}@school.edu') for i in range(1, max(args.threads) * STUDENTS_PER_THREAD + 1))
+
+        print(f'{"synchronous":>11} {"threads":>7} {"direct/s":>10} {"failed":>6} {"queued/s":>10} {"failed":>6} {"per commit":>10}')
+        for synchronous in ("NORMAL", "FULL"):
+            pragmas = tuple(pragma.replace("NORMAL", synchronous) if "synchronous" in pragma else pragma for pragma in PRAGMAS)
+            for threads in args.threads:
+                db_controllers.close_connections()
+                db_controllers._pool = ConnectionPool(path, pragmas)
+                direct, direct_failed = run(threads, args.seconds)
+                db_controllers.set_write_serialization(True, args.max_batch, args.max_delay)
+                writer_state = db_controllers._writer
+                queued, queued_failed = run(threads, args.seconds)
+                db_controllers.set_write_serialization(False)
+                per_commit = writer_state.writes / max(1, writer_state.batches)
+                print(f'{synchronous:>11} {threads:>7} {direct:>10.0f} {direct_failed:>6} {queued:>10.0f} {queued_failed:>6} {per_commit:>10.1f}')
+        db_controllers.close_connections()
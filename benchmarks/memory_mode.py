@@ -0,0 +1,83 @@
+"""
+Benchmark for memory mode in the SQLite controllers.
+
+Runs the same interactive-session mix (look a student up, update them, move them between two
+courses) against the database file and against the in-memory working copy, and reports the
+median and 99th percentile latency of each call. It then times a flush of the working copy,
+which bounds how often one can run, and checks that the file holds every write once memory
+mode is turned off.
+
+Run from the repository root:
+    python -m benchmarks.memory_mode
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from src_ruba.utils import db_controllers
+
+CALLS = ("search_students", "update_student", "remove_student_from_course", "add_student_to_course")
+
+
+def session(operations: int, offset: int) -> dict:
+    latencies = {call: [] for call in CALLS}
+    for step in range(operations):
+        student_id = step % 5000 + 1
+        source, target = (1, 2) if (student_id + offset) % 2 else (2, 1)
+        for call, args in (
+            ("search_students", ("id", student_id)),
+            ("update_student", (student_id, f'Student {student_id}', 20 + offset % 5, f's{student_id}@school.edu')),
+            ("remove_student_from_course", (student_id, source)),
+            ("add_student_to_course", (student_id, target)),
+        ):
+            start = time.perf_counter()
+            getattr(db_controllers, call)(*args)
+            latencies[call].append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label: str, latencies: dict) -> None:
+    for call, samples in latencies.items():
+        samples.sort()
+        p99 = samples[int(len(samples) * 0.99)]
+        print(f'{label:<7} {call:<28} p50={statistics.median(samples) * 1000:7.3f}ms  p99={p99 * 1000:7.3f}ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=50000)
+    parser.add_argument('--operations', type=int, default=2000)
+    parser.add_argument('--max-data-loss', type=float, default=5.0)
+    parser.add_argument('--directory', default=None, help='where to put the database, to measure fsyncs on a particular disk')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        db_controllers.DATABASE = os.path.join(directory, 'school_management_system.db')
+        db_controllers.initialize_database()
+        db_controllers.register_students((f'Student {i}', 20, f's{i}@school.edu') for i in range(1, args.students + 1))
+        db_controllers.add_courses([('Course 1', ''), ('Course 2', '')])
+        db_controllers.enroll_pairs((i, 1 if i % 2 else 2) for i in range(1, min(args.students, 5000) + 1))
+
+        report('disk', session(args.operations, 0))
+
+        start = time.perf_counter()
+        db_controllers.set_memory_mode(True, args.max_data_loss)
+        print(f'loading the working copy: {(time.perf_counter() - start) * 1000:.1f}ms '
+              f'for {os.path.getsize(db_controllers.DATABASE) / 2**20:.1f}MB')
+        report('memory', session(args.operations, 1))
+
+        db_controllers.update_student(1, 'Flushed', 30, 'flushed@school.edu')
+        start = time.perf_counter()
+        db_controllers.flush_working_copy()
+        print(f'flushing the working copy: {(time.perf_counter() - start) * 1000:.1f}ms')
+
+        db_controllers.update_student(2, 'Last write', 30, 'last@school.edu')
+        db_controllers.set_memory_mode(False)
+        conn = sqlite3.connect(db_controllers.DATABASE)
+        names = [row[0] for row in conn.execute('SELECT name FROM students WHERE id IN (1, 2) ORDER BY id')]
+        conn.close()
+        print(f'file after memory mode: {names}  {db_controllers.verify_enrollment_counters()[0]["message"]}')
+        db_controllers.close_connections()
@@ -0,0 +1,81 @@
+"""
+Benchmark for the schema migrations and the indexes they add.
+
+Builds a database with the original, unversioned schema (no secondary indexes), times the hot
+lookups on it, upgrades it in place by applying the migrations, checks that every hot query's
+plan now searches an index, and times the lookups again.
+
+Run from the repository root:
+    python -m benchmarks.migrations
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src_ruba.utils import db_controllers
+from src_ruba.utils.migrations import schema_version
+
+
+def legacy_database(args, rng: random.Random) -> None:
+    conn = db_controllers.get_db_connection()
+    db_controllers._create_base_tables(conn.cursor())
+    conn.executemany('INSERT INTO students (name, age, email) VALUES (?, ?, ?)',
+                     [(f'Student {i}', rng.randint(16, 70), f's{i}@school.edu') for i in range(args.students)])
+    conn.executemany('INSERT INTO instructors (name, age, email) VALUES (?, ?, ?)',
+                     [(f'Instructor {i}', rng.randint(25, 70), f'i{i}@school.edu') for i in range(args.courses)])
+    conn.executemany('INSERT INTO courses (name, description) VALUES (?, ?)', [(f'Course {i}', '') for i in range(args.courses)])
+    conn.executemany('INSERT OR IGNORE INTO registrations (student_id, course_id) VALUES (?, ?)',
+                     [(rng.randint(1, args.students), rng.randint(1, args.courses)) for _ in range(args.enrollments)])
+    conn.executemany('INSERT INTO course_instructors (instructor_id, course_id) VALUES (?, ?)', [(i, i) for i in range(1, args.courses + 1)])
+    conn.commit()
+    conn.close()
+
+
+def timed_lookups(args, rng: random.Random) -> dict:
+    lookups = {
+        "get_students_by_course": lambda: db_controllers.get_students_by_course(rng.randint(1, args.courses)),
+        "get_instructors_by_course": lambda: db_controllers.get_instructors_by_course(rng.randint(1, args.courses)),
+        "get_student_id_by_name": lambda: db_controllers.get_student_id_by_name(f'Student {rng.randrange(args.students)}'),
+        "get_course_id_by_name": lambda: db_controllers.get_course_id_by_name(f'Course {rng.randrange(args.courses)}'),
+    }
+    timings = {}
+    for name, lookup in lookups.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            lookup()
+        timings[name] = (time.perf_counter() - start) / args.repeat
+    return timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=200000)
+    parser.add_argument('--courses', type=int, default=2000)
+    parser.add_argument('--enrollments', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(11)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_controllers.DATABASE = os.path.join(directory, 'school_management_system.db')
+        legacy_database(args, rng)
+        before = timed_lookups(args, rng)
+
+        conn = db_controllers.get_db_connection()
+        version = schema_version(conn)
+        start = time.perf_counter()
+        applied = db_controllers.create_tables(conn)
+        elapsed = time.perf_counter() - start
+        print(f'upgraded schema version {version} -> {schema_version(conn)} in place ({applied} migrations) in {elapsed:.2f}s')
+        conn.close()
+        response, status = db_controllers.verify_query_plans()
+        print(f'query plans: {response["message"]}')
+        for name, plan in response.get("queries", {}).items():
+            print(f'  {name}: {plan}')
+
+        after = timed_lookups(args, rng)
+        for name in before:
+            print(f'{name:<26} {before[name] * 1000:9.3f}ms -> {after[name] * 1000:7.3f}ms')
+        db_controllers.close_connections()
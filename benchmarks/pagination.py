@@ -0,0 +1,58 @@
+"""
+Benchmark for the cursor-paginated listing APIs.
+
+Walks every page of the student list for each sort key on both backends and reports the
+latency of the first page, page 1000 and the last page.
+
+Run from the repository root:
+    python -m benchmarks.pagination
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src_ruba.components.student import Student
+from src_ruba.utils import controllers, db_controllers
+
+
+def walk(module, sort_by: str, limit: int) -> list:
+    timings, cursor = [], None
+    while True:
+        start = time.perf_counter()
+        page, _ = module.list_students(sort_by, limit, cursor)
+        timings.append(time.perf_counter() - start)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return timings
+
+
+def report(label: str, module, limit: int) -> None:
+    for sort_by in ("name", "id", "age"):
+        timings = walk(module, sort_by, limit)
+        middle = timings[min(999, len(timings) - 1)]
+        print(f'{label:<7} {sort_by:<5} pages={len(timings):>6}  first={timings[0] * 1000:6.3f}ms'
+              f'  page1000={middle * 1000:6.3f}ms  last={timings[-1] * 1000:6.3f}ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=200000)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+    rng = random.Random(7)
+    people = [(f'Student {rng.randrange(args.students)}', rng.randint(16, 70), f's{i}@school.edu') for i in range(args.students)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        students = {i + 1: Student(name, age, email, i + 1) for i, (name, age, email) in enumerate(people)}
+        controllers.restore(students, {}, {}, directory)
+        report('memory', controllers, args.limit)
+
+        db_controllers.DATABASE = os.path.join(directory, 'school_management_system.db')
+        conn = db_controllers.get_db_connection()
+        db_controllers.create_tables(conn)
+        conn.executemany('INSERT INTO students (name, age, email) VALUES (?, ?, ?)', people)
+        conn.commit()
+        conn.close()
+        report('sqlite', db_controllers, args.limit)
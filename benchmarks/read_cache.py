@@ -0,0 +1,100 @@
+"""
+Benchmark for the read cache of the SQLite controllers.
+
+Simulates UI refreshes: each refresh reloads the students, instructors and courses and repeats
+a search, and every --write-every refreshes one student is updated. It reports refreshes per
+second with the cache off and on, and the hit rate. A second phase runs writer threads that
+keep updating students against readers going through the cache, and counts the reads that
+returned something older than what had already been committed when they started.
+
+Run from the repository root:
+    python -m benchmarks.read_cache
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from src_ruba.utils import db_controllers
+
+
+def refresh() -> None:
+    db_controllers.get_students()
+    db_controllers.get_instructors()
+    db_controllers.get_courses()
+    db_controllers.search_students("name", "Student 1")
+
+
+def refreshes_per_second(seconds: float, write_every: int) -> float:
+    done, deadline = 0, time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        refresh()
+        done += 1
+        if done % write_every == 0:
+            db_controllers.update_student(done % 100 + 1, f'Student {done % 100 + 1}', 20 + done % 7, f's{done % 100 + 1}@school.edu')
+    return done / (time.perf_counter() - start)
+
+
+def stale_reads(seconds: float, writers: int) -> tuple:
+    """
+    Readers read a student's age through the cache; writers keep bumping it. An age read
+    through the cache must never be older than the last age committed before the read began.
+    """
+    committed, stop, stale, checked = {}, threading.Event(), [0], [0]
+    lock = threading.Lock()
+
+    def write(student_id: int) -> None:
+        age = 20
+        while not stop.is_set():
+            age += 1
+            db_controllers.update_student(student_id, f'Student {student_id}', age, f's{student_id}@school.edu')
+            with lock:
+                committed[student_id] = age
+
+    def read() -> None:
+        while not stop.is_set():
+            for student_id in range(1, writers + 1):
+                with lock:
+                    floor = committed.get(student_id, 0)
+                age = db_controllers.search_students("id", student_id)[0]["students"][student_id].age
+                checked[0] += 1
+                if age < floor:
+                    stale[0] += 1
+
+    threads = [threading.Thread(target=write, args=(student_id,)) for student_id in range(1, writers + 1)]
+    threads += [threading.Thread(target=read) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return checked[0], stale[0]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--write-every', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_controllers.DATABASE = os.path.join(directory, 'school_management_system.db')
+        db_controllers.initialize_database()
+        db_controllers.register_students((f'Student {i}', 20, f's{i}@school.edu') for i in range(1, args.students + 1))
+        db_controllers.register_instructors((f'Instructor {i}', 40, f'i{i}@school.edu') for i in range(1, args.students // 20 + 1))
+        db_controllers.add_courses((f'Course {i}', '') for i in range(1, args.students // 10 + 1))
+
+        uncached = refreshes_per_second(args.seconds, args.write_every)
+        db_controllers.set_read_cache(True)
+        cached = refreshes_per_second(args.seconds, args.write_every)
+        cache = db_controllers._read_cache
+        print(f'refreshes/s with a write every {args.write_every}: {uncached:,.0f} uncached, {cached:,.0f} cached '
+              f'({cached / uncached:.1f}x), hit rate {cache.hits / (cache.hits + cache.misses):.0%}')
+
+        checked, stale = stale_reads(args.seconds, 4)
+        print(f'concurrent reads checked: {checked}, stale: {stale}')
+        db_controllers.close_connections()
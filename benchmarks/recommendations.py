@@ -0,0 +1,83 @@
+"""
+Benchmark for the co-enrollment course recommender.
+
+Generates a million enrollments with a skewed course popularity, builds the co-enrollment
+counts with the sparse matrix product (when SciPy is installed) and with the pure Python
+pair count, then times incremental enroll/unenroll updates and per-student top-k queries,
+and checks that the incrementally updated counts match a rebuild.
+
+Run from the repository root:
+    python -m benchmarks.recommendations
+"""
+import argparse
+import random
+import time
+
+from src_ruba.utils import recommendations
+from src_ruba.utils.events import ChangeEvent, ENROLLED, UNENROLLED
+from src_ruba.utils.recommendations import CoEnrollmentRecommender
+
+
+def enrollments(students: int, courses: int, total: int, rng: random.Random) -> list:
+    weights = [1 / (rank + 1) for rank in range(courses)]
+    pairs = set()
+    while len(pairs) < total:
+        student_id = rng.randint(1, students)
+        for course_id in rng.choices(range(1, courses + 1), weights, k=4):
+            pairs.add((student_id, course_id))
+    return list(pairs)[:total]
+
+
+def timed_build(pairs: list, use_sparse: bool) -> tuple:
+    sparse = recommendations.sparse
+    if not use_sparse:
+        recommendations.sparse = None
+    recommender = CoEnrollmentRecommender()
+    start = time.perf_counter()
+    recommender.build(pairs)
+    elapsed = time.perf_counter() - start
+    recommendations.sparse = sparse
+    return recommender, elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=250000)
+    parser.add_argument('--courses', type=int, default=2000)
+    parser.add_argument('--enrollments', type=int, default=1000000)
+    parser.add_argument('--updates', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=10000)
+    args = parser.parse_args()
+    rng = random.Random(3)
+    pairs = enrollments(args.students, args.courses, args.enrollments, rng)
+
+    if recommendations.sparse is not None:
+        recommender, elapsed = timed_build(pairs, use_sparse=True)
+        print(f'build, sparse AᵀA:       {elapsed:6.2f}s')
+    else:
+        print('build, sparse AᵀA:       skipped, SciPy is not installed')
+    recommender, elapsed = timed_build(pairs, use_sparse=False)
+    print(f'build, pair counts:      {elapsed:6.2f}s  ({len(pairs)} enrollments)')
+
+    changes = []
+    for _ in range(args.updates):
+        student_id, course_id = rng.randint(1, args.students), rng.randint(1, args.courses)
+        kind = UNENROLLED if rng.random() < 0.5 else ENROLLED
+        changes.append(ChangeEvent(kind, "student", student_id, course_id))
+    start = time.perf_counter()
+    for event in changes:
+        recommender.apply(event)
+    elapsed = time.perf_counter() - start
+    print(f'incremental updates:     {elapsed / args.updates * 1e6:6.2f}us each')
+
+    start = time.perf_counter()
+    for _ in range(args.queries):
+        recommender.recommend(rng.randint(1, args.students), 10)
+    elapsed = time.perf_counter() - start
+    print(f'top-10 recommendations:  {elapsed / args.queries * 1e6:6.2f}us each')
+
+    current = {(student_id, course_id) for student_id, courses in recommender._courses_of.items() for course_id in courses}
+    rebuilt, _ = timed_build(current, use_sparse=recommendations.sparse is not None)
+    live = {course_id: dict(row) for course_id, row in recommender._co_enrolled.items() if row}
+    fresh = {course_id: dict(row) for course_id, row in rebuilt._co_enrolled.items() if row}
+    print(f'incremental vs rebuild:  {"identical" if live == fresh else "DIFFERENT"}')
@@ -0,0 +1,136 @@
+"""
+Registration-day load test for capacity-limited courses.
+
+Many threads try to enroll students into a handful of popular, capacity-limited courses
+at once while some of them drop courses again, which promotes students off the waitlists.
+At the end every course is checked: no roster is over capacity, no student is both enrolled
+and waitlisted, and a final drop promotes the head of the waitlist in FIFO order.
+
+Run from the repository root:
+    python -m benchmarks.registration_load
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from src_ruba.utils import controllers, db_controllers
+
+
+def check_memory() -> list:
+    errors = []
+    for course in controllers.courses.values():
+        if len(course.students) > course.capacity:
+            errors.append(f'course {course.course_id} has {len(course.students)} students for {course.capacity} seats')
+        both = set(course.students) & set(course.waitlist)
+        if both:
+            errors.append(f'course {course.course_id} has {len(both)} students both enrolled and waitlisted')
+        if course.waitlist and len(course.students) < course.capacity:
+            errors.append(f'course {course.course_id} has free seats and a waitlist')
+    return errors
+
+
+def check_fifo(module, course_ids: list, roster) -> list:
+    errors = []
+    for course_id in course_ids:
+        waitlist = [student.student_id for student in module.get_waitlist(course_id)[0]["waitlist"]]
+        enrolled = roster(course_id)
+        if not waitlist or not enrolled:
+            continue
+        module.remove_student_from_course(enrolled[0], course_id)
+        after = [student.student_id for student in module.get_waitlist(course_id)[0]["waitlist"]]
+        if waitlist[0] not in roster(course_id) or after != waitlist[1:]:
+            errors.append(f'course {course_id} did not promote its waitlist in order')
+    return errors
+
+
+def check_sqlite() -> list:
+    conn = db_controllers.get_db_connection()
+    errors = [f'course {row["id"]} has {row["enrolled"]} students for {row["capacity"]} seats' for row in conn.execute('''
+        SELECT courses.id, courses.capacity, COUNT(registrations.student_id) AS enrolled
+        FROM courses LEFT JOIN registrations ON registrations.course_id = courses.id
+        GROUP BY courses.id HAVING enrolled > courses.capacity
+    ''')]
+    both = conn.execute('''
+        SELECT COUNT(*) FROM waitlist JOIN registrations
+        ON registrations.course_id = waitlist.course_id AND registrations.student_id = waitlist.student_id
+    ''').fetchone()[0]
+    if both:
+        errors.append(f'{both} students are both enrolled and waitlisted')
+    conn.close()
+    return errors
+
+
+def hammer(module, student_ids: list, course_ids: list, threads: int, attempts: int) -> tuple:
+    admitted, waitlisted = [0] * threads, [0] * threads
+
+    def worker(slot: int):
+        rng = random.Random(slot)
+        for _ in range(attempts):
+            student_id, course_id = rng.choice(student_ids), rng.choice(course_ids)
+            if rng.random() < 0.15:
+                module.remove_student_from_course(student_id, course_id)
+                continue
+            _, status = module.add_student_to_course(student_id, course_id)
+            if status == 200:
+                admitted[slot] += 1
+            elif status == 202:
+                waitlisted[slot] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(admitted), sum(waitlisted), time.perf_counter() - start
+
+
+def report(label: str, admitted: int, waitlisted: int, elapsed: float, errors: list) -> None:
+    print(f'{label:<7} admitted={admitted:>7} waitlisted={waitlisted:>7}  elapsed={elapsed:6.2f}s'
+          f'  admissions/s={admitted / elapsed:>9,.0f}  check={"consistent" if not errors else f"{len(errors)} problems"}')
+    for error in errors[:10]:
+        print(f'  {error}')
+
+
+def run_memory(args, directory: str) -> None:
+    controllers.set_concurrency_mode(True)
+    controllers.restore({}, {}, {}, directory)
+    student_ids = [controllers.register_student(f'Student {i}', 20, f's{i}@school.edu')[0]["student"].student_id for i in range(args.students)]
+    course_ids = [controllers.add_course(f'Course {i}', '', args.capacity)[0]["course"].course_id for i in range(args.courses)]
+    admitted, waitlisted, elapsed = hammer(controllers, student_ids, course_ids, args.threads, args.attempts)
+    errors = check_memory()
+    errors += check_fifo(controllers, course_ids, lambda course_id: list(controllers.courses[course_id].students))
+    report('memory', admitted, waitlisted, elapsed, errors)
+    controllers.set_concurrency_mode(False)
+
+
+def run_sqlite(args, directory: str) -> None:
+    db_controllers.DATABASE = os.path.join(directory, 'school_management_system.db')
+    conn = db_controllers.get_db_connection()
+    db_controllers.create_tables(conn)
+    conn.executemany('INSERT INTO students (name, age, email) VALUES (?, ?, ?)',
+                     [(f'Student {i}', 20, f's{i}@school.edu') for i in range(args.students)])
+    conn.commit()
+    conn.close()
+    student_ids = list(range(1, args.students + 1))
+    course_ids = [db_controllers.add_course(f'Course {i}', '', args.capacity)[0]["course_id"] for i in range(args.courses)]
+    admitted, waitlisted, elapsed = hammer(db_controllers, student_ids, course_ids, args.threads, args.attempts // 10)
+    errors = check_sqlite()
+    errors += check_fifo(db_controllers, course_ids, lambda course_id: [student.student_id for student in db_controllers.get_students_by_course(course_id)[0]["students"]])
+    report('sqlite', admitted, waitlisted, elapsed, errors)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--attempts', type=int, default=5000)
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--courses', type=int, default=5)
+    parser.add_argument('--capacity', type=int, default=200)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        run_memory(args, directory)
+        run_sqlite(args, directory)
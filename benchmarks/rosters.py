@@ -0,0 +1,68 @@
+"""
+Benchmark for the joined roster queries.
+
+Builds the "students with their courses" view the N+1 way (get_students, then one
+get_student_courses call per student) and with get_students_with_courses, for the whole
+roster and for one page of 50 students sorted by name, counting the SQL statements each
+runs.
+
+Run from the repository root:
+    python -m benchmarks.rosters
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src_ruba.utils import db_controllers
+
+
+def counted(function) -> tuple:
+    statements = []
+    conn = db_controllers.get_db_connection()
+    conn.set_trace_callback(statements.append)
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    conn.set_trace_callback(None)
+    conn.close()
+    return elapsed, len(statements)
+
+
+def n_plus_one() -> None:
+    students = db_controllers.get_students()[0]["students"]
+    for student_id in students:
+        db_controllers.get_student_courses(student_id)
+
+
+def n_plus_one_page() -> None:
+    for student in db_controllers.list_students("name", 50)[0]["students"]:
+        db_controllers.get_student_courses(student.student_id)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=50000)
+    parser.add_argument('--courses', type=int, default=500)
+    parser.add_argument('--enrollments', type=int, default=200000)
+    args = parser.parse_args()
+    rng = random.Random(19)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_controllers.DATABASE = os.path.join(directory, 'school_management_system.db')
+        db_controllers.initialize_database()
+        db_controllers.register_students((f'Student {rng.randrange(args.students)}', 20, f's{i}@school.edu') for i in range(args.students))
+        db_controllers.add_courses((f'Course {i}', '') for i in range(args.courses))
+        db_controllers.enroll_pairs({(rng.randint(1, args.students), rng.randint(1, args.courses)) for _ in range(args.enrollments)})
+
+        cases = (
+            ("whole roster", n_plus_one, lambda: db_controllers.get_students_with_courses()),
+            ("page of 50", n_plus_one_page, lambda: db_controllers.get_students_with_courses("name", 50)),
+        )
+        print(f'{"view":<13} {"N+1 queries":>24} {"joined query":>24}')
+        for label, slow, fast in cases:
+            slow_time, slow_statements = counted(slow)
+            fast_time, fast_statements = counted(fast)
+            print(f'{label:<13} {slow_time * 1000:10.1f}ms {slow_statements:>7} stmts {fast_time * 1000:10.1f}ms {fast_statements:>7} stmts')
+        db_controllers.close_connections()
@@ -0,0 +1,67 @@
+"""
+Benchmark for schedule conflict detection.
+
+Builds one person's timetable of growing size and times a conflict check through the
+interval tree against comparing the new course with every course already on it. Then
+generates a whole school of timetables and times the sweep-line conflict report.
+
+Run from the repository root:
+    python -m benchmarks.schedule_conflicts
+"""
+import argparse
+import random
+import time
+
+from src_ruba.utils.schedule import IntervalTree, WEEK, find_conflicts
+
+
+def random_meeting(rng: random.Random) -> tuple:
+    start = rng.randrange(WEEK - 180)
+    return start, start + rng.choice((50, 75, 90, 180))
+
+
+def pairwise(meetings: list, start: int, end: int) -> list:
+    return [course_id for other_start, other_end, course_id in meetings if other_start < end and start < other_end]
+
+
+def check_latency(sizes: list, checks: int, rng: random.Random) -> None:
+    for size in sizes:
+        tree, meetings = IntervalTree(), []
+        for course_id in range(size):
+            start, end = random_meeting(rng)
+            tree.add(start, end, course_id)
+            meetings.append((start, end, course_id))
+        queries = [random_meeting(rng) for _ in range(checks)]
+        start_time = time.perf_counter()
+        for start, end in queries:
+            tree.overlapping(start, end)
+        tree_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        for start, end in queries:
+            pairwise(meetings, start, end)
+        pairwise_time = time.perf_counter() - start_time
+        print(f'meetings={size:>7}  tree={tree_time / checks * 1e6:8.2f}us  pairwise={pairwise_time / checks * 1e6:10.2f}us')
+
+
+def school_report(people: int, courses: int, per_person: int, rng: random.Random) -> None:
+    timetable = {course_id: [random_meeting(rng) for _ in range(2)] for course_id in range(courses)}
+    meetings = [(start, end, person_id, course_id)
+                for person_id in range(people)
+                for course_id in rng.sample(range(courses), per_person)
+                for start, end in timetable[course_id]]
+    start_time = time.perf_counter()
+    conflicts = find_conflicts(meetings)
+    elapsed = time.perf_counter() - start_time
+    print(f'school report: people={people} meetings={len(meetings)} conflicts={len(conflicts)} elapsed={elapsed:.2f}s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--checks', type=int, default=2000)
+    parser.add_argument('--people', type=int, default=50000)
+    parser.add_argument('--courses', type=int, default=400)
+    parser.add_argument('--per-person', type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(11)
+    check_latency([10, 100, 1000, 10000, 100000], args.checks, rng)
+    school_report(args.people, args.courses, args.per_person, rng)
@@ -0,0 +1,87 @@
+"""
+Benchmark for the full-text search controllers.
+
+Fills a database with a million students (and a smaller number of courses with generated
+descriptions), then compares the old substring scan (name LIKE '%term%') with the FTS5 prefix
+search behind search_students and search_courses, for full words, short prefixes and
+two-word queries.
+
+Run from the repository root:
+    python -m benchmarks.search
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src_ruba.utils import db_controllers
+
+SYLLABLES = [onset + vowel + coda for onset in ("", "b", "br", "c", "d", "f", "g", "h", "j", "k", "l", "m", "n", "p", "r", "s", "st", "t", "v", "w")
+             for vowel in "aeiou" for coda in ("", "n", "r", "l", "s")]
+
+
+def word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+
+
+def populate(args, rng: random.Random) -> float:
+    first_names = [word(rng) for _ in range(2000)]
+    last_names = [word(rng) for _ in range(20000)]
+    conn = db_controllers.get_db_connection()
+    db_controllers.create_tables(conn)
+    start = time.perf_counter()
+    conn.executemany('INSERT INTO students (name, age, email) VALUES (?, ?, ?)',
+                     ((f'{rng.choice(first_names)} {rng.choice(last_names)}', rng.randint(16, 70), f's{i}@school.edu') for i in range(args.students)))
+    conn.executemany('INSERT INTO courses (name, description) VALUES (?, ?)',
+                     ((f'{word(rng)} {word(rng)}', " ".join(word(rng).lower() for _ in range(30))) for _ in range(args.courses)))
+    conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def timed(function, terms: list) -> float:
+    start = time.perf_counter()
+    for term in terms:
+        function(term)
+    return (time.perf_counter() - start) / len(terms)
+
+
+def like_scan(table: str, column: str, term: str) -> list:
+    conn = db_controllers.get_db_connection()
+    rows = conn.execute(f'SELECT * FROM {table} WHERE {column} LIKE ?', (f'%{term}%',)).fetchall()
+    conn.close()
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=1000000)
+    parser.add_argument('--courses', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+    rng = random.Random(13)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_controllers.DATABASE = os.path.join(directory, 'school_management_system.db')
+        elapsed = populate(args, rng)
+        print(f'inserted {args.students} students and {args.courses} courses with the search index in {elapsed:.1f}s')
+
+        conn = db_controllers.get_db_connection()
+        names = [row[0] for row in conn.execute('SELECT name FROM students ORDER BY random() LIMIT ?', (args.queries,))]
+        descriptions = [row[0] for row in conn.execute('SELECT description FROM courses ORDER BY random() LIMIT ?', (args.queries,))]
+        conn.close()
+        cases = [
+            ("students", "name", "last name", [name.split()[1] for name in names]),
+            ("students", "name", "3-letter prefix", [name.split()[1][:3] for name in names]),
+            ("students", "name", "first + last prefix", [f'{name.split()[0]} {name.split()[1][:4]}' for name in names]),
+            ("courses", "description", "description word", [rng.choice(description.split()) for description in descriptions]),
+        ]
+        print(f'{"query":<22} {"LIKE scan":>10} {"FTS5":>10}')
+        for table, column, label, terms in cases:
+            search = db_controllers.search_students if table == "students" else db_controllers.search_courses
+            scan = timed(lambda term: like_scan(table, column, term), terms)
+            indexed = timed(lambda term: search(column, term), terms)
+            print(f'{label:<22} {scan * 1000:8.2f}ms {indexed * 1000:8.2f}ms')
+        db_controllers.close_connections()
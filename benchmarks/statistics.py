@@ -0,0 +1,81 @@
+"""
+Benchmark for the incrementally maintained enrollment statistics.
+
+Enrolls a large cohort through the in-memory controllers with and without the statistics
+subscribed, then compares reading the dashboard counters with recomputing them by a full
+scan and with the equivalent GROUP BY queries on SQLite.
+
+Run from the repository root:
+    python -m benchmarks.statistics
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src_ruba.components.student import Student
+from src_ruba.utils import controllers, db_controllers
+from src_ruba.utils.events import EventBus
+from src_ruba.utils.statistics import EnrollmentStatistics
+
+
+def populate(students: int, courses: int, enrollments: int, rng: random.Random) -> float:
+    controllers.restore({i: Student(f'Student {i}', rng.randint(16, 70), f's{i}@school.edu', i) for i in range(1, students + 1)},
+                        {}, {}, os.path.dirname(db_controllers.DATABASE))
+    course_ids = [controllers.add_course(f'Course {i}', '')[0]["course"].course_id for i in range(courses)]
+    pairs = [(rng.randint(1, students), rng.choice(course_ids)) for _ in range(enrollments)]
+    start = time.perf_counter()
+    for student_id, course_id in pairs:
+        controllers.add_student_to_course(student_id, course_id)
+    return time.perf_counter() - start
+
+
+def timed(function, repeat: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def group_by_queries(conn) -> None:
+    conn.execute('SELECT course_id, COUNT(*) AS n FROM registrations GROUP BY course_id ORDER BY n DESC LIMIT 10').fetchall()
+    conn.execute('SELECT n, COUNT(*) FROM (SELECT COUNT(*) AS n FROM registrations GROUP BY student_id) GROUP BY n').fetchall()
+    conn.execute('SELECT age, COUNT(*) FROM students GROUP BY age').fetchall()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--courses', type=int, default=500)
+    parser.add_argument('--enrollments', type=int, default=300000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_controllers.DATABASE = os.path.join(directory, 'school_management_system.db')
+        with_stats = populate(args.students, args.courses, args.enrollments, random.Random(5))
+        events, controllers.events = controllers.events, EventBus()
+        without_stats = populate(args.students, args.courses, args.enrollments, random.Random(5))
+        controllers.events = events
+        controllers.statistics.load(*controllers._statistics_source())
+        print(f'enroll {args.enrollments}: with statistics {with_stats:.2f}s, without {without_stats:.2f}s')
+
+        def full_scan():
+            recomputed = EnrollmentStatistics()
+            recomputed.load(*controllers._statistics_source())
+            return recomputed.summary()
+
+        print(f'get_statistics:        {timed(controllers.get_statistics, 100) * 1000:8.3f}ms')
+        print(f'full recompute:        {timed(full_scan) * 1000:8.3f}ms')
+
+        conn = db_controllers.get_db_connection()
+        db_controllers.create_tables(conn)
+        conn.executemany('INSERT INTO students (id, name, age, email) VALUES (?, ?, ?, ?)',
+                         [(s.student_id, s.name, s.age, s._email) for s in controllers.students.values()])
+        conn.executemany('INSERT INTO courses (id, name, description) VALUES (?, ?, ?)',
+                         [(c.course_id, c.name, c.description) for c in controllers.courses.values()])
+        conn.executemany('INSERT INTO registrations (student_id, course_id) VALUES (?, ?)',
+                         [(student_id, course.course_id) for course in controllers.courses.values() for student_id in course.students])
+        conn.commit()
+        print(f'sqlite GROUP BY:       {timed(lambda: group_by_queries(conn)) * 1000:8.3f}ms')
+        conn.close()
@@ -0,0 +1,68 @@
+"""
+Benchmark for units of work in the SQLite controllers.
+
+Repeats a compound edit (update a student, then move them from one course to another) with
+each controller call committing on its own and with the three calls joined in one unit of
+work, and counts the COMMIT statements each way. It runs with the pooled connections'
+synchronous=NORMAL and again with synchronous=FULL, where every commit is also an fsync.
+
+Run from the repository root:
+    python -m benchmarks.unit_of_work
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from src_ruba.utils import db_controllers
+from src_ruba.utils.db_pool import PRAGMAS, ConnectionPool
+
+
+def move(student_id: int, source: int, target: int) -> None:
+    db_controllers.update_student(student_id, f'Student {student_id}', 21, f's{student_id}@school.edu')
+    db_controllers.remove_student_from_course(student_id, source)
+    db_controllers.add_student_to_course(student_id, target)
+
+
+def run(moves: int, joined: bool, forward: bool) -> tuple:
+    statements = []
+    conn = db_controllers.get_db_connection()
+    conn.set_trace_callback(statements.append)
+    start = time.perf_counter()
+    for student_id in range(1, moves + 1):
+        source, target = (1, 2) if (student_id % 2 == 1) == forward else (2, 1)
+        if joined:
+            with db_controllers.unit_of_work():
+                move(student_id, source, target)
+        else:
+            move(student_id, source, target)
+    elapsed = time.perf_counter() - start
+    conn.set_trace_callback(None)
+    conn.close()
+    return elapsed, sum(statement == 'COMMIT' for statement in statements)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--moves', type=int, default=2000)
+    parser.add_argument('--directory', default=None, help='where to put the database, to measure fsyncs on a particular disk')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        db_controllers.DATABASE = os.path.join(directory, 'school_management_system.db')
+        db_controllers.initialize_database()
+        db_controllers.register_students((f'Student {i}', 20, f's{i}@school.edu') for i in range(1, args.moves + 1))
+        db_controllers.add_courses([('Course 1', ''), ('Course 2', '')])
+        db_controllers.enroll_pairs((i, 1 if i % 2 else 2) for i in range(1, args.moves + 1))
+
+        forward = False
+        for synchronous in ("NORMAL", "FULL"):
+            db_controllers.close_connections()
+            pragmas = tuple(pragma for pragma in PRAGMAS if 'synchronous' not in pragma) + (f'PRAGMA synchronous = {synchronous}',)
+            db_controllers._pool = ConnectionPool(db_controllers.DATABASE, pragmas)
+            for joined in (False, True):
+                forward = not forward
+                elapsed, commits = run(args.moves, joined, forward)
+                label = 'unit of work' if joined else 'separate commits'
+                print(f'synchronous={synchronous:<6} {label:<16} {args.moves / elapsed:8,.0f} moves/s  {commits:>6} commits')
+        db_controllers.close_connections()
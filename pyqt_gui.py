@@ -1,6 +1,7 @@
 import os
 from src_ruba.managers.data_manager import DataManager
-from src_ruba.utils.controllers import terminate
+from src_ruba.utils.controllers import terminate, events
+from src_ruba.utils.events import CREATED, DELETED
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QLineEdit, QTextEdit, QPushButton, QListWidget, QComboBox, QMessageBox, QDialog)
 from PyQt5.QtCore import QTimer, pyqtSlot, Qt
@@ -8,7 +9,7 @@ from src_ruba.utils.controllers import (
     register_student, remove_student_from_course, register_instructor, remove_instructor_from_course, 
     add_course, add_student_to_course, add_instructor_to_course, remove_student, remove_instructor, 
     remove_course, get_students, get_instructors, get_courses, get_instructors_by_course, get_students_by_course,
-    search_students, search_instructors, get_student_courses, get_instructor_courses, 
+    search_students, search_instructors, resolve_course_names,
 )
 
 
@@ -58,7 +59,14 @@ class SchoolManagementSystem(QMainWindow):
         self.timer = QTimer()
         self.timer.timeout.connect(self.clear_message)
 
+        self.dropdowns = {
+            "student": [self.select_student_combo, self.select_student_remove_combo, self.select_delete_student_combo],
+            "course": [self.select_course_combo, self.select_course_remove_combo, self.select_course_instructor_combo,
+                       self.select_course_instructor_remove_combo, self.select_delete_course_combo],
+            "instructor": [self.select_instructor_combo, self.select_instructor_remove_combo, self.select_delete_instructor_combo],
+        }
         self.update_dropdowns()
+        events.subscribe(self.apply_changes, kinds=(CREATED, DELETED), coalesce=True)
         
         self.terminate_button = QPushButton("Terminate")
         self.terminate_button.clicked.connect(self.on_closing)
@@ -419,7 +427,6 @@ class SchoolManagementSystem(QMainWindow):
             self.student_age_entry.clear()
             self.student_email_entry.clear()
             self.show_message(message["message"], "green")
-            self.update_dropdowns()
         else:
             self.show_message(message["message"], "red")
 
@@ -440,7 +447,6 @@ class SchoolManagementSystem(QMainWindow):
         if status == 200:
             self.delete_student_id_entry.clear()
             self.show_message(message["message"], "green")
-            self.update_dropdowns()
         else:
             self.show_message(message["message"], "red")
 
@@ -460,7 +466,6 @@ class SchoolManagementSystem(QMainWindow):
 
         if status == 200:
             self.show_message(message["message"], "green")
-            self.update_dropdowns()
         else:
             self.show_message(message["message"], "red")
 
@@ -525,7 +530,6 @@ class SchoolManagementSystem(QMainWindow):
             self.instructor_age_entry.clear()
             self.instructor_email_entry.clear()
             self.show_message(message["message"], "green")
-            self.update_dropdowns()
         else:
             self.show_message(message["message"], "red")
 
@@ -546,7 +550,6 @@ class SchoolManagementSystem(QMainWindow):
         if status == 200:
             self.delete_instructor_id_entry.clear()
             self.show_message(message["message"], "green")
-            self.update_dropdowns()
         else:
             self.show_message(message["message"], "red")
 
@@ -566,7 +569,6 @@ class SchoolManagementSystem(QMainWindow):
         print(message)
         if status == 200:
             self.show_message(message["message"], "green")
-            self.update_dropdowns()
         else:
             self.show_message(message["message"], "red")
 
@@ -629,7 +631,6 @@ class SchoolManagementSystem(QMainWindow):
             self.add_course_name_entry.clear()
             self.add_course_description_entry.clear()
             self.show_message(message["message"], "green")
-            self.update_dropdowns()
         else:
             self.show_message(message["message"], "red")
 
@@ -650,7 +651,6 @@ class SchoolManagementSystem(QMainWindow):
         if status == 200:
             self.remove_course_id_entry.clear()
             self.show_message(message["message"], "green")
-            self.update_dropdowns()
         else:
             self.show_message(message["message"], "red")
 
@@ -670,7 +670,6 @@ class SchoolManagementSystem(QMainWindow):
 
         if status == 200:
             self.show_message(message["message"], "green")
-            self.update_dropdowns()
         else:
             self.show_message(message["message"], "red")
 
@@ -689,10 +688,10 @@ class SchoolManagementSystem(QMainWindow):
         self.view_students_list.clear()
 
         if status == 200 and students:
-            for student_id in students['students']:
-                student = students['students'][student_id]
-                courses, _ = get_student_courses(student.registered_courses)
-                course_names = ", ".join(courses['courses']) if courses['courses'] else "No courses"
+            student_list = list(students['students'].values())
+            courses, _ = resolve_course_names([student.registered_courses for student in student_list])
+            for student, names in zip(student_list, courses['courses']):
+                course_names = ", ".join(names) if names else "No courses"
                 self.view_students_list.addItem(f"Name: {student.name}, ID: {student.student_id}, Email: {student._email}")
                 self.view_students_list.addItem(f"Courses: {course_names}")
                 self.view_students_list.addItem("")
@@ -714,10 +713,10 @@ class SchoolManagementSystem(QMainWindow):
         self.view_instructors_list.clear()
         
         if status == 200 and instructors:
-            for instructor_id in instructors['instructors']:
-                instructor = instructors['instructors'][instructor_id]
-                courses, _ = get_instructor_courses(instructor.assigned_courses)
-                course_names = ", ".join(courses['courses']) if courses['courses'] else "No courses"
+            instructor_list = list(instructors['instructors'].values())
+            courses, _ = resolve_course_names([instructor.assigned_courses for instructor in instructor_list])
+            for instructor, names in zip(instructor_list, courses['courses']):
+                course_names = ", ".join(names) if names else "No courses"
                 self.view_instructors_list.addItem(f"Name: {instructor.name}, ID: {instructor.instructor_id}, Email: {instructor._email}")
                 self.view_instructors_list.addItem(f"Courses: {course_names}")
                 self.view_instructors_list.addItem("")
@@ -773,9 +772,9 @@ class SchoolManagementSystem(QMainWindow):
         self.view_students_list.clear()
         
         if status == 200 and students:
-            for student in students['students']:
-                courses, _ = get_student_courses(student.registered_courses)
-                course_names = ", ".join(courses['courses']) if courses['courses'] else "No courses"
+            courses, _ = resolve_course_names([student.registered_courses for student in students['students']])
+            for student, names in zip(students['students'], courses['courses']):
+                course_names = ", ".join(names) if names else "No courses"
                 self.view_students_list.addItem(f"Name: {student.name}, ID: {student.student_id}, Email: {student._email}")
                 self.view_students_list.addItem(f"Courses: {course_names}")
                 self.view_students_list.addItem("")
@@ -811,9 +810,9 @@ class SchoolManagementSystem(QMainWindow):
         self.view_instructors_list.clear()
         
         if status == 200 and instructors:
-            for instructor in instructors['instructors']:
-                courses, _ = get_instructor_courses(instructor.assigned_courses)
-                course_names = ", ".join(courses['courses']) if courses['courses'] else "No courses"
+            courses, _ = resolve_course_names([instructor.assigned_courses for instructor in instructors['instructors']])
+            for instructor, names in zip(instructors['instructors'], courses['courses']):
+                course_names = ", ".join(names) if names else "No courses"
                 self.view_instructors_list.addItem(f"Name: {instructor.name}, ID: {instructor.instructor_id}, Email: {instructor._email}")
                 self.view_instructors_list.addItem(f"Courses: {course_names}")
                 self.view_instructors_list.addItem("")
@@ -861,6 +860,27 @@ class SchoolManagementSystem(QMainWindow):
         self.select_delete_instructor_combo.addItems(instructor_options)
 
 
+    def apply_changes(self, changes):
+        """Apply created and deleted entities to the dropdowns without rebuilding them.
+
+        Subscribed to the controllers' change events, so every mutation only adds or
+        removes the affected entries instead of refilling all the combo boxes.
+
+        :param changes: The coalesced change events of one controller call.
+        :type changes: list
+        :return: None
+        :rtype: None
+        """
+        for change in changes:
+            option = f"{change.payload.name}: {change.entity_id}"
+            for combo in self.dropdowns[change.entity]:
+                if change.kind == CREATED:
+                    combo.addItem(option)
+                else:
+                    index = combo.findText(option)
+                    if index != -1:
+                        combo.removeItem(index)
+
     def get_student_options(self):
         """Retrieve a list of student options for the combo boxes.
 
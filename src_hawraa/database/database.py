@@ -1,19 +1,33 @@
 import sqlite3
 import os
 import sys
+import threading
+
+# Where the database lives. It defaults to this module's directory, wherever the program is
+# started from; set SCHOOL_MANAGEMENT_DB or call set_database_path() to use another file.
+DATABASE_PATH = os.environ.get('SCHOOL_MANAGEMENT_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'school_management.db'))
+
+# Bump when the statements in create_database() change.
+SCHEMA_VERSION = 1
+
+_schema_lock = threading.Lock()
+_schema_ready_for = None
 
 # Function to create the database and tables
-def create_database():
-        # Ensure the 'database' directory exists
-    database_dir = 'src_hawraa/database'
-    if not os.path.exists(database_dir):
-        os.makedirs(database_dir)
-    
-    # Path to the SQLite database inside the 'database' directory
-    db_path = os.path.join(database_dir, 'school_management.db')
+def create_database(db_path=None):
+    db_path = db_path or DATABASE_PATH
+    # Ensure the directory of the database exists
+    database_dir = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(database_dir, exist_ok=True)
 
     # Connect to the SQLite database (or create it if it doesn't exist)
     conn = sqlite3.connect(db_path)
+    try:
+        _create_tables(conn)
+    finally:
+        conn.close()
+
+def _create_tables(conn):
     cursor = conn.cursor()
 
     # Create Students table
@@ -57,20 +71,40 @@ def create_database():
         )
     ''')
 
-    # Commit changes and close the connection
+    # Record the schema version and commit the changes
+    cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
     conn.commit()
-    conn.close()
 
-# Call the function to create the database and tables
-create_database()
+# Point the module at another database file; its schema is checked on the next connection
+def set_database_path(db_path):
+    global DATABASE_PATH, _schema_ready_for
+    with _schema_lock:
+        DATABASE_PATH = db_path
+        _schema_ready_for = None
+
+# Make sure the schema exists, once per database file and process. A database that is up to
+# date costs a single PRAGMA read; older or new files get the tables created.
+def _ensure_schema(conn, db_path):
+    global _schema_ready_for
+    with _schema_lock:
+        if _schema_ready_for == db_path:
+            return
+        if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+            _create_tables(conn)
+        _schema_ready_for = db_path
 
 # -------------------------------------------
 # CRUD operations for students
 # -------------------------------------------
 
-# Connect to the SQLite database
+# Connect to the SQLite database, creating it and its tables on first use
 def connect_db():
-    db_path = os.path.join('src_hawraa/database', 'school_management.db')
+    db_path = DATABASE_PATH
+    if _schema_ready_for != db_path:
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = sqlite3.connect(db_path)
+        _ensure_schema(conn, db_path)
+        return conn
     return sqlite3.connect(db_path)
 
 # Create a new student
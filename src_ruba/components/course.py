@@ -2,28 +2,81 @@ from .student import Student
 from .instructor import Instructor
 
 class Course:
-    def __init__(self, name: str, description:str, course_id: str):
+    def __init__(self, name: str, description:str, course_id: str, capacity: int = None, meetings: list = None):
         self.name = name
         self.description = description
         self.course_id = course_id
+        self.capacity = capacity
+        self.meetings = list(meetings or [])
         self.students = {}
         self.instructors = {}
-    
-    def add_student(self, student: Student):
-        self.students[student.student_id] = student
-        student._register_course(self.course_id)
-    
+        self.waitlist = {}
+
+    def __setstate__(self, state):
+        """
+        This method fills in the seat limit, waitlist and meetings for courses pickled before they existed.
+        """
+        self.__dict__.update(state)
+        self.__dict__.setdefault('capacity', None)
+        self.__dict__.setdefault('waitlist', {})
+        self.__dict__.setdefault('meetings', [])
+
+    def is_full(self) -> bool:
+        return self.capacity is not None and len(self.students) >= self.capacity
+
+    def add_student(self, student: Student) -> bool:
+        """
+        This method enrolls the student if a seat is free and returns whether they are enrolled.
+        """
+        if student.student_id not in self.students:
+            if self.is_full():
+                return False
+            self.students[student.student_id] = student
+            self.waitlist.pop(student.student_id, None)
+            student._register_course(self.course_id)
+        return True
+
     def remove_student(self, student: Student):
         if student.student_id in self.students:
             del self.students[student.student_id]
             student._unregister_course(self.course_id)
             return True
         return False
-    
+
+    def join_waitlist(self, student: Student) -> int:
+        """
+        This method queues the student for a seat and returns their position in the waitlist.
+        """
+        if student.student_id not in self.waitlist:
+            self.waitlist[student.student_id] = student
+            return len(self.waitlist)
+        return list(self.waitlist).index(student.student_id) + 1
+
+    def leave_waitlist(self, student: Student) -> bool:
+        return self.waitlist.pop(student.student_id, None) is not None
+
+    def promote_waitlisted(self, admit=None) -> list:
+        """
+        This method moves students from the front of the waitlist into free seats and returns them.
+        If admit is given it is called with each student before they take a seat, and those it
+        turns down stay on the waitlist while the next students are promoted.
+        """
+        promoted = []
+        for student_id in list(self.waitlist):
+            if self.is_full():
+                break
+            student = self.waitlist[student_id]
+            if admit is not None and not admit(student):
+                continue
+            del self.waitlist[student_id]
+            self.add_student(student)
+            promoted.append(student)
+        return promoted
+
     def add_instructor(self, instructor: Instructor):
         self.instructors[instructor.instructor_id] = instructor
         instructor._add_course(self.course_id)
-    
+
     def remove_instructor(self, instructor: Instructor):
         if instructor.instructor_id in self.instructors:
             del self.instructors[instructor.instructor_id]
@@ -35,4 +88,4 @@ class Course:
         """
         This method returns a string representation of the object which will be needed for pickling.
         """
-        return f"Course(name={self.name}, description={self.description}, course_id={self.course_id}, students={self.students}, instructors={self.instructors})"
\ No newline at end of file
+        return f"Course(name={self.name}, description={self.description}, course_id={self.course_id}, capacity={self.capacity}, meetings={self.meetings}, students={self.students}, instructors={self.instructors}, waitlist={list(self.waitlist)})"
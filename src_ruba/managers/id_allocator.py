@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class IdAllocator:
+    """
+    The allocator keeps the next free ID of every entity kind in 'ids.json' inside the
+    data folder. Each process reserves IDs from that file in blocks and hands them out
+    locally, so the file is only touched once per block and an ID is never given twice,
+    even across restarts or when several processes share the folder.
+    """
+    def __init__(self, path: str, block_size: int = 100):
+        assert os.path.isdir(path), 'The path specified is not a folder.'
+        assert block_size > 0, 'The block size must be positive.'
+        self.path = path
+        self.block_size = block_size
+        self._file = os.path.join(path, 'ids.json')
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _file_locked(self):
+        with open(self._file + '.lock', 'a+') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read(self) -> dict:
+        if not os.path.isfile(self._file):
+            return {}
+        with open(self._file, 'r') as file:
+            return json.load(file)
+
+    def _write(self, counters: dict) -> None:
+        temporary = self._file + '.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(counters, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self._file)
+
+    def reserve(self, kind: str, count: int) -> range:
+        """
+        This method reserves count consecutive IDs of the given kind and returns them as a range.
+        Bulk imports can call it directly to claim all the IDs they need at once.
+        """
+        assert count > 0, 'At least one ID must be reserved.'
+        with self._file_locked():
+            counters = self._read()
+            start = counters.get(kind, 1)
+            counters[kind] = start + count
+            self._write(counters)
+        return range(start, start + count)
+
+    def next_id(self, kind: str) -> int:
+        """
+        This method returns the next ID of the given kind from the local block, reserving a new
+        block when the current one runs out.
+        """
+        with self._lock:
+            block = self._blocks.get(kind)
+            if block is None or block[0] == block[1]:
+                reserved = self.reserve(kind, self.block_size)
+                block = self._blocks[kind] = [reserved.start, reserved.stop]
+            block[0] += 1
+            return block[0] - 1
+
+    def ensure_above(self, kind: str, used_id: int) -> None:
+        """
+        This method makes sure no ID up to used_id will be handed out, e.g. for data saved
+        before the allocator existed.
+        """
+        if used_id < 1:
+            return
+        with self._lock:
+            block = self._blocks.get(kind)
+            if block is not None and block[0] <= used_id:
+                del self._blocks[kind]
+            with self._file_locked():
+                counters = self._read()
+                if counters.get(kind, 1) <= used_id:
+                    counters[kind] = used_id + 1
+                    self._write(counters)
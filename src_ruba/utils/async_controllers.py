@@ -0,0 +1,197 @@
+"""
+Asyncio versions of the controller functions in controllers.py.
+
+The in-memory controllers only touch dictionaries, so they run inline on the event loop,
+except in concurrency mode: there they may wait for the registry or a stripe lock, so they
+run on a bounded thread pool like anything that reaches the file system. Every coroutine
+takes an optional keyword-only ``timeout`` in seconds; cancelling a caller that is still
+queued for the pool removes its call from the queue.
+"""
+import asyncio
+import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from src_ruba.managers.data_manager import DataManager
+from src_ruba.utils import controllers
+from src_ruba.utils.dedup import find_duplicates
+
+_max_workers = 4
+_executor = None
+_snapshot = None
+
+
+def configure(max_workers: int) -> None:
+    """
+    This function sets the size of the thread pool used for blocking calls. It replaces the
+    current pool, so it should be called before the first offloaded call or after shutdown().
+    """
+    global _max_workers
+    assert max_workers > 0, 'The pool needs at least one worker.'
+    shutdown()
+    _max_workers = max_workers
+
+
+def shutdown(wait: bool = True) -> None:
+    """
+    This function stops the thread pool. Queued calls that have not started are dropped.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait, cancel_futures=True)
+        _executor = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix='school-io')
+    return _executor
+
+
+def _offloaded(function):
+    @wraps(function)
+    async def wrapper(*args, timeout: float = None, **kwargs):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(_get_executor(), partial(function, *args, **kwargs))
+        return await asyncio.wait_for(future, timeout)
+    return wrapper
+
+
+def _inline(function):
+    offloaded = _offloaded(function)
+
+    @wraps(function)
+    async def wrapper(*args, timeout: float = None, **kwargs):
+        if controllers.concurrent:
+            return await offloaded(*args, timeout=timeout, **kwargs)
+        # Without locks the data must not change while save_session copies it in a worker.
+        while _snapshot is not None:
+            done, _ = await asyncio.wait({_snapshot}, timeout=timeout)
+            if not done:
+                raise asyncio.TimeoutError
+        return function(*args, **kwargs)
+    return wrapper
+
+
+"""
+STUDENT CONTROLLERS
+"""
+
+register_student = _inline(controllers.register_student)
+add_student_to_course = _inline(controllers.add_student_to_course)
+remove_student_from_course = _inline(controllers.remove_student_from_course)
+remove_student = _inline(controllers.remove_student)
+get_students = _inline(controllers.get_students)
+list_students = _inline(controllers.list_students)
+query_students = _inline(controllers.query_students)
+get_students_by_course = _inline(controllers.get_students_by_course)
+get_student_courses = _inline(controllers.get_student_courses)
+get_student_id_by_name = _inline(controllers.get_student_id_by_name)
+recommend_courses = _inline(controllers.recommend_courses)
+search_students = _inline(controllers.search_students)
+enroll_many = _inline(controllers.enroll_many)
+unenroll_many = _inline(controllers.unenroll_many)
+
+
+"""
+INSTRUCTOR CONTROLLERS
+"""
+
+register_instructor = _inline(controllers.register_instructor)
+add_instructor_to_course = _inline(controllers.add_instructor_to_course)
+remove_instructor_from_course = _inline(controllers.remove_instructor_from_course)
+remove_instructor = _inline(controllers.remove_instructor)
+get_instructors = _inline(controllers.get_instructors)
+list_instructors = _inline(controllers.list_instructors)
+query_instructors = _inline(controllers.query_instructors)
+get_instructors_by_course = _inline(controllers.get_instructors_by_course)
+search_instructors = _inline(controllers.search_instructors)
+get_instructor_id_by_name = _inline(controllers.get_instructor_id_by_name)
+get_instructor_courses = _inline(controllers.get_instructor_courses)
+assign_many = _inline(controllers.assign_many)
+
+async def _find_duplicate_people(threshold: float) -> tuple:
+    records = await _inline(controllers._person_records)()
+    return {"candidates": await _offloaded(find_duplicates)(records, threshold)}, 200
+
+async def find_duplicate_people(threshold: float = 0.8, *, timeout: float = None) -> tuple:
+    """
+    This function copies the people as an inline call, so no worker walks the live dictionaries
+    while the event loop changes them, and only the comparison runs in a worker thread.
+    """
+    return await asyncio.wait_for(_find_duplicate_people(threshold), timeout)
+
+
+"""
+COURSE CONTROLLERS
+"""
+
+add_course = _inline(controllers.add_course)
+remove_course = _inline(controllers.remove_course)
+set_course_capacity = _inline(controllers.set_course_capacity)
+get_waitlist = _inline(controllers.get_waitlist)
+set_course_meetings = _inline(controllers.set_course_meetings)
+find_schedule_conflicts = _inline(controllers.find_schedule_conflicts)
+get_statistics = _inline(controllers.get_statistics)
+verify_statistics = _inline(controllers.verify_statistics)
+similar_courses = _inline(controllers.similar_courses)
+get_courses = _inline(controllers.get_courses)
+list_courses = _inline(controllers.list_courses)
+resolve_course_names = _inline(controllers.resolve_course_names)
+get_course_id_by_name = _inline(controllers.get_course_id_by_name)
+search_courses = _inline(controllers.search_courses)
+terminate = _inline(controllers.terminate)
+
+
+"""
+SESSION FILES
+"""
+
+def _save_session(format: str, data: tuple, directory: str = None) -> tuple:
+    data_manager = DataManager(directory or os.getcwd())
+    students, instructors, courses = data
+    if format == "pickle":
+        data_manager.pickle_data(students, instructors, courses)
+    elif format == "csv":
+        data_manager.save_to_csv(students, instructors, courses)
+    elif format == "json":
+        data_manager.save_to_json(students, instructors, courses)
+    else:
+        return {"message": "Invalid format specified"}, 400
+    return {"message": f'Session saved as {format}'}, 200
+
+def _load_session(directory: str = None) -> tuple:
+    students, instructors, courses = DataManager(directory or os.getcwd()).boot()
+    return {"students": students, "instructors": instructors, "courses": courses}, 200
+
+def _take_snapshot() -> tuple:
+    data = controllers.terminate()
+    return data if controllers.concurrent else copy.deepcopy(data)
+
+def _snapshot_taken(future) -> None:
+    global _snapshot
+    if _snapshot is future:
+        _snapshot = None
+
+async def _snapshot_and_save(format: str, directory: str) -> tuple:
+    global _snapshot
+    while _snapshot is not None:
+        await asyncio.wait({_snapshot})
+    loop = asyncio.get_running_loop()
+    _snapshot = loop.run_in_executor(_get_executor(), _take_snapshot)
+    _snapshot.add_done_callback(_snapshot_taken)
+    data = await asyncio.shield(_snapshot)
+    return await loop.run_in_executor(_get_executor(), partial(_save_session, format, data, directory))
+
+async def save_session(format: str, directory: str = None, *, timeout: float = None) -> tuple:
+    """
+    This function copies the session and writes it, both in worker threads, so neither the
+    deepcopy nor the serialisation holds up the event loop. In concurrency mode terminate()
+    takes the copy under the registry lock; otherwise inline calls wait until the copy is
+    taken, so they cannot change the data while it is being read.
+    """
+    return await asyncio.wait_for(_snapshot_and_save(format, directory), timeout)
+
+load_session = _offloaded(_load_session)
@@ -0,0 +1,103 @@
+"""
+Asyncio versions of the controller functions in db_controllers.py.
+
+Every call blocks on SQLite, so all of them run on the bounded thread pool shared with
+async_controllers. Each coroutine takes an optional keyword-only ``timeout`` in seconds.
+Query results are collected into lists in the worker instead of being streamed.
+"""
+from functools import wraps
+
+from src_ruba.utils import db_controllers
+from src_ruba.utils.async_controllers import _offloaded, configure, shutdown
+
+
+def _collected(query):
+    @wraps(query)
+    def collect(filter):
+        response, status = query(filter)
+        return {key: list(values) for key, values in response.items()}, status
+    return collect
+
+
+initialize_database = _offloaded(db_controllers.initialize_database)
+backup_database = _offloaded(db_controllers.backup_database)
+close_connections = _offloaded(db_controllers.close_connections)
+verify_query_plans = _offloaded(db_controllers.verify_query_plans)
+verify_foreign_keys = _offloaded(db_controllers.verify_foreign_keys)
+run_in_unit_of_work = _offloaded(db_controllers.run_in_unit_of_work)
+set_write_serialization = _offloaded(db_controllers.set_write_serialization)
+set_memory_mode = _offloaded(db_controllers.set_memory_mode)
+flush_working_copy = _offloaded(db_controllers.flush_working_copy)
+set_read_cache = _offloaded(db_controllers.set_read_cache)
+
+
+"""
+STUDENT CONTROLLERS
+"""
+
+register_student = _offloaded(db_controllers.register_student)
+add_student_to_course = _offloaded(db_controllers.add_student_to_course)
+remove_student_from_course = _offloaded(db_controllers.remove_student_from_course)
+remove_student = _offloaded(db_controllers.remove_student)
+get_students = _offloaded(db_controllers.get_students)
+list_students = _offloaded(db_controllers.list_students)
+get_students_with_courses = _offloaded(db_controllers.get_students_with_courses)
+query_students = _offloaded(_collected(db_controllers.query_students))
+get_students_by_course = _offloaded(db_controllers.get_students_by_course)
+get_student_courses = _offloaded(db_controllers.get_student_courses)
+get_student_course_count = _offloaded(db_controllers.get_student_course_count)
+get_student_id_by_name = _offloaded(db_controllers.get_student_id_by_name)
+recommend_courses = _offloaded(db_controllers.recommend_courses)
+search_students = _offloaded(db_controllers.search_students)
+enroll_many = _offloaded(db_controllers.enroll_many)
+register_students = _offloaded(db_controllers.register_students)
+enroll_pairs = _offloaded(db_controllers.enroll_pairs)
+unenroll_many = _offloaded(db_controllers.unenroll_many)
+update_student = _offloaded(db_controllers.update_student)
+
+
+"""
+INSTRUCTOR CONTROLLERS
+"""
+
+register_instructor = _offloaded(db_controllers.register_instructor)
+add_instructor_to_course = _offloaded(db_controllers.add_instructor_to_course)
+remove_instructor_from_course = _offloaded(db_controllers.remove_instructor_from_course)
+remove_instructor = _offloaded(db_controllers.remove_instructor)
+get_instructors = _offloaded(db_controllers.get_instructors)
+list_instructors = _offloaded(db_controllers.list_instructors)
+get_instructors_with_courses = _offloaded(db_controllers.get_instructors_with_courses)
+query_instructors = _offloaded(_collected(db_controllers.query_instructors))
+get_instructors_by_course = _offloaded(db_controllers.get_instructors_by_course)
+search_instructors = _offloaded(db_controllers.search_instructors)
+get_instructor_id_by_name = _offloaded(db_controllers.get_instructor_id_by_name)
+get_instructor_courses = _offloaded(db_controllers.get_instructor_courses)
+get_instructor_course_count = _offloaded(db_controllers.get_instructor_course_count)
+assign_many = _offloaded(db_controllers.assign_many)
+register_instructors = _offloaded(db_controllers.register_instructors)
+find_duplicate_people = _offloaded(db_controllers.find_duplicate_people)
+update_instructor = _offloaded(db_controllers.update_instructor)
+
+
+"""
+COURSE CONTROLLERS
+"""
+
+add_course = _offloaded(db_controllers.add_course)
+add_courses = _offloaded(db_controllers.add_courses)
+remove_course = _offloaded(db_controllers.remove_course)
+set_course_capacity = _offloaded(db_controllers.set_course_capacity)
+get_waitlist = _offloaded(db_controllers.get_waitlist)
+set_course_meetings = _offloaded(db_controllers.set_course_meetings)
+find_schedule_conflicts = _offloaded(db_controllers.find_schedule_conflicts)
+get_statistics = _offloaded(db_controllers.get_statistics)
+verify_statistics = _offloaded(db_controllers.verify_statistics)
+verify_enrollment_counters = _offloaded(db_controllers.verify_enrollment_counters)
+similar_courses = _offloaded(db_controllers.similar_courses)
+get_courses = _offloaded(db_controllers.get_courses)
+list_courses = _offloaded(db_controllers.list_courses)
+get_course_id_by_name = _offloaded(db_controllers.get_course_id_by_name)
+get_course_enrollment = _offloaded(db_controllers.get_course_enrollment)
+most_popular_courses = _offloaded(db_controllers.most_popular_courses)
+search_courses = _offloaded(db_controllers.search_courses)
+update_course = _offloaded(db_controllers.update_course)
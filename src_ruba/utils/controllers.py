@@ -3,82 +3,415 @@ from src_ruba.components.student import Student
 from src_ruba.components.course import Course
 
 from src_ruba.utils.data_validator import DataValidator
+from src_ruba.utils.locks import ReadWriteLock, LockStripes, unlocked
+from src_ruba.utils.indexes import SortedIndex
+from src_ruba.utils.pagination import encode_cursor, decode_cursor
+from src_ruba.utils.events import EventBus, ChangeEvent, CREATED, UPDATED, DELETED, ENROLLED, UNENROLLED
+from src_ruba.utils.schedule import IntervalTree, find_conflicts, valid_meetings
+from src_ruba.utils.statistics import EnrollmentStatistics
+from src_ruba.utils.recommendations import CoEnrollmentRecommender
+from src_ruba.utils.dedup import find_duplicates
 from ..managers.data_manager import DataManager
+from ..managers.id_allocator import IdAllocator
 
+from functools import wraps
+import copy
 import os
+import threading
 
 directory = os.getcwd()
 manager = DataManager(directory)
 validator = DataValidator()
 students, instructors, courses = manager.boot()
 
-student_id = len(students) + 1
-instructor_id = len(instructors) + 1
-course_id = len(courses) + 1
+ids = IdAllocator(directory)
+
+def _reserve_existing_ids():
+    ids.ensure_above("student", max(map(int, students), default=0))
+    ids.ensure_above("instructor", max(map(int, instructors), default=0))
+    ids.ensure_above("course", max(map(int, courses), default=0))
+
+_reserve_existing_ids()
+
+student_indexes = {
+    "id": SortedIndex(lambda student: student.student_id),
+    "name": SortedIndex(lambda student: student.name),
+    "age": SortedIndex(lambda student: student.age),
+}
+instructor_indexes = {
+    "id": SortedIndex(lambda instructor: instructor.instructor_id),
+    "name": SortedIndex(lambda instructor: instructor.name),
+    "age": SortedIndex(lambda instructor: instructor.age),
+}
+course_indexes = {
+    "id": SortedIndex(lambda course: course.course_id),
+    "name": SortedIndex(lambda course: course.name),
+}
+
+def _rebuild_indexes():
+    for indexes, entities in ((student_indexes, students), (instructor_indexes, instructors), (course_indexes, courses)):
+        for index in indexes.values():
+            index.rebuild(entities)
+
+def _index_add(indexes: dict, entity_id: int, entity) -> None:
+    for index in indexes.values():
+        index.add(entity_id, entity)
+
+def _index_remove(indexes: dict, entity_id: int, entity) -> None:
+    for index in indexes.values():
+        index.remove(entity_id, entity)
+
+_rebuild_indexes()
+
+course_names = {}
+
+def _rebuild_course_names():
+    course_names.clear()
+    course_names.update((course_id, course.name) for course_id, course in courses.items())
+
+def _resolve_course_names(course_ids) -> list:
+    return [course_names[course_id] for course_id in course_ids if course_id in course_names]
+
+_rebuild_course_names()
+
+events = EventBus()
+registry_lock = ReadWriteLock()
+enrollment_locks = LockStripes()
+schedule_lock = threading.Lock()
+concurrent = False
+
+student_schedules = {}
+instructor_schedules = {}
+
+def _schedule_locked():
+    return schedule_lock if concurrent else unlocked()
+
+def _schedule_add(schedules: dict, person_id: int, course: Course) -> None:
+    if course.meetings:
+        with _schedule_locked():
+            tree = schedules.setdefault(person_id, IntervalTree())
+            for start, end in course.meetings:
+                tree.add(start, end, course.course_id)
+
+def _schedule_remove(schedules: dict, person_id: int, course: Course) -> None:
+    if course.meetings:
+        with _schedule_locked():
+            tree = schedules.get(person_id)
+            if tree is not None:
+                for start, end in course.meetings:
+                    tree.remove(start, end, course.course_id)
+
+def _schedule_reserve(schedules: dict, person_id: int, course: Course) -> list:
+    """
+    This function puts the course on the person's schedule unless it clashes with another course
+    there, and returns the IDs of the clashing courses. The check and the booking happen under
+    one lock, so a waitlist promotion and an enrollment of the same person cannot both pass it.
+    """
+    if not course.meetings:
+        return []
+    with _schedule_locked():
+        tree = schedules.setdefault(person_id, IntervalTree())
+        clashes = {course_id for start, end in course.meetings for course_id in tree.overlapping(start, end)}
+        clashes.discard(course.course_id)
+        if not clashes:
+            for start, end in course.meetings:
+                tree.add(start, end, course.course_id)
+    return sorted(clashes)
+
+def _schedule_conflicts(schedules: dict, person_id: int, course: Course) -> list:
+    """
+    This function returns the IDs of the courses on the person's schedule that meet at the same
+    time as the given course, with one interval tree lookup per meeting of the course.
+    """
+    if not course.meetings:
+        return []
+    with _schedule_locked():
+        tree = schedules.get(person_id)
+        if tree is None:
+            return []
+        clashes = {course_id for start, end in course.meetings for course_id in tree.overlapping(start, end)}
+    clashes.discard(course.course_id)
+    return sorted(clashes)
+
+def _rebuild_schedules():
+    student_schedules.clear()
+    instructor_schedules.clear()
+    for course in courses.values():
+        for student_id in course.students:
+            _schedule_add(student_schedules, student_id, course)
+        for instructor_id in course.instructors:
+            _schedule_add(instructor_schedules, instructor_id, course)
+
+_rebuild_schedules()
+
+statistics = EnrollmentStatistics()
+statistics.attach(events, immediate=True)
+
+def _statistics_source() -> tuple:
+    # Walks every roster, so callers must hold the registry exclusively in concurrency mode.
+    people = [("student", student_id, student.age) for student_id, student in students.items()]
+    people += [("instructor", instructor_id, instructor.age) for instructor_id, instructor in instructors.items()]
+    memberships = [("student", student_id, course_id) for course_id, course in courses.items() for student_id in course.students]
+    memberships += [("instructor", instructor_id, course_id) for course_id, course in courses.items() for instructor_id in course.instructors]
+    return people, list(courses), memberships
+
+statistics.load(*_statistics_source())
+
+recommender = CoEnrollmentRecommender()
+recommender.attach(events, immediate=True)
+recommender.build((student_id, course_id) for course_id, course in courses.items() for student_id in course.students)
+
+
+"""
+CONCURRENCY
+"""
+
+def set_concurrency_mode(enabled: bool, stripes: int = 64) -> tuple:
+    """
+    In concurrency mode reads share the registry lock, registrations and deletions hold it
+    exclusively, and enrollment changes only lock the stripes of the course and person involved.
+    Reads then return snapshots instead of the live dictionaries. Change events of a mutation are
+    delivered once its locks are released, except to the statistics and the recommender, which
+    are updated under them so two threads' changes to one enrollment reach them in order.
+    """
+    global concurrent, enrollment_locks
+    with registry_lock.write_locked():
+        enrollment_locks = LockStripes(stripes)
+        concurrent = enabled
+    return {"message": f'Concurrency mode {"enabled" if enabled else "disabled"}'}, 200
+
+def _read_locked(function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if not concurrent:
+            return function(*args, **kwargs)
+        with registry_lock.read_locked():
+            return function(*args, **kwargs)
+    return wrapper
+
+def _write_locked(function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        with events.batch():
+            if not concurrent:
+                return function(*args, **kwargs)
+            with registry_lock.write_locked():
+                return function(*args, **kwargs)
+    return wrapper
+
+def _enrollment_locked(person: str):
+    def decorator(function):
+        @wraps(function)
+        def wrapper(person_id, course_id, *args, **kwargs):
+            with events.batch():
+                if not concurrent:
+                    return function(person_id, course_id, *args, **kwargs)
+                with registry_lock.read_locked(), enrollment_locks.locked(("course", course_id), (person, person_id)):
+                    return function(person_id, course_id, *args, **kwargs)
+        return wrapper
+    return decorator
+
+def _course_locked(function):
+    @wraps(function)
+    def wrapper(course_id, *args, **kwargs):
+        with events.batch():
+            if not concurrent:
+                return function(course_id, *args, **kwargs)
+            with registry_lock.read_locked(), enrollment_locks.locked(("course", course_id)):
+                return function(course_id, *args, **kwargs)
+    return wrapper
+
+def _roster_locked(course_id: int):
+    if not concurrent:
+        return unlocked()
+    return enrollment_locks.locked(("course", course_id))
+
+def _rosters() -> list:
+    """
+    This function returns a (course, student IDs, instructor IDs) triple for every course. Each
+    roster is copied under its course's stripe lock, since enrollments change it without the
+    registry write lock.
+    """
+    rosters = []
+    for course in courses.values():
+        with _roster_locked(course.course_id):
+            rosters.append((course, list(course.students), list(course.instructors)))
+    return rosters
+
+def _snapshot(collection):
+    return copy.copy(collection) if concurrent else collection
+
+def _promote_waitlisted(course: Course) -> None:
+    """
+    This function fills free seats from the waitlist, passing over students whose schedule
+    clashes with the course; they stay queued for a later seat.
+    """
+    for student in course.promote_waitlisted(lambda student: not _schedule_reserve(student_schedules, student.student_id, course)):
+        events.publish(ChangeEvent(ENROLLED, "student", student.student_id, course.course_id, student))
+
+def _batch_response(results: list, action: str) -> tuple:
+    applied = sum(1 for result in results if result["status"] == 200)
+    return {"message": f'{applied} of {len(results)} {action}', "results": results}, 200
+
+class _QueryScope:
+    def __init__(self, collection: dict, indexes: dict, roster):
+        self.collection = collection
+        self.indexes = indexes
+        self.roster = roster
+
+    def all_ids(self) -> set:
+        return set(self.collection)
+
+    def age_between(self, low, high) -> set:
+        return set(self.indexes["age"].ids_between(low, high))
+
+    def equals(self, attribute: str, value) -> set:
+        if attribute == "id":
+            return {value} & self.collection.keys()
+        if attribute == "name":
+            return set(self.indexes["name"].ids_between(value, value))
+        return {entity_id for entity_id, entity in self.collection.items() if entity._email == value}
+
+    def enrolled_in(self, course_id: int) -> set:
+        if course_id not in courses:
+            return set()
+        with _roster_locked(course_id):
+            return set(self.roster(courses[course_id]))
+
+def _stream(collection: dict, ids: set):
+    for entity_id in sorted(ids):
+        entity = collection.get(entity_id)
+        if entity is not None:
+            yield entity
+
+def _list_page(collection: dict, indexes: dict, label: str, sort_by: str, limit: int, cursor: str) -> tuple:
+    if sort_by not in indexes:
+        return {"message": "Invalid sort key"}, 400
+    if limit <= 0:
+        return {"message": "Invalid page size"}, 400
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor, sort_by)
+        if after is None:
+            return {"message": "Invalid cursor"}, 400
+    entries = indexes[sort_by].page(after, limit + 1)
+    next_cursor = encode_cursor(sort_by, *entries[limit - 1]) if len(entries) > limit else None
+    return {label: [collection[entity_id] for _, entity_id in entries[:limit]], "next_cursor": next_cursor}, 200
+
+@_write_locked
+def restore(new_students: dict, new_instructors: dict, new_courses: dict, data_directory: str = None) -> tuple:
+    global students, instructors, courses, ids
+    students, instructors, courses = new_students, new_instructors, new_courses
+    if data_directory is not None:
+        ids = IdAllocator(data_directory)
+    _reserve_existing_ids()
+    _rebuild_indexes()
+    _rebuild_course_names()
+    _rebuild_schedules()
+    statistics.load(*_statistics_source())
+    recommender.build((student_id, course_id) for course_id, course in courses.items() for student_id in course.students)
+    return {"message": "Session restored successfully"}, 200
 
 
 """
 STUDENT CONTROLLERS
 """
 
+@_write_locked
 def register_student(name: str, age: int, email: str) -> tuple:
-    global students, student_id
+    global students
     if validator.validate_email(email) and validator.validate_age(age):
+        student_id = ids.next_id("student")
         student = Student(name, age, email, student_id)
         students[student_id] = student
-        student_id += 1
-        return {"message": f'Student with ID {student_id - 1} registered successfully', "student": student}, 200
+        _index_add(student_indexes, student_id, student)
+        events.publish(ChangeEvent(CREATED, "student", student_id, payload=student))
+        return {"message": f'Student with ID {student_id} registered successfully', "student": student}, 200
     return {"message": "Invalid email or age"}, 400
 
+@_enrollment_locked("student")
 def add_student_to_course(student_id: int, course_id: int) -> tuple:
     global students, courses
     if student_id in students and course_id in courses:
         student = students[student_id]
         course = courses[course_id]
-        course.add_student(student)
+        if student_id not in course.students:
+            conflicts = _schedule_reserve(student_schedules, student_id, course)
+            if conflicts:
+                return {"message": "Course clashes with the student's schedule", "conflicts": conflicts}, 409
+            if not course.add_student(student):
+                _schedule_remove(student_schedules, student_id, course)
+                position = course.join_waitlist(student)
+                return {"message": "Course is full, student added to waitlist", "position": position}, 202
+            events.publish(ChangeEvent(ENROLLED, "student", student_id, course_id, student))
         return {"message": "Student added to course successfully"}, 200
     return {"message": "Student or course not found"}, 404
 
+@_enrollment_locked("student")
 def remove_student_from_course(student_id: int, course_id: int) -> tuple:
     global students, courses
     if student_id in students and course_id in courses:
         student = students[student_id]
         course = courses[course_id]
         if course.remove_student(student):
+            _schedule_remove(student_schedules, student_id, course)
+            events.publish(ChangeEvent(UNENROLLED, "student", student_id, course_id, student))
+            _promote_waitlisted(course)
             return {"message": "Student removed from course successfully"}, 200
+        if course.leave_waitlist(student):
+            return {"message": "Student removed from waitlist"}, 200
         return {"message": "Student is not registered in course"}, 400
     return {"message": "Student or course not found"}, 404
 
+@_write_locked
 def remove_student(student_id: int) -> tuple:
     global students
     if student_id in students:
         student = students[student_id]
-        for course_id in student.registered_courses:
+        for course_id in list(student.registered_courses):
             course = courses[course_id]
             course.remove_student(student)
+            events.publish(ChangeEvent(UNENROLLED, "student", student_id, course_id, student))
+            _promote_waitlisted(course)
+        for course in courses.values():
+            course.leave_waitlist(student)
+        student_schedules.pop(student_id, None)
+        _index_remove(student_indexes, student_id, student)
         del students[student_id]
+        events.publish(ChangeEvent(DELETED, "student", student_id, payload=student))
         return {"message": "Student deleted successfully"}, 200
     return {"message": "Student not found"}, 404
 
+@_read_locked
 def get_students():
     global students
-    return {"students": students}, 200
+    return {"students": _snapshot(students)}, 200
 
+@_read_locked
+def list_students(sort_by: str = "name", limit: int = 50, cursor: str = None) -> tuple:
+    global students
+    return _list_page(students, student_indexes, "students", sort_by, limit, cursor)
+
+@_read_locked
+def query_students(filter) -> tuple:
+    global students
+    matches = filter.ids(_QueryScope(students, student_indexes, lambda course: course.students))
+    return {"students": _stream(students, matches)}, 200
+
+@_read_locked
 def get_students_by_course(course_id: int) -> dict:
     global courses
     if course_id in courses:
         course = courses[course_id]
-        return {"students": course.students}, 200
+        with _roster_locked(course_id):
+            return {"students": _snapshot(course.students)}, 200
     return {"message": "Course not found"}, 404
 
+@_read_locked
 def get_student_courses(course_ids: list) -> dict:
-    global courses
-    courses_list = []
-    for course_id in course_ids:
-        if course_id in courses:
-            courses_list.append(courses[course_id].name)
-    return {"courses": courses_list}, 200
+    return {"courses": _resolve_course_names(course_ids)}, 200
 
+@_read_locked
 def get_student_id_by_name(student_name: str) -> dict:
     global students
     for student in students.values():
@@ -86,6 +419,17 @@ def get_student_id_by_name(student_name: str) -> dict:
             return {"student_id": student.student_id}, 200
     return {"message": "Student not found"}, 404
 
+@_read_locked
+def recommend_courses(student_id: int, k: int = 5) -> tuple:
+    """
+    This function suggests up to k courses taken by students who share courses with this student.
+    """
+    global students
+    if student_id not in students:
+        return {"message": "Student not found"}, 404
+    return {"courses": [{"course_id": course_id, "score": score} for course_id, score in recommender.recommend(student_id, k)]}, 200
+
+@_read_locked
 def search_students(search_type: str, search_term: str) -> dict:
     global students
     results = []
@@ -109,62 +453,153 @@ def search_students(search_type: str, search_term: str) -> dict:
         return {"message": "Invalid search type"}, 400
     return {"students": results}, 200
 
+@_write_locked
+def enroll_many(course_id: int, student_ids: list) -> tuple:
+    global students, courses
+    if course_id not in courses:
+        return {"message": "Course not found"}, 404
+    course = courses[course_id]
+    results, batch, seen = [], [], set()
+    for student_id in student_ids:
+        if student_id in seen:
+            results.append({"student_id": student_id, "message": "Student appears twice in batch", "status": 400})
+        elif student_id not in students:
+            results.append({"student_id": student_id, "message": "Student not found", "status": 404})
+        elif student_id in course.students:
+            results.append({"student_id": student_id, "message": "Student is already registered in course", "status": 400})
+        else:
+            conflicts = _schedule_conflicts(student_schedules, student_id, course)
+            if conflicts:
+                results.append({"student_id": student_id, "message": "Course clashes with the student's schedule", "conflicts": conflicts, "status": 409})
+            else:
+                batch.append(students[student_id])
+                results.append({"student_id": student_id, "message": "Student added to course successfully", "status": 200})
+        seen.add(student_id)
+    admitted = {result["student_id"]: result for result in results if result["status"] == 200}
+    for student in batch:
+        if course.add_student(student):
+            _schedule_add(student_schedules, student.student_id, course)
+            events.publish(ChangeEvent(ENROLLED, "student", student.student_id, course_id, student))
+        else:
+            position = course.join_waitlist(student)
+            admitted[student.student_id].update({"message": "Course is full, student added to waitlist", "position": position, "status": 202})
+    return _batch_response(results, "students added to course")
+
+@_write_locked
+def unenroll_many(course_id: int, student_ids: list) -> tuple:
+    global students, courses
+    if course_id not in courses:
+        return {"message": "Course not found"}, 404
+    course = courses[course_id]
+    results, batch, seen = [], [], set()
+    for student_id in student_ids:
+        if student_id in seen:
+            results.append({"student_id": student_id, "message": "Student appears twice in batch", "status": 400})
+        elif student_id not in students:
+            results.append({"student_id": student_id, "message": "Student not found", "status": 404})
+        elif student_id not in course.students:
+            results.append({"student_id": student_id, "message": "Student is not registered in course", "status": 400})
+        else:
+            batch.append(students[student_id])
+            results.append({"student_id": student_id, "message": "Student removed from course successfully", "status": 200})
+        seen.add(student_id)
+    for student in batch:
+        course.remove_student(student)
+        _schedule_remove(student_schedules, student.student_id, course)
+        events.publish(ChangeEvent(UNENROLLED, "student", student.student_id, course_id, student))
+    _promote_waitlisted(course)
+    return _batch_response(results, "students removed from course")
+
+
 
 """
 INSTRUCTOR CONTROLLERS
 """
 
 
+@_write_locked
 def register_instructor(name: str, age: int, email: str) -> Instructor:
-    global instructors, instructor_id
+    global instructors
     if validator.validate_email(email) and validator.validate_age(age):
+        instructor_id = ids.next_id("instructor")
         instructor = Instructor(name, age, email, instructor_id)
         instructors[instructor_id] = instructor
-        instructor_id += 1
-        return {"message": f'Instructor with ID {instructor_id - 1} registered successfully', "instructor": instructor}, 200
+        _index_add(instructor_indexes, instructor_id, instructor)
+        events.publish(ChangeEvent(CREATED, "instructor", instructor_id, payload=instructor))
+        return {"message": f'Instructor with ID {instructor_id} registered successfully', "instructor": instructor}, 200
     return {"message": "Invalid email or age"}, 400
 
+@_enrollment_locked("instructor")
 def add_instructor_to_course(instructor_id: int, course_id: int) -> tuple:
     global instructors, courses
     if instructor_id in instructors and course_id in courses:
         instructor = instructors[instructor_id]
         course = courses[course_id]
-        course.add_instructor(instructor)
+        if instructor_id not in course.instructors:
+            conflicts = _schedule_conflicts(instructor_schedules, instructor_id, course)
+            if conflicts:
+                return {"message": "Course clashes with the instructor's schedule", "conflicts": conflicts}, 409
+            course.add_instructor(instructor)
+            _schedule_add(instructor_schedules, instructor_id, course)
+            events.publish(ChangeEvent(ENROLLED, "instructor", instructor_id, course_id, instructor))
         return {"message": "Instructor added to course successfully"}, 200
     return {"message": "Instructor or course not found"}, 404
 
+@_enrollment_locked("instructor")
 def remove_instructor_from_course(instructor_id: int, course_id: int) -> tuple:
     global instructors, courses
     if instructor_id in instructors and course_id in courses:
         instructor = instructors[instructor_id]
         course = courses[course_id]
         if course.remove_instructor(instructor):
+            _schedule_remove(instructor_schedules, instructor_id, course)
+            events.publish(ChangeEvent(UNENROLLED, "instructor", instructor_id, course_id, instructor))
             return {"message": "Instructor removed from course successfully"}, 200
         return {"message": "Instructor is not registered in course"}, 400
     return {"message": "Instructor or course not found"}, 404
 
+@_write_locked
 def remove_instructor(instructor_id: int) -> tuple:
     global instructors
     if instructor_id in instructors:
         instructor = instructors[instructor_id]
-        for course_id in instructor.assigned_courses:
+        for course_id in list(instructor.assigned_courses):
             course = courses[course_id]
             course.remove_instructor(instructor)
+            events.publish(ChangeEvent(UNENROLLED, "instructor", instructor_id, course_id, instructor))
+        instructor_schedules.pop(instructor_id, None)
+        _index_remove(instructor_indexes, instructor_id, instructor)
         del instructors[instructor_id]
+        events.publish(ChangeEvent(DELETED, "instructor", instructor_id, payload=instructor))
         return {"message": "Instructor deleted successfully"}, 200
     return {"message": "Instructor not found"}, 404
 
+@_read_locked
 def get_instructors() -> dict:
     global instructors
-    return {"instructors": instructors}, 200
+    return {"instructors": _snapshot(instructors)}, 200
+
+@_read_locked
+def list_instructors(sort_by: str = "name", limit: int = 50, cursor: str = None) -> tuple:
+    global instructors
+    return _list_page(instructors, instructor_indexes, "instructors", sort_by, limit, cursor)
+
+@_read_locked
+def query_instructors(filter) -> tuple:
+    global instructors
+    matches = filter.ids(_QueryScope(instructors, instructor_indexes, lambda course: course.instructors))
+    return {"instructors": _stream(instructors, matches)}, 200
 
+@_read_locked
 def get_instructors_by_course(course_id: int) -> dict:
     global courses
     if course_id in courses:
         course = courses[course_id]
-        return {"instructors": course.instructors}, 200
+        with _roster_locked(course_id):
+            return {"instructors": _snapshot(course.instructors)}, 200
     return {"message": "Course not found"}, 404
 
+@_read_locked
 def search_instructors(search_type: str, search_term: str) -> dict:
     global instructors
     results = []
@@ -188,6 +623,7 @@ def search_instructors(search_type: str, search_term: str) -> dict:
         return {"message": "Invalid search type"}, 400
     return {"instructors": results}, 200
 
+@_read_locked
 def get_instructor_id_by_name(instructor_name: str) -> dict:
     global instructors
     for instructor in instructors.values():
@@ -195,13 +631,53 @@ def get_instructor_id_by_name(instructor_name: str) -> dict:
             return {"instructor_id": instructor.instructor_id}, 200
     return {"message": "Instructor not found"}, 404
 
+@_read_locked
 def get_instructor_courses(course_ids: list) -> dict:
-    global courses
-    courses_list = []
-    for course_id in course_ids:
-        if course_id in courses:
-            courses_list.append(courses[course_id].name)
-    return {"courses": courses_list}, 200
+    return {"courses": _resolve_course_names(course_ids)}, 200
+
+@_write_locked
+def assign_many(course_id: int, instructor_ids: list) -> tuple:
+    global instructors, courses
+    if course_id not in courses:
+        return {"message": "Course not found"}, 404
+    course = courses[course_id]
+    results, batch, seen = [], [], set()
+    for instructor_id in instructor_ids:
+        if instructor_id in seen:
+            results.append({"instructor_id": instructor_id, "message": "Instructor appears twice in batch", "status": 400})
+        elif instructor_id not in instructors:
+            results.append({"instructor_id": instructor_id, "message": "Instructor not found", "status": 404})
+        elif instructor_id in course.instructors:
+            results.append({"instructor_id": instructor_id, "message": "Instructor is already assigned to course", "status": 400})
+        else:
+            conflicts = _schedule_conflicts(instructor_schedules, instructor_id, course)
+            if conflicts:
+                results.append({"instructor_id": instructor_id, "message": "Course clashes with the instructor's schedule", "conflicts": conflicts, "status": 409})
+            else:
+                batch.append(instructors[instructor_id])
+                results.append({"instructor_id": instructor_id, "message": "Instructor added to course successfully", "status": 200})
+        seen.add(instructor_id)
+    for instructor in batch:
+        course.add_instructor(instructor)
+        _schedule_add(instructor_schedules, instructor.instructor_id, course)
+        events.publish(ChangeEvent(ENROLLED, "instructor", instructor.instructor_id, course_id, instructor))
+    return _batch_response(results, "instructors added to course")
+
+
+@_read_locked
+def _person_records() -> list:
+    global students, instructors
+    records = [("student", student_id, student.name, student.age, student._email) for student_id, student in students.items()]
+    records += [("instructor", instructor_id, instructor.name, instructor.age, instructor._email) for instructor_id, instructor in instructors.items()]
+    return records
+
+def find_duplicate_people(threshold: float = 0.8) -> tuple:
+    """
+    This function lists students and instructors that are probably the same person, comparing
+    only people who share a blocking key (see dedup.py), with a score for each candidate pair.
+    The people are copied under the registry lock and compared after it is released.
+    """
+    return {"candidates": find_duplicates(_person_records(), threshold)}, 200
 
 
 """
@@ -209,13 +685,22 @@ COURSE CONTROLLERS
 """
 
 
-def add_course(name: str, description: str) -> Course:
-    global courses, course_id
-    course = Course(name, description,  course_id)
+@_write_locked
+def add_course(name: str, description: str, capacity: int = None, meetings: list = None) -> Course:
+    global courses
+    if capacity is not None and capacity < 0:
+        return {"message": "Invalid capacity"}, 400
+    if meetings and not valid_meetings(meetings):
+        return {"message": "Invalid meeting time"}, 400
+    course_id = ids.next_id("course")
+    course = Course(name, description,  course_id, capacity, meetings)
     courses[course_id] = course
-    course_id += 1
-    return {"message": f'Course with ID {course_id - 1} added successfully', "course": course}, 200
+    _index_add(course_indexes, course_id, course)
+    course_names[course_id] = name
+    events.publish(ChangeEvent(CREATED, "course", course_id, payload=course))
+    return {"message": f'Course with ID {course_id} added successfully', "course": course}, 200
 
+@_write_locked
 def remove_course(course_id: int) -> tuple:
     global courses
     if course_id in courses:
@@ -223,17 +708,125 @@ def remove_course(course_id: int) -> tuple:
         for student_id in course.students:
             student = course.students[student_id]
             student._unregister_course(course_id)
+            _schedule_remove(student_schedules, student_id, course)
+            events.publish(ChangeEvent(UNENROLLED, "student", student_id, course_id, student))
         for instructor_id in course.instructors:
             instructor = course.instructors[instructor_id]
             instructor._remove_course(course_id)
+            _schedule_remove(instructor_schedules, instructor_id, course)
+            events.publish(ChangeEvent(UNENROLLED, "instructor", instructor_id, course_id, instructor))
+        _index_remove(course_indexes, course_id, course)
+        del course_names[course_id]
         del courses[course_id]
+        events.publish(ChangeEvent(DELETED, "course", course_id, payload=course))
         return {"message": "Course deleted successfully"}, 200
     return {"message": "Course not found"}, 404
 
+@_course_locked
+def set_course_capacity(course_id: int, capacity: int = None) -> tuple:
+    global courses
+    if capacity is not None and capacity < 0:
+        return {"message": "Invalid capacity"}, 400
+    if course_id not in courses:
+        return {"message": "Course not found"}, 404
+    course = courses[course_id]
+    course.capacity = capacity
+    events.publish(ChangeEvent(UPDATED, "course", course_id, payload=course))
+    _promote_waitlisted(course)
+    return {"message": "Course capacity updated successfully"}, 200
+
+@_write_locked
+def set_course_meetings(course_id: int, meetings: list) -> tuple:
+    """
+    This function replaces the meeting times of a course. People already on the course keep it even
+    if the new times clash with their other courses; find_schedule_conflicts() reports those.
+    """
+    global courses
+    if not valid_meetings(meetings):
+        return {"message": "Invalid meeting time"}, 400
+    if course_id not in courses:
+        return {"message": "Course not found"}, 404
+    course = courses[course_id]
+    for student_id in course.students:
+        _schedule_remove(student_schedules, student_id, course)
+    for instructor_id in course.instructors:
+        _schedule_remove(instructor_schedules, instructor_id, course)
+    course.meetings = list(meetings)
+    for student_id in course.students:
+        _schedule_add(student_schedules, student_id, course)
+    for instructor_id in course.instructors:
+        _schedule_add(instructor_schedules, instructor_id, course)
+    events.publish(ChangeEvent(UPDATED, "course", course_id, payload=course))
+    return {"message": "Course meetings updated successfully"}, 200
+
+@_read_locked
+def find_schedule_conflicts() -> tuple:
+    """
+    This function reports every student and instructor booked into two courses that meet at the
+    same time, as {"student_id"/"instructor_id", "courses"} entries.
+    """
+    global courses
+    student_meetings, instructor_meetings = [], []
+    for course, student_ids, instructor_ids in _rosters():
+        for start, end in course.meetings:
+            student_meetings.extend((start, end, student_id, course.course_id) for student_id in student_ids)
+            instructor_meetings.extend((start, end, instructor_id, course.course_id) for instructor_id in instructor_ids)
+    return {
+        "students": [{"student_id": person_id, "courses": [first, second]} for person_id, first, second in find_conflicts(student_meetings)],
+        "instructors": [{"instructor_id": person_id, "courses": [first, second]} for person_id, first, second in find_conflicts(instructor_meetings)],
+    }, 200
+
+def get_statistics(top: int = 10) -> tuple:
+    """
+    This function returns the dashboard counters kept up to date by the statistics module,
+    without scanning students or courses.
+    """
+    return statistics.summary(top), 200
+
+@_write_locked
+def verify_statistics() -> tuple:
+    """
+    This function recomputes the statistics from scratch and compares them with the live counters.
+    It holds the registry exclusively, so no enrollment changes a roster while it is read and the
+    live counters are compared with the same state.
+    """
+    recomputed = EnrollmentStatistics()
+    recomputed.load(*_statistics_source())
+    differences = statistics.differences(recomputed)
+    if differences:
+        return {"message": "Statistics are out of date", "differences": differences}, 500
+    return {"message": "Statistics are up to date"}, 200
+
+@_read_locked
+def similar_courses(course_id: int, k: int = 5) -> tuple:
+    global courses
+    if course_id not in courses:
+        return {"message": "Course not found"}, 404
+    return {"courses": [{"course_id": other, "shared_students": shared} for other, shared in recommender.similar_courses(course_id, k)]}, 200
+
+@_read_locked
+def get_waitlist(course_id: int) -> tuple:
+    global courses
+    if course_id not in courses:
+        return {"message": "Course not found"}, 404
+    with _roster_locked(course_id):
+        return {"waitlist": list(courses[course_id].waitlist.values())}, 200
+
+@_read_locked
 def get_courses() -> dict:
     global courses
-    return {"courses": courses}, 200
+    return {"courses": _snapshot(courses)}, 200
+
+@_read_locked
+def list_courses(sort_by: str = "name", limit: int = 50, cursor: str = None) -> tuple:
+    global courses
+    return _list_page(courses, course_indexes, "courses", sort_by, limit, cursor)
+
+@_read_locked
+def resolve_course_names(course_id_lists: list) -> tuple:
+    return {"courses": [_resolve_course_names(course_ids) for course_ids in course_id_lists]}, 200
 
+@_read_locked
 def get_course_id_by_name(course_name: str) -> dict:
     global courses
     for course in courses.values():
@@ -241,6 +834,7 @@ def get_course_id_by_name(course_name: str) -> dict:
             return {"course_id": course.course_id}, 200
     return {"message": "Course not found"}, 404
 
+@_read_locked
 def search_courses(search_type: str, search_term: str) -> dict:
     global courses
     results = []
@@ -255,9 +849,12 @@ def search_courses(search_type: str, search_term: str) -> dict:
             results = [courses[course_id]]
     else:
         return {"message": "Invalid search type"}, 400
-    return {"courses": courses}, 200
+    return {"courses": results}, 200
     
 
 def terminate() -> tuple:
     global students, instructors, courses
-    return students, instructors, courses
\ No newline at end of file
+    if concurrent:
+        with registry_lock.write_locked():
+            return copy.deepcopy((students, instructors, courses))
+    return students, instructors, courses
@@ -1,32 +1,299 @@
+import atexit
+import json
 import sqlite3
 import os
-from src.utils.data_validator import DataValidator
-from src.components.student import Student
-from src.components.instructor import Instructor
-from src.components.course import Course
+import re
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from src_ruba.utils.data_validator import DataValidator
+from src_ruba.utils.pagination import encode_cursor, decode_cursor
+from src_ruba.utils.events import EventBus, ChangeEvent, CREATED, UPDATED, DELETED, ENROLLED, UNENROLLED
+from src_ruba.utils.schedule import find_conflicts, valid_meetings
+from src_ruba.utils.statistics import EnrollmentStatistics
+from src_ruba.utils.recommendations import CoEnrollmentRecommender
+from src_ruba.utils.dedup import find_duplicates
+from src_ruba.utils.db_pool import ConnectionPool
+from src_ruba.utils.group_commit import GroupCommitWriter
+from src_ruba.utils.working_copy import WorkingCopy
+from src_ruba.utils.read_cache import ReadCache, MISSING
+from src_ruba.utils.migrations import migrate, unindexed_queries
+from src_ruba.components.student import Student
+from src_ruba.components.instructor import Instructor
+from src_ruba.components.course import Course
 
 validator = DataValidator()
+events = EventBus()
+statistics = EnrollmentStatistics()
+statistics.attach(events)
+recommender = CoEnrollmentRecommender()
+recommender.attach(events)
+
+DATABASE = 'school_management_system.db'
+
+_pool = None
+_pool_lock = threading.Lock()
+_writer = None
+_working_copy = None
+_read_cache = None
+_read_cache_token = None
 
 def initialize_database():
-    db_file = 'school_management_system.db'
-    db_exists = os.path.exists(db_file)
+    db_exists = os.path.exists(DATABASE)
     
     conn = get_db_connection()
+    try:
+        create_tables(conn)
+        statistics.load(*_statistics_source(conn))
+        recommender.build(conn.execute('''
+            SELECT r.student_id, r.course_id FROM registrations r
+            JOIN students s ON s.id = r.student_id JOIN courses c ON c.id = r.course_id
+        '''))
+    finally:
+        conn.close()
 
     if not db_exists:
-        create_tables(conn)
         return {"message": "Database created and initialized successfully"}, 200
     else:
         return {"message": "Database already exists"}, 200
 
 def get_db_connection():
-    conn = sqlite3.connect('school_management_system.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    """
+    This function borrows the calling thread's persistent connection to DATABASE from the
+    connection pool. Calling close() on it gives it back; the connection stays open.
+    """
+    global _pool
+    working_copy = _working_copy
+    if working_copy is not None:
+        return working_copy.pool.acquire()
+    pool = _pool
+    if pool is None or pool.path != DATABASE:
+        with _pool_lock:
+            if _pool is None or _pool.path != DATABASE:
+                if _pool is not None:
+                    _pool.close_all()
+                _pool = ConnectionPool(DATABASE)
+            pool = _pool
+    return pool.acquire()
+
+def close_connections():
+    """
+    This function closes every pooled connection, after flushing and closing the working copy if
+    memory mode is on. It runs at interpreter exit; the next call to get_db_connection() opens
+    new ones.
+    """
+    global _pool
+    if _writer is not None:
+        set_write_serialization(False)
+    if _working_copy is not None:
+        set_memory_mode(False)
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
+
+atexit.register(close_connections)
+
+def set_memory_mode(enabled: bool, max_data_loss: float = 5.0) -> tuple:
+    """
+    In memory mode DATABASE is loaded into an in-memory working copy and every controller reads
+    and writes the copy instead of the file. The copy is flushed to the file every
+    max_data_loss seconds when it has changed, by flush_working_copy() and when memory mode is
+    turned off, which also happens at interpreter exit; a crash loses at most the writes of the
+    last max_data_loss seconds. No other process should write to the file meanwhile.
+    """
+    global _pool, _working_copy
+    with _pool_lock:
+        if _working_copy is not None:
+            _working_copy.close()
+            _working_copy = None
+        if enabled:
+            if _pool is not None:
+                _pool.close_all()
+                _pool = None
+            _working_copy = WorkingCopy(DATABASE, max_data_loss)
+    return {"message": f'Memory mode {"enabled" if enabled else "disabled"}'}, 200
+
+def flush_working_copy():
+    working_copy = _working_copy
+    if working_copy is None:
+        return {"message": "Memory mode is not enabled"}, 400
+    if working_copy.flush():
+        return {"message": "Working copy flushed to disk"}, 200
+    return {"message": "Working copy has no unflushed changes"}, 200
+
+@contextmanager
+def unit_of_work():
+    """
+    This function opens a unit of work for the calling thread. Controller calls inside the with
+    block join one transaction instead of committing one by one, each in its own savepoint, so
+    a call that fails or returns an error status is undone on its own and the others stand.
+    The unit is committed when the block ends and rolled back if it raises; change events are
+    delivered after the commit and dropped on rollback. A nested unit of work is a savepoint of
+    the outer one, which lets a group of calls be rolled back together.
+    """
+    conn = get_db_connection()
+    outermost = conn.savepoints is None
+    try:
+        with events.batch():
+            mark = events.mark()
+            conn.begin()
+            if outermost:
+                conn.savepoints = []
+            committed = False
+            try:
+                yield conn
+                if outermost:
+                    conn.savepoints = None
+                conn.commit()
+                committed = True
+            finally:
+                if not committed:
+                    if outermost:
+                        conn.savepoints = None
+                    conn.rollback()
+                    events.rollback_to(mark)
+    finally:
+        conn.close()
+
+def run_in_unit_of_work(work, *args, **kwargs):
+    """
+    This function calls work(*args, **kwargs) inside a unit of work and returns its result. It
+    lets callers on other threads, like the asyncio facade, hand over a compound edit.
+    """
+    with unit_of_work():
+        return work(*args, **kwargs)
+
+def set_write_serialization(enabled: bool, max_batch: int = 64, max_delay: float = 0.0) -> tuple:
+    """
+    With write serialization on, the write controllers no longer open their own transactions:
+    each call is queued for a single writer thread, which commits the writes queued together (up
+    to max_batch, and waiting up to max_delay seconds for more) in one transaction, and the
+    caller waits until its batch has committed. Concurrent writers then share commits instead of queueing for the write
+    lock. Writes made inside a unit of work run on the caller's transaction as before.
+    Serialization is per process; other processes still take the write lock as usual.
+    """
+    global _writer
+    with _pool_lock:
+        writer, _writer = _writer, None
+        if enabled:
+            _writer = GroupCommitWriter(unit_of_work, max_batch, max_delay)
+            _writer.start()
+    if writer is not None:
+        writer.stop()
+    return {"message": f'Write serialization {"enabled" if enabled else "disabled"}'}, 200
+
+def _in_unit_of_work() -> bool:
+    conn = get_db_connection()
+    try:
+        return conn.savepoints is not None
+    finally:
+        conn.close()
+
+def _serialized(function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        writer = _writer
+        if writer is None or writer.is_writer_thread() or _in_unit_of_work():
+            return function(*args, **kwargs)
+        try:
+            future = writer.submit(function, *args, **kwargs)
+        except RuntimeError:
+            # Serialization was turned off after the writer was looked up.
+            return function(*args, **kwargs)
+        return future.result()
+    return wrapper
+
+def set_read_cache(enabled: bool, maxsize: int = 256) -> tuple:
+    """
+    With the read cache on, the get_*, list_* and search_* controllers remember up to maxsize
+    results and answer repeated calls without touching SQLite while the tables they read are
+    unchanged. Each call gets its own dicts and lists, but the Student, Instructor and Course
+    objects in them are shared between callers and must not be modified. Writes invalidate through the change events, which are delivered once they have
+    committed; reads inside a unit of work or an event batch bypass the cache. The cache only
+    sees writes made through this process.
+    """
+    global _read_cache, _read_cache_token
+    with _pool_lock:
+        if _read_cache is not None:
+            events.unsubscribe(_read_cache_token)
+            _read_cache = _read_cache_token = None
+        if enabled:
+            cache = ReadCache(maxsize)
+            _read_cache_token = cache.attach(events, _changed_tables)
+            _read_cache = cache
+    return {"message": f'Read cache {"enabled" if enabled else "disabled"}'}, 200
+
+ENTITY_TABLES = {"student": "students", "instructor": "instructors", "course": "courses"}
+
+def _changed_tables(event) -> tuple:
+    """
+    Returns the tables a change event may have modified, counting the enrollment counters and
+    the rows removed by ON DELETE CASCADE. Joining or leaving a waitlist is published as an
+    update of the course, and an enrollment may be a promotion from the waitlist.
+    """
+    if event.kind in (ENROLLED, UNENROLLED) and event.entity == "student":
+        return ("registrations", "students", "courses", "waitlist")
+    if event.kind in (ENROLLED, UNENROLLED):
+        return ("course_instructors", "instructors")
+    if event.kind == DELETED and event.entity == "student":
+        return ("students", "registrations", "courses", "waitlist")
+    if event.kind == DELETED and event.entity == "instructor":
+        return ("instructors", "course_instructors")
+    if event.kind == DELETED:
+        return ("courses", "registrations", "course_instructors", "students", "instructors", "waitlist")
+    if event.entity == "course":
+        return ("courses", "waitlist")
+    return (ENTITY_TABLES[event.entity],)
+
+def _copier(value):
+    """
+    Returns a function that copies the dicts and lists of a result shaped like value, so every
+    caller gets its own containers while the entities and rows in them are shared. It is built
+    once per cached result, and a container that holds no other containers is copied in one call.
+    """
+    if isinstance(value, tuple):
+        parts = [_copier(item) for item in value]
+        return lambda result: tuple(copy(item) for copy, item in zip(parts, result))
+    if isinstance(value, dict):
+        inner = {key: _copier(item) for key, item in value.items() if isinstance(item, (dict, list, tuple))}
+        if not inner:
+            return dict
+        return lambda result: {key: inner[key](item) if key in inner else item for key, item in result.items()}
+    if isinstance(value, list):
+        if not any(isinstance(item, (dict, list, tuple)) for item in value):
+            return list
+        return lambda result: [_copier(item)(item) for item in result]
+    return lambda result: result
+
+def _cached_read(*tables):
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            cache = _read_cache
+            if cache is None or events.batching():
+                return function(*args, **kwargs)
+            key = (function.__name__, args, tuple(sorted(kwargs.items())))
+            entry = cache.get(key, tables)
+            if entry is MISSING:
+                generations = cache.generations(tables)
+                result = function(*args, **kwargs)
+                if result[1] != 200:
+                    return result
+                entry = (result, _copier(result))
+                cache.put(key, generations, entry)
+            result, copy = entry
+            return copy(result)
+        return wrapper
+    return decorator
 
 def create_tables(conn):
-    cursor = conn.cursor()
-    
+    """
+    This function brings the schema up to date by applying the pending MIGRATIONS.
+    """
+    return migrate(conn, MIGRATIONS)
+
+def _create_base_tables(cursor):
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS students (
         id INTEGER PRIMARY KEY,
@@ -72,71 +339,620 @@ def create_tables(conn):
         PRIMARY KEY (instructor_id, course_id)
     )
     ''')
-    
-    conn.commit()
+
+def _add_sort_indexes(cursor):
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_students_name ON students (name)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_students_age ON students (age)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_instructors_name ON instructors (name)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_instructors_age ON instructors (age)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_courses_name ON courses (name)')
+
+def _add_capacity_and_waitlist(cursor):
+    _add_missing_column(cursor, 'courses', 'capacity', 'INTEGER')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS waitlist (
+        position INTEGER PRIMARY KEY AUTOINCREMENT,
+        course_id INTEGER NOT NULL,
+        student_id INTEGER NOT NULL,
+        FOREIGN KEY (student_id) REFERENCES students (id),
+        FOREIGN KEY (course_id) REFERENCES courses (id),
+        UNIQUE (course_id, student_id)
+    )
+    ''')
+
+def _add_course_meetings(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS course_meetings (
+        course_id INTEGER NOT NULL,
+        starts_at INTEGER NOT NULL,
+        ends_at INTEGER NOT NULL,
+        FOREIGN KEY (course_id) REFERENCES courses (id)
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_course_meetings_course ON course_meetings (course_id, starts_at)')
+
+def _add_membership_indexes(cursor):
+    # The primary keys lead with the person, so looking up a course's members scanned the table.
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_registrations_course ON registrations (course_id, student_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_course_instructors_course ON course_instructors (course_id, instructor_id)')
+
+# Full-text indexed columns of each table; the first one is what a "name" search looks at.
+SEARCH_COLUMNS = {
+    "students": ("name", "email"),
+    "instructors": ("name", "email"),
+    "courses": ("name", "description"),
+}
+
+def _add_search_index(cursor):
+    # External content tables: the index stores only the tokens and reads rows back from the
+    # table itself. prefix='2 3' keeps separate indexes for 2 and 3 letter prefixes, so short
+    # prefix queries do not have to merge every term that starts with them.
+    for table, columns in SEARCH_COLUMNS.items():
+        listed = ', '.join(columns)
+        old = ', '.join(f'old.{column}' for column in columns)
+        new = ', '.join(f'new.{column}' for column in columns)
+        cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {table}_search USING fts5(
+            {listed}, content='{table}', content_rowid='id', prefix='2 3'
+        )
+        """)
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {table}_search (rowid, {listed}) VALUES (new.id, {new});
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {table}_search ({table}_search, rowid, {listed}) VALUES ('delete', old.id, {old});
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {listed} ON {table} BEGIN
+            INSERT INTO {table}_search ({table}_search, rowid, {listed}) VALUES ('delete', old.id, {old});
+            INSERT INTO {table}_search (rowid, {listed}) VALUES (new.id, {new});
+        END
+        ''')
+        cursor.execute(f"INSERT INTO {table}_search ({table}_search) VALUES ('rebuild')")
+
+def _rebuild_table(cursor, table: str, definition: str, parents: dict, indexes: tuple = ()):
+    """
+    Replaces table with one created from definition and copies its rows across, except the ones
+    whose parent row is gone. parents maps each foreign key column to the table it references.
+    """
+    cursor.execute(f'CREATE TABLE {table}_rebuilt ({definition})')
+    columns = ', '.join(row[1] for row in cursor.execute(f'PRAGMA table_info({table}_rebuilt)').fetchall())
+    present = ' AND '.join(f'EXISTS (SELECT 1 FROM {parent} WHERE {parent}.id = {table}.{column})' for column, parent in parents.items())
+    cursor.execute(f'INSERT INTO {table}_rebuilt ({columns}) SELECT {columns} FROM {table} WHERE {present}')
+    cursor.execute(f'DROP TABLE {table}')
+    cursor.execute(f'ALTER TABLE {table}_rebuilt RENAME TO {table}')
+    for index in indexes:
+        cursor.execute(index)
+
+def _add_cascading_deletes(cursor):
+    # SQLite cannot change a foreign key in place, so the tables that point at students,
+    # instructors and courses are rebuilt with ON DELETE CASCADE. Rows left behind by earlier
+    # deletes would break the enforced constraints and are not copied.
+    _rebuild_table(cursor, 'registrations', '''
+        student_id INTEGER,
+        course_id INTEGER,
+        FOREIGN KEY (student_id) REFERENCES students (id) ON DELETE CASCADE,
+        FOREIGN KEY (course_id) REFERENCES courses (id) ON DELETE CASCADE,
+        PRIMARY KEY (student_id, course_id)
+    ''', {"student_id": "students", "course_id": "courses"}, (
+        'CREATE INDEX idx_registrations_course ON registrations (course_id, student_id)',
+    ))
+    _rebuild_table(cursor, 'course_instructors', '''
+        instructor_id INTEGER,
+        course_id INTEGER,
+        FOREIGN KEY (instructor_id) REFERENCES instructors (id) ON DELETE CASCADE,
+        FOREIGN KEY (course_id) REFERENCES courses (id) ON DELETE CASCADE,
+        PRIMARY KEY (instructor_id, course_id)
+    ''', {"instructor_id": "instructors", "course_id": "courses"}, (
+        'CREATE INDEX idx_course_instructors_course ON course_instructors (course_id, instructor_id)',
+    ))
+    _rebuild_table(cursor, 'waitlist', '''
+        position INTEGER PRIMARY KEY AUTOINCREMENT,
+        course_id INTEGER NOT NULL,
+        student_id INTEGER NOT NULL,
+        FOREIGN KEY (student_id) REFERENCES students (id) ON DELETE CASCADE,
+        FOREIGN KEY (course_id) REFERENCES courses (id) ON DELETE CASCADE,
+        UNIQUE (course_id, student_id)
+    ''', {"student_id": "students", "course_id": "courses"}, (
+        # Cascading a student's deletion looks their waitlist entries up by student.
+        'CREATE INDEX idx_waitlist_student ON waitlist (student_id)',
+    ))
+    _rebuild_table(cursor, 'course_meetings', '''
+        course_id INTEGER NOT NULL,
+        starts_at INTEGER NOT NULL,
+        ends_at INTEGER NOT NULL,
+        FOREIGN KEY (course_id) REFERENCES courses (id) ON DELETE CASCADE
+    ''', {"course_id": "courses"}, (
+        'CREATE INDEX idx_course_meetings_course ON course_meetings (course_id, starts_at)',
+    ))
+
+# Counter column per table, with the membership table and column it counts rows of.
+ENROLLMENT_COUNTERS = {
+    "courses": ("student_count", "registrations", "course_id"),
+    "students": ("course_count", "registrations", "student_id"),
+    "instructors": ("course_count", "course_instructors", "instructor_id"),
+}
+
+def _counter_changes(membership: str, row: str, step: str) -> str:
+    return '\n'.join(
+        f'UPDATE {table} SET {counter} = {counter} {step} 1 WHERE id = {row}.{column};'
+        for table, (counter, member_table, column) in ENROLLMENT_COUNTERS.items() if member_table == membership
+    )
+
+def _add_enrollment_counters(cursor):
+    # Seat counts and roster sizes are kept in the parent rows by triggers, so reading them is
+    # a primary key lookup instead of a COUNT(*) over the membership table. The triggers also
+    # run for the rows removed by ON DELETE CASCADE.
+    for table, (counter, member_table, column) in ENROLLMENT_COUNTERS.items():
+        _add_missing_column(cursor, table, counter, 'INTEGER NOT NULL DEFAULT 0')
+        cursor.execute(f'UPDATE {table} SET {counter} = (SELECT COUNT(*) FROM {member_table} WHERE {column} = {table}.id)')
+    for membership in ("registrations", "course_instructors"):
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {membership}_count_insert AFTER INSERT ON {membership} BEGIN
+            {_counter_changes(membership, 'new', '+')}
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {membership}_count_delete AFTER DELETE ON {membership} BEGIN
+            {_counter_changes(membership, 'old', '-')}
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {membership}_count_update AFTER UPDATE ON {membership} BEGIN
+            {_counter_changes(membership, 'old', '-')}
+            {_counter_changes(membership, 'new', '+')}
+        END
+        ''')
+    # Read backwards, this index lists courses most popular first, ties newest first.
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_courses_student_count ON courses (student_count)')
+
+# Append new migrations at the end; the position of each one is its schema version.
+MIGRATIONS = (
+    _create_base_tables,
+    _add_sort_indexes,
+    _add_capacity_and_waitlist,
+    _add_course_meetings,
+    _add_membership_indexes,
+    _add_search_index,
+    _add_cascading_deletes,
+    _add_enrollment_counters,
+)
+
+# The lookups every request path depends on, as the controllers below run them.
+HOT_QUERIES = {
+    "get_students_by_course": ('''
+        SELECT s.* FROM students s
+        JOIN registrations r ON s.id = r.student_id
+        WHERE r.course_id = ?
+    ''', (1,)),
+    "get_instructors_by_course": ('''
+        SELECT i.* FROM instructors i
+        JOIN course_instructors ci ON i.id = ci.instructor_id
+        WHERE ci.course_id = ?
+    ''', (1,)),
+    "get_student_courses": ('''
+        SELECT c.* FROM courses c
+        JOIN registrations r ON c.id = r.course_id
+        WHERE r.student_id = ?
+    ''', (1,)),
+    "course_seats": ('SELECT capacity, student_count AS enrolled FROM courses WHERE id = ?', (1,)),
+    "list_courses_by_popularity": ('SELECT * FROM courses ORDER BY student_count DESC, id DESC LIMIT 50', ()),
+    "is_registered": ('SELECT 1 FROM registrations WHERE student_id = ? AND course_id = ?', (1, 1)),
+    "get_waitlist": ('''
+        SELECT students.* FROM waitlist
+        JOIN students ON students.id = waitlist.student_id
+        WHERE waitlist.course_id = ?
+        ORDER BY waitlist.position
+    ''', (1,)),
+    "get_student_id_by_name": ('SELECT * FROM students WHERE name = ?', ('',)),
+    "get_instructor_id_by_name": ('SELECT * FROM instructors WHERE name = ?', ('',)),
+    "get_course_id_by_name": ('SELECT * FROM courses WHERE name = ?', ('',)),
+    "search_students_by_email": ('SELECT * FROM students WHERE email = ?', ('',)),
+    "search_instructors_by_email": ('SELECT * FROM instructors WHERE email = ?', ('',)),
+}
+
+# Keyset pages that read their sort index in order and stop after LIMIT rows.
+ORDERED_HOT_QUERIES = ("list_courses_by_popularity",)
+
+def _statistics_source(conn) -> tuple:
+    people = [("student", row['id'], row['age']) for row in conn.execute('SELECT id, age FROM students')]
+    people += [("instructor", row['id'], row['age']) for row in conn.execute('SELECT id, age FROM instructors')]
+    memberships = [("student", row[0], row[1]) for row in conn.execute('''
+        SELECT r.student_id, r.course_id FROM registrations r
+        JOIN students s ON s.id = r.student_id JOIN courses c ON c.id = r.course_id
+    ''')]
+    memberships += [("instructor", row[0], row[1]) for row in conn.execute('''
+        SELECT ci.instructor_id, ci.course_id FROM course_instructors ci
+        JOIN instructors i ON i.id = ci.instructor_id JOIN courses c ON c.id = ci.course_id
+    ''')]
+    return people, [row['id'] for row in conn.execute('SELECT id FROM courses')], memberships
+
+def _add_missing_column(cursor, table: str, column: str, definition: str):
+    columns = {row[1] for row in cursor.execute(f'PRAGMA table_info({table})').fetchall()}
+    if column not in columns:
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
 
 def backup_database(backup_file: str):
     try:
         backup_conn = sqlite3.connect(backup_file)
-        
-        with sqlite3.connect('school_management.db') as conn:
+        conn = get_db_connection()
+        try:
             conn.backup(backup_conn)
-        backup_conn.close()
+        finally:
+            conn.close()
+            backup_conn.close()
         return {"message": "Database backup created successfully"}, 200
     except sqlite3.Error as e:
         return {"message": f"An error occurred: {e}"}, 500
-    
+
+def verify_query_plans():
+    conn = get_db_connection()
+    problems = unindexed_queries(conn, HOT_QUERIES, ORDERED_HOT_QUERIES)
+    conn.close()
+    if problems:
+        return {"message": "Some queries scan a whole table or index", "queries": problems}, 500
+    return {"message": "All hot queries use an index"}, 200
+
+def verify_foreign_keys():
+    """
+    This function scans the database for rows that reference a student, instructor or course
+    that does not exist and returns how many there are, per table and referenced table.
+    """
+    conn = get_db_connection()
+    orphans = {}
+    for table, _, parent, _ in conn.execute('PRAGMA foreign_key_check'):
+        counts = orphans.setdefault(table, {})
+        counts[parent] = counts.get(parent, 0) + 1
+    conn.close()
+    if orphans:
+        return {"message": "Some rows reference missing records", "orphans": orphans}, 500
+    return {"message": "No orphaned rows"}, 200
+
+def _chunks(items: list, size: int = 500):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _select_ids(cursor, query: str, ids: list, *params) -> set:
+    found = set()
+    for chunk in _chunks(ids):
+        cursor.execute(query.format(placeholders=', '.join('?' * len(chunk))), (*params, *chunk))
+        found.update(row[0] for row in cursor.fetchall())
+    return found
+
+def _schedule_conflicts(cursor, table: str, column: str, course_id: int, person_ids: list) -> dict:
+    """
+    Returns {person_id: [course_id, ...]} for the people whose current courses meet at the same
+    time as the given course. Meetings are half-open minute ranges, as in schedule.py.
+    """
+    conflicts = {}
+    for chunk in _chunks(person_ids):
+        cursor.execute(f'''
+            SELECT DISTINCT member.{column}, theirs.course_id
+            FROM course_meetings AS ours
+            JOIN course_meetings AS theirs
+                ON theirs.course_id != ours.course_id AND theirs.starts_at < ours.ends_at AND ours.starts_at < theirs.ends_at
+            JOIN {table} AS member ON member.course_id = theirs.course_id
+            WHERE ours.course_id = ? AND member.{column} IN ({', '.join('?' * len(chunk))})
+            ORDER BY theirs.course_id
+        ''', (course_id, *chunk))
+        for person_id, other_course_id in cursor.fetchall():
+            conflicts.setdefault(person_id, []).append(other_course_id)
+    return conflicts
+
+def _batch_response(results: list, action: str) -> tuple:
+    applied = sum(1 for result in results if result["status"] == 200)
+    return {"message": f'{applied} of {len(results)} {action}', "results": results}, 200
+
+SORT_KEYS = {
+    "students": ("id", "name", "age"),
+    "instructors": ("id", "name", "age"),
+    "courses": ("id", "name", "student_count"),
+}
+
+# Sort keys whose pages run from the largest value down, reading the same index backwards.
+DESCENDING_SORT_KEYS = {"student_count"}
+
+def _list_page(table: str, sort_by: str, limit: int, cursor: str, memberships: tuple = None):
+    """
+    Keyset pagination: the cursor carries the last (sort key, id) pair, so every page is an
+    index range scan that starts where the previous one stopped instead of skipping rows.
+    Each sort column has an index whose implicit rowid suffix matches the id tie breaker.
+    Keys in DESCENDING_SORT_KEYS list the largest values first, ties by the highest id.
+    A limit of None returns every row in one page.
+
+    memberships is an optional (table, person column) pair, such as ('registrations',
+    'student_id'). The page is then joined with it and each row gets a "courses" column, a JSON
+    list of [course_id, name] pairs, so people and their courses come back in one query.
+    """
+    if sort_by not in SORT_KEYS[table]:
+        return {"message": "Invalid sort key"}, 400
+    if limit is not None and limit <= 0:
+        return {"message": "Invalid page size"}, 400
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor, sort_by)
+        if after is None:
+            return {"message": "Invalid cursor"}, 400
+    keys = f'{table}.id' if sort_by == "id" else f'{table}.{sort_by}, {table}.id'
+    direction, beyond = (' DESC', '<') if sort_by in DESCENDING_SORT_KEYS else ('', '>')
+    order = ', '.join(f'{key}{direction}' for key in keys.split(', '))
+    where, params = '', ()
+    if after is not None and sort_by == "id":
+        where, params = f'WHERE {table}.id > ?', (after[1],)
+    elif after is not None:
+        where, params = f'WHERE ({keys}) {beyond} (?, ?)', tuple(after)
+    columns, joins, group = f'{table}.*', '', ''
+    if memberships is not None:
+        # Grouping by the sort columns rather than the id lets SQLite read each person's rows
+        # straight off the sort index, so a page stops after limit people instead of sorting all.
+        member_table, person_column = memberships
+        columns += ', json_group_array(json_array(courses.id, courses.name)) FILTER (WHERE courses.id IS NOT NULL) AS courses'
+        joins = f'LEFT JOIN {member_table} AS member ON member.{person_column} = {table}.id LEFT JOIN courses ON courses.id = member.course_id'
+        group = f'GROUP BY {keys}'
+    query = f'SELECT {columns} FROM {table} {joins} {where} {group} ORDER BY {order}'
+    if limit is not None:
+        query, params = f'{query} LIMIT ?', (*params, limit + 1)
+    conn = get_db_connection()
+    rows = conn.execute(query, params).fetchall()
+    conn.close()
+    if limit is None or len(rows) <= limit:
+        return {"rows": rows, "next_cursor": None}, 200
+    next_cursor = encode_cursor(sort_by, rows[limit - 1][sort_by], rows[limit - 1]['id'])
+    return {"rows": rows[:limit], "next_cursor": next_cursor}, 200
+
+def _course_seats(cursor, course_id: int):
+    cursor.execute('SELECT capacity, student_count AS enrolled FROM courses WHERE id = ?', (course_id,))
+    return cursor.fetchone()
+
+def _waitlist_positions(cursor, course_id: int) -> dict:
+    cursor.execute('SELECT student_id FROM waitlist WHERE course_id = ? ORDER BY position', (course_id,))
+    return {row['student_id']: position for position, row in enumerate(cursor.fetchall(), start=1)}
+
+def _promote_waitlisted(cursor, course_id: int) -> list:
+    """
+    Fills free seats from the front of the waitlist. Students whose current courses clash with
+    this one are passed over and stay queued for a later seat.
+    """
+    seats = _course_seats(cursor, course_id)
+    if seats is None:
+        return []
+    room = None if seats['capacity'] is None else max(0, seats['capacity'] - seats['enrolled'])
+    if room == 0:
+        return []
+    cursor.execute('SELECT position, student_id FROM waitlist WHERE course_id = ? ORDER BY position', (course_id,))
+    waiting = cursor.fetchall()
+    clashing = _schedule_conflicts(cursor, 'registrations', 'student_id', course_id, [row['student_id'] for row in waiting])
+    promoted = [row for row in waiting if row['student_id'] not in clashing][:room]
+    cursor.executemany('INSERT INTO registrations (student_id, course_id) VALUES (?, ?)', [(row['student_id'], course_id) for row in promoted])
+    cursor.executemany('DELETE FROM waitlist WHERE position = ?', [(row['position'],) for row in promoted])
+    return [row['student_id'] for row in promoted]
+
+def _full_text_query(table: str, search_type: str, search_term: str, limit: int) -> tuple:
+    """
+    Every word of the search term has to start a word in the searched columns ("jo sm" finds
+    "John Smith"), best bm25 match first, with the first column weighted double. A "text"
+    search looks at all of the table's SEARCH_COLUMNS, any other type at that one column.
+    """
+    columns = SEARCH_COLUMNS[table] if search_type == "text" else (search_type,)
+    words = re.findall(r'\w+', search_term.lower())
+    if not words:
+        return f'SELECT * FROM {table} WHERE 0', ()
+    prefixes = ' '.join(f'"{word}"*' for word in words)
+    weights = ', '.join('2.0' if column == SEARCH_COLUMNS[table][0] else '1.0' for column in SEARCH_COLUMNS[table])
+    # Ranking inside the subquery reads only the rows that make the cut from the table.
+    return f'''
+        SELECT {table}.* FROM (
+            SELECT rowid, bm25({table}_search, {weights}) AS score FROM {table}_search
+            WHERE {table}_search MATCH ? ORDER BY score LIMIT ?
+        ) AS hits
+        JOIN {table} ON {table}.id = hits.rowid
+        ORDER BY hits.score
+    ''', (f'{{{" ".join(columns)}}} : ({prefixes})', limit)
+
+def _stream_rows(table: str, filter):
+    clause, parameters = filter.to_sql(table)
+    conn = get_db_connection()
+    try:
+        for row in conn.execute(f'SELECT * FROM {table} WHERE {clause} ORDER BY id', parameters):
+            yield row
+    finally:
+        conn.close()
+
+BULK_CHUNK_SIZE = 10000
+
+def _insert_rows(cursor, query: str, rows: list) -> list:
+    """
+    Inserts rows with executemany in batches of 500, each under a savepoint, and returns
+    (index, error) for the rows that violate a constraint. A batch that fails is rolled back to
+    its savepoint and inserted again row by row, so a bad row costs one extra pass over its own
+    batch instead of aborting the load.
+    """
+    failed = []
+    for start in range(0, len(rows), 500):
+        batch = rows[start:start + 500]
+        cursor.execute('SAVEPOINT bulk_insert')
+        try:
+            cursor.executemany(query, batch)
+        except sqlite3.IntegrityError:
+            cursor.execute('ROLLBACK TO bulk_insert')
+            for index, row in enumerate(batch, start=start):
+                try:
+                    cursor.execute(query, row)
+                except sqlite3.IntegrityError as error:
+                    failed.append((index, str(error)))
+        cursor.execute('RELEASE bulk_insert')
+    return failed
+
+def _bulk_load(table: str, records, prepare, insert: str, chunk_size: int, on_inserted) -> tuple:
+    """
+    Shared loop of the bulk insert APIs. Records are inserted in chunks of chunk_size, each chunk
+    in one transaction. Rows get explicit ids above the current maximum, so every inserted record
+    is known by id without reading it back. prepare(record, id) returns the row to insert or
+    raises ValueError with the reason the record is rejected; on_inserted(cursor, pairs) runs in
+    the transaction with the inserted (record, id) pairs and returns the events to publish once
+    the chunk is committed.
+    """
+    records = list(records)
+    ids, failed = [None] * len(records), []
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(records), chunk_size):
+            conn.begin()
+            next_id = cursor.execute(f'SELECT COALESCE(MAX(id), 0) + 1 FROM {table}').fetchone()[0]
+            rows, positions = [], []
+            for index in range(start, min(start + chunk_size, len(records))):
+                try:
+                    rows.append(prepare(records[index], next_id + len(rows)))
+                    positions.append(index)
+                except (TypeError, ValueError) as error:
+                    failed.append({"index": index, "record": records[index], "message": str(error) or "Invalid record"})
+            rejected = dict(_insert_rows(cursor, insert, rows))
+            for offset, index in enumerate(positions):
+                if offset in rejected:
+                    failed.append({"index": index, "record": records[index], "message": rejected[offset]})
+                else:
+                    ids[index] = rows[offset][0]
+            changes = on_inserted(cursor, [(records[index], ids[index]) for index in positions if ids[index] is not None])
+            conn.commit()
+            with events.batch():
+                for change in changes:
+                    events.publish(change)
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    failed.sort(key=lambda failure: failure["index"])
+    inserted = len(records) - len(failed)
+    return {"message": f'{inserted} of {len(records)} {table} inserted', "inserted": inserted, "ids": ids, "failed": failed}, 200
+
+def _person_row(record, person_id: int) -> tuple:
+    name, age, email = record
+    if not (validator.validate_email(email) and validator.validate_age(age)):
+        raise ValueError("Invalid email or age")
+    return person_id, name, age, email
+
 
 """
 STUDENT CONTROLLERS
 """
 
+@_serialized
 def register_student(name: str, age: int, email: str) -> tuple:
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
         if validator.validate_email(email) and validator.validate_age(age):
+            conn.begin()
             cursor.execute('INSERT INTO students (name, age, email) VALUES (?, ?, ?)', (name, age, email))
             conn.commit()
+            events.publish(ChangeEvent(CREATED, "student", cursor.lastrowid, payload=Student(name, age, email, cursor.lastrowid)))
             return {"message": f'Student registered successfully', "student_id": cursor.lastrowid}, 200
         return {"message": "Invalid email or age"}, 400
     except sqlite3.IntegrityError:
+        conn.rollback()
         return {"message": "Email already exists"}, 400
+    except sqlite3.Error:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
+@_serialized
 def add_student_to_course(student_id: int, course_id: int) -> tuple:
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
+        conn.begin()
+        seats = _course_seats(cursor, course_id)
+        cursor.execute('SELECT id FROM students WHERE id = ?', (student_id,))
+        if seats is None or cursor.fetchone() is None:
+            conn.rollback()
+            return {"message": "Student or course not found"}, 404
+        cursor.execute('SELECT 1 FROM registrations WHERE student_id = ? AND course_id = ?', (student_id, course_id))
+        if cursor.fetchone() is not None:
+            conn.rollback()
+            return {"message": "Student is already registered in course"}, 400
+        conflicts = _schedule_conflicts(cursor, 'registrations', 'student_id', course_id, [student_id])
+        if conflicts:
+            conn.rollback()
+            return {"message": "Course clashes with the student's schedule", "conflicts": conflicts[student_id]}, 409
+        if seats['capacity'] is not None and seats['enrolled'] >= seats['capacity']:
+            cursor.execute('INSERT OR IGNORE INTO waitlist (course_id, student_id) VALUES (?, ?)', (course_id, student_id))
+            position = _waitlist_positions(cursor, course_id)[student_id]
+            conn.commit()
+            events.publish(ChangeEvent(UPDATED, "course", course_id))
+            return {"message": "Course is full, student added to waitlist", "position": position}, 202
         cursor.execute('INSERT INTO registrations (student_id, course_id) VALUES (?, ?)', (student_id, course_id))
+        cursor.execute('DELETE FROM waitlist WHERE student_id = ? AND course_id = ?', (student_id, course_id))
         conn.commit()
+        events.publish(ChangeEvent(ENROLLED, "student", student_id, course_id))
         return {"message": "Student added to course successfully"}, 200
-    except sqlite3.IntegrityError:
-        return {"message": "Student or course not found"}, 404
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
     
+@_serialized
 def remove_student_from_course(student_id: int, course_id: int) -> tuple:
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('DELETE FROM registrations WHERE student_id = ? AND course_id = ?', (student_id, course_id))
-    conn.commit()
-    if cursor.rowcount == 0:
+    try:
+        conn.begin()
+        cursor.execute('DELETE FROM registrations WHERE student_id = ? AND course_id = ?', (student_id, course_id))
+        if cursor.rowcount == 0:
+            cursor.execute('DELETE FROM waitlist WHERE student_id = ? AND course_id = ?', (student_id, course_id))
+            conn.commit()
+            if cursor.rowcount == 0:
+                return {"message": "Student not registered in course or course/student not found"}, 404
+            events.publish(ChangeEvent(UPDATED, "course", course_id))
+            return {"message": "Student removed from waitlist"}, 200
+        promoted = _promote_waitlisted(cursor, course_id)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
         conn.close()
-        return {"message": "Student not registered in course or course/student not found"}, 404
-    conn.close()
+    with events.batch():
+        events.publish(ChangeEvent(UNENROLLED, "student", student_id, course_id))
+        for promoted_id in promoted:
+            events.publish(ChangeEvent(ENROLLED, "student", promoted_id, course_id))
     return {"message": "Student removed from course successfully"}, 200
 
+@_serialized
 def remove_student(student_id: int) -> tuple:
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('DELETE FROM students WHERE id = ?', (student_id,))
-    conn.commit()
-    if cursor.rowcount == 0:
+    try:
+        conn.begin()
+        cursor.execute('SELECT course_id FROM registrations WHERE student_id = ?', (student_id,))
+        course_ids = [row['course_id'] for row in cursor.fetchall()]
+        # Registrations and waitlist entries go with the student (ON DELETE CASCADE).
+        cursor.execute('DELETE FROM students WHERE id = ?', (student_id,))
+        deleted = cursor.rowcount
+        promoted = [(promoted_id, course_id) for course_id in course_ids for promoted_id in _promote_waitlisted(cursor, course_id)]
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
         conn.close()
+    if deleted == 0:
         return {"message": "Student not found"}, 404
-    conn.close()
+    with events.batch():
+        events.publish(ChangeEvent(DELETED, "student", student_id))
+        for promoted_id, course_id in promoted:
+            events.publish(ChangeEvent(ENROLLED, "student", promoted_id, course_id))
     return {"message": "Student deleted successfully"}, 200
 
+@_cached_read("students")
 def get_students():
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -148,6 +964,37 @@ def get_students():
         students[student['id']] = Student(student['name'], student['age'], student['email'], student['id'])
     return {"students": students}, 200
 
+@_cached_read("students")
+def list_students(sort_by: str = "name", limit: int = 50, cursor: str = None):
+    page, status = _list_page('students', sort_by, limit, cursor)
+    if status != 200:
+        return page, status
+    students = [Student(student['name'], student['age'], student['email'], student['id']) for student in page["rows"]]
+    return {"students": students, "next_cursor": page["next_cursor"]}, 200
+
+@_cached_read("students", "registrations", "courses")
+def get_students_with_courses(sort_by: str = "id", limit: int = None, cursor: str = None):
+    """
+    This function returns students together with the names of their courses in a single query,
+    as {"student": Student, "courses": {course_id: name}} entries. The student's
+    registered_courses holds the same course IDs. Without a limit every student is returned;
+    with one, pages work like list_students.
+    """
+    page, status = _list_page('students', sort_by, limit, cursor, ('registrations', 'student_id'))
+    if status != 200:
+        return page, status
+    roster = []
+    for row in page["rows"]:
+        student = Student(row['name'], row['age'], row['email'], row['id'])
+        courses = dict(json.loads(row['courses']))
+        student.registered_courses = list(courses)
+        roster.append({"student": student, "courses": courses})
+    return {"students": roster, "next_cursor": page["next_cursor"]}, 200
+
+def query_students(filter):
+    students = (Student(student['name'], student['age'], student['email'], student['id']) for student in _stream_rows('students', filter))
+    return {"students": students}, 200
+
 def get_students_by_course(course_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -159,6 +1006,7 @@ def get_students_by_course(course_id: int):
         students[student['id']] = Student(student['name'], student['age'], student['email'], student['id'])
     return {"students": students}, 200
 
+@_cached_read("registrations", "courses")
 def get_student_courses(student_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -171,9 +1019,19 @@ def get_student_courses(student_id: int):
     conn.close()
     courses = {}
     for course in courses_data:
-        courses[course['id']] = Course(course['name'], course['age'], course['email'], course['id'])
+        courses[course['id']] = Course(course['name'], course['description'], course['id'], course['capacity'])
     return {"students": courses}, 200
 
+@_cached_read("students")
+def get_student_course_count(student_id: int):
+    conn = get_db_connection()
+    student = conn.execute('SELECT course_count FROM students WHERE id = ?', (student_id,)).fetchone()
+    conn.close()
+    if student is None:
+        return {"message": "Student not found"}, 404
+    return {"student_id": student_id, "courses": student['course_count']}, 200
+
+@_cached_read("students")
 def get_student_id_by_name(student_name: str):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -182,11 +1040,15 @@ def get_student_id_by_name(student_name: str):
     conn.close()
     return {"student_id": student['id']}, 200
 
-def search_students(search_type: str, search_term: str):
+def recommend_courses(student_id: int, k: int = 5):
+    return {"courses": [{"course_id": course_id, "score": score} for course_id, score in recommender.recommend(student_id, k)]}, 200
+
+@_cached_read("students")
+def search_students(search_type: str, search_term: str, limit: int = 50):
     conn = get_db_connection()
     cursor = conn.cursor()
-    if search_type == "name":
-        cursor.execute('SELECT * FROM students WHERE name LIKE ?', (f'%{search_term}%',))
+    if search_type in ("name", "text"):
+        cursor.execute(*_full_text_query('students', search_type, search_term, limit))
     elif search_type == "email":
         cursor.execute('SELECT * FROM students WHERE email = ?', (search_term,))
     elif search_type == "id":
@@ -196,22 +1058,197 @@ def search_students(search_type: str, search_term: str):
         return {"message": "Invalid search type"}, 400
     students_data = cursor.fetchall()
     conn.close()
-    courses = {}
-    for course in courses_data:
-        courses[course['id']] = Student(course['name'], course['age'], course['email'], course['id'])
-    return {"students": courses}, 200
+    students = {}
+    for student in students_data:
+        students[student['id']] = Student(student['name'], student['age'], student['email'], student['id'])
+    return {"students": students}, 200
 
+@_serialized
 def update_student(student_id: int, name: str, age: int, email: str):
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
+        conn.begin()
         cursor.execute('UPDATE students SET name = ?, age = ?, email = ? WHERE id = ?', (name, age, email, student_id))
         conn.commit()
         if cursor.rowcount == 0:
             return {"message": "Student not found"}, 404
+        events.publish(ChangeEvent(UPDATED, "student", student_id, payload=Student(name, age, email, student_id)))
         return {"message": "Student updated successfully"}, 200
     except sqlite3.IntegrityError:
+        conn.rollback()
         return {"message": "Email already exists"}, 400
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _enroll_in_course(cursor, course_id: int, student_ids: list):
+    """
+    Enrolls students in one course inside the caller's transaction and returns the per-student
+    results and the inserted (student_id, course_id) pairs, or None if the course does not exist.
+    """
+    seats = _course_seats(cursor, course_id)
+    if seats is None:
+        return None
+    room = None if seats['capacity'] is None else max(0, seats['capacity'] - seats['enrolled'])
+    ids = list(dict.fromkeys(student_ids))
+    known = _select_ids(cursor, 'SELECT id FROM students WHERE id IN ({placeholders})', ids)
+    registered = _select_ids(cursor, 'SELECT student_id FROM registrations WHERE course_id = ? AND student_id IN ({placeholders})', ids, course_id)
+    conflicts = _schedule_conflicts(cursor, 'registrations', 'student_id', course_id, ids)
+    results, batch, waiting, seen = [], [], {}, set()
+    for student_id in student_ids:
+        if student_id in seen:
+            results.append({"student_id": student_id, "message": "Student appears twice in batch", "status": 400})
+        elif student_id not in known:
+            results.append({"student_id": student_id, "message": "Student not found", "status": 404})
+        elif student_id in registered:
+            results.append({"student_id": student_id, "message": "Student is already registered in course", "status": 400})
+        elif student_id in conflicts:
+            results.append({"student_id": student_id, "message": "Course clashes with the student's schedule", "conflicts": conflicts[student_id], "status": 409})
+        elif room is not None and len(batch) >= room:
+            waiting[student_id] = {"student_id": student_id, "message": "Course is full, student added to waitlist", "status": 202}
+            results.append(waiting[student_id])
+        else:
+            batch.append((student_id, course_id))
+            results.append({"student_id": student_id, "message": "Student added to course successfully", "status": 200})
+        seen.add(student_id)
+    cursor.executemany('INSERT INTO registrations (student_id, course_id) VALUES (?, ?)', batch)
+    # A waitlisted student who gets a seat this way leaves the waitlist.
+    cursor.executemany('DELETE FROM waitlist WHERE student_id = ? AND course_id = ?', batch)
+    if waiting:
+        cursor.executemany('INSERT OR IGNORE INTO waitlist (course_id, student_id) VALUES (?, ?)', [(course_id, student_id) for student_id in waiting])
+        positions = _waitlist_positions(cursor, course_id)
+        for student_id, result in waiting.items():
+            result["position"] = positions[student_id]
+    return results, batch
+
+@_serialized
+def enroll_many(course_id: int, student_ids: list) -> tuple:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        conn.begin()
+        outcome = _enroll_in_course(cursor, course_id, student_ids)
+        if outcome is None:
+            conn.rollback()
+            return {"message": "Course not found"}, 404
+        results, batch = outcome
+        conn.commit()
+        with events.batch():
+            for student_id, _ in batch:
+                events.publish(ChangeEvent(ENROLLED, "student", student_id, course_id))
+            if any(result["status"] == 202 for result in results):
+                events.publish(ChangeEvent(UPDATED, "course", course_id))
+        return _batch_response(results, "students added to course")
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+@_serialized
+def register_students(records, chunk_size: int = BULK_CHUNK_SIZE) -> tuple:
+    """
+    This function registers (name, age, email) records in bulk. The response counts the inserted
+    records, gives the new student IDs in input order (None where a record failed) and lists each
+    failed record with its index and the reason, such as a duplicate email.
+    """
+    def inserted(cursor, pairs):
+        return [ChangeEvent(CREATED, "student", student_id, payload=Student(*record, student_id)) for record, student_id in pairs]
+    return _bulk_load('students', records, _person_row, 'INSERT INTO students (id, name, age, email) VALUES (?, ?, ?, ?)', chunk_size, inserted)
+
+@_serialized
+def enroll_pairs(pairs, chunk_size: int = BULK_CHUNK_SIZE) -> tuple:
+    """
+    This function enrolls (student_id, course_id) pairs in bulk, applying the same capacity,
+    waitlist and schedule rules as add_student_to_course. Pairs are grouped by course and the
+    transaction is committed whenever chunk_size pairs have been handled. The response counts the
+    inserted enrollments and lists the waitlisted and the failed pairs.
+    """
+    pairs = list(pairs)
+    by_course = {}
+    for student_id, course_id in pairs:
+        by_course.setdefault(course_id, []).append(student_id)
+    inserted, waitlisted, failed = 0, [], []
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        pending, changes = 0, []
+        conn.begin()
+        for course_id, student_ids in by_course.items():
+            outcome = _enroll_in_course(cursor, course_id, student_ids)
+            if outcome is None:
+                failed += [{"student_id": student_id, "course_id": course_id, "message": "Course not found", "status": 404} for student_id in student_ids]
+                continue
+            results, batch = outcome
+            inserted += len(batch)
+            for result in results:
+                if result["status"] == 202:
+                    waitlisted.append({"course_id": course_id, **result})
+                elif result["status"] != 200:
+                    failed.append({"course_id": course_id, **result})
+            changes += [ChangeEvent(ENROLLED, "student", student_id, course_id) for student_id, _ in batch]
+            if any(result["status"] == 202 for result in results):
+                changes.append(ChangeEvent(UPDATED, "course", course_id))
+            pending += len(student_ids)
+            if pending >= chunk_size:
+                conn.commit()
+                with events.batch():
+                    for change in changes:
+                        events.publish(change)
+                pending, changes = 0, []
+                conn.begin()
+        conn.commit()
+        with events.batch():
+            for change in changes:
+                events.publish(change)
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return {"message": f'{inserted} of {len(pairs)} enrollments inserted', "inserted": inserted, "waitlisted": waitlisted, "failed": failed}, 200
+
+@_serialized
+def unenroll_many(course_id: int, student_ids: list) -> tuple:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        conn.begin()
+        cursor.execute('SELECT id FROM courses WHERE id = ?', (course_id,))
+        if cursor.fetchone() is None:
+            conn.rollback()
+            return {"message": "Course not found"}, 404
+        ids = list(dict.fromkeys(student_ids))
+        known = _select_ids(cursor, 'SELECT id FROM students WHERE id IN ({placeholders})', ids)
+        registered = _select_ids(cursor, 'SELECT student_id FROM registrations WHERE course_id = ? AND student_id IN ({placeholders})', ids, course_id)
+        results, batch, seen = [], [], set()
+        for student_id in student_ids:
+            if student_id in seen:
+                results.append({"student_id": student_id, "message": "Student appears twice in batch", "status": 400})
+            elif student_id not in known:
+                results.append({"student_id": student_id, "message": "Student not found", "status": 404})
+            elif student_id not in registered:
+                results.append({"student_id": student_id, "message": "Student is not registered in course", "status": 400})
+            else:
+                batch.append((student_id, course_id))
+                results.append({"student_id": student_id, "message": "Student removed from course successfully", "status": 200})
+            seen.add(student_id)
+        cursor.executemany('DELETE FROM registrations WHERE student_id = ? AND course_id = ?', batch)
+        promoted = _promote_waitlisted(cursor, course_id) if batch else []
+        conn.commit()
+        with events.batch():
+            for student_id, _ in batch:
+                events.publish(ChangeEvent(UNENROLLED, "student", student_id, course_id))
+            for student_id in promoted:
+                events.publish(ChangeEvent(ENROLLED, "student", student_id, course_id))
+        return _batch_response(results, "students removed from course")
+    except sqlite3.Error:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
@@ -221,51 +1258,85 @@ INSTRUCTOR CONTROLLERS
 """
 
 
+@_serialized
 def register_instructor(name: str, age: int, email: str):
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
+        conn.begin()
         cursor.execute('INSERT INTO instructors (name, age, email) VALUES (?, ?, ?)', (name, age, email))
         conn.commit()
+        events.publish(ChangeEvent(CREATED, "instructor", cursor.lastrowid, payload=Instructor(name, age, email, cursor.lastrowid)))
         return {"message": f'Instructor registered successfully', "instructor_id": cursor.lastrowid}, 200
     except sqlite3.IntegrityError:
+        conn.rollback()
         return {"message": "Email already exists"}, 400
+    except sqlite3.Error:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
+@_serialized
 def add_instructor_to_course(instructor_id: int, course_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
+        conn.begin()
+        conflicts = _schedule_conflicts(cursor, 'course_instructors', 'instructor_id', course_id, [instructor_id])
+        if conflicts:
+            conn.rollback()
+            return {"message": "Course clashes with the instructor's schedule", "conflicts": conflicts[instructor_id]}, 409
         cursor.execute('INSERT INTO course_instructors (instructor_id, course_id) VALUES (?, ?)', (instructor_id, course_id))
         conn.commit()
+        events.publish(ChangeEvent(ENROLLED, "instructor", instructor_id, course_id))
         return {"message": "Instructor added to course successfully"}, 200
     except sqlite3.IntegrityError:
+        conn.rollback()
         return {"message": "Instructor or course not found, or instructor already assigned"}, 400
+    except sqlite3.Error:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
+@_serialized
 def remove_instructor_from_course(instructor_id: int, course_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('DELETE FROM course_instructors WHERE instructor_id = ? AND course_id = ?', (instructor_id, course_id))
-    if cursor.rowcount == 0:
+    try:
+        conn.begin()
+        cursor.execute('DELETE FROM course_instructors WHERE instructor_id = ? AND course_id = ?', (instructor_id, course_id))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
         conn.close()
+    if cursor.rowcount == 0:
         return {"message": "Instructor not assigned to course or course/instructor not found"}, 404
-    conn.close()
+    events.publish(ChangeEvent(UNENROLLED, "instructor", instructor_id, course_id))
     return {"message": "Instructor removed from course successfully"}, 200
 
+@_serialized
 def remove_instructor(instructor_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('DELETE FROM instructors WHERE id = ?', (instructor_id,))
-    conn.commit()
-    if cursor.rowcount == 0:
+    try:
+        conn.begin()
+        cursor.execute('DELETE FROM instructors WHERE id = ?', (instructor_id,))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
         conn.close()
+    if cursor.rowcount == 0:
         return {"message": "Instructor not found"}, 404
-    conn.close()
+    events.publish(ChangeEvent(DELETED, "instructor", instructor_id))
     return {"message": "Instructor deleted successfully"}, 200
 
+@_cached_read("instructors")
 def get_instructors():
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -275,6 +1346,32 @@ def get_instructors():
     instructors = [Instructor(instructor['name'], instructor['age'], instructor['email'], instructor['id']) for instructor in instructors_data]
     return {"instructors": instructors}, 200
 
+@_cached_read("instructors")
+def list_instructors(sort_by: str = "name", limit: int = 50, cursor: str = None):
+    page, status = _list_page('instructors', sort_by, limit, cursor)
+    if status != 200:
+        return page, status
+    instructors = [Instructor(instructor['name'], instructor['age'], instructor['email'], instructor['id']) for instructor in page["rows"]]
+    return {"instructors": instructors, "next_cursor": page["next_cursor"]}, 200
+
+@_cached_read("instructors", "course_instructors", "courses")
+def get_instructors_with_courses(sort_by: str = "id", limit: int = None, cursor: str = None):
+    """
+    This function returns instructors together with the names of the courses they teach in a
+    single query, like get_students_with_courses.
+    """
+    page, status = _list_page('instructors', sort_by, limit, cursor, ('course_instructors', 'instructor_id'))
+    if status != 200:
+        return page, status
+    roster = []
+    for row in page["rows"]:
+        instructor = Instructor(row['name'], row['age'], row['email'], row['id'])
+        courses = dict(json.loads(row['courses']))
+        instructor.assigned_courses = list(courses)
+        roster.append({"instructor": instructor, "courses": courses})
+    return {"instructors": roster, "next_cursor": page["next_cursor"]}, 200
+
+@_cached_read("students", "registrations")
 def get_students_by_course(course_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -288,6 +1385,11 @@ def get_students_by_course(course_id: int):
     students = [Student(student['name'], student['age'], student['email'], student['id']) for student in students_data]
     return {"students": students}, 200
 
+def query_instructors(filter):
+    instructors = (Instructor(instructor['name'], instructor['age'], instructor['email'], instructor['id']) for instructor in _stream_rows('instructors', filter))
+    return {"instructors": instructors}, 200
+
+@_cached_read("instructors", "course_instructors")
 def get_instructors_by_course(course_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -301,11 +1403,12 @@ def get_instructors_by_course(course_id: int):
     instructors = [Instructor(instructor['name'], instructor['age'], instructor['email'], instructor['id']) for instructor in instructors_data]
     return {"instructors": instructors}, 200
 
-def search_instructors(search_type: str, search_term: str):
+@_cached_read("instructors")
+def search_instructors(search_type: str, search_term: str, limit: int = 50):
     conn = get_db_connection()
     cursor = conn.cursor()
-    if search_type == "name":
-        cursor.execute('SELECT * FROM instructors WHERE name LIKE ?', (f'%{search_term}%',))
+    if search_type in ("name", "text"):
+        cursor.execute(*_full_text_query('instructors', search_type, search_term, limit))
     elif search_type == "email":
         cursor.execute('SELECT * FROM instructors WHERE email = ?', (search_term,))
     elif search_type == "id":
@@ -318,6 +1421,16 @@ def search_instructors(search_type: str, search_term: str):
     instructors = [Instructor(instructor['name'], instructor['age'], instructor['email'], instructor['id']) for instructor in instructors_data]
     return {"instructors": instructors}, 200
 
+@_cached_read("instructors")
+def get_instructor_course_count(instructor_id: int):
+    conn = get_db_connection()
+    instructor = conn.execute('SELECT course_count FROM instructors WHERE id = ?', (instructor_id,)).fetchone()
+    conn.close()
+    if instructor is None:
+        return {"message": "Instructor not found"}, 404
+    return {"instructor_id": instructor_id, "courses": instructor['course_count']}, 200
+
+@_cached_read("instructors")
 def get_instructor_id_by_name(instructor_name: str):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -329,64 +1442,335 @@ def get_instructor_id_by_name(instructor_name: str):
     conn.close()
     return {"instructor_id": instructor[0]}, 200
 
+@_cached_read("course_instructors", "courses")
 def get_instructor_courses(instructor_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('SELECT * FROM courses WHERE instructor_id = ?', (instructor_id,))
+    cursor.execute('''
+        SELECT c.* FROM courses c
+        JOIN course_instructors ci ON c.id = ci.course_id
+        WHERE ci.instructor_id = ?
+    ''', (instructor_id,))
     courses = cursor.fetchall()
     conn.close()
-    courses = [Course(course['name'], course['description'], course['id']) for course in courses]
+    courses = [Course(course['name'], course['description'], course['id'], course['capacity']) for course in courses]
     return {"courses": courses}, 200
 
+@_serialized
 def update_instructor(instructor_id: int, name: str, age: int, email: str):
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
+        conn.begin()
         cursor.execute('UPDATE instructors SET name = ?, age = ?, email = ? WHERE id = ?', (name, age, email, instructor_id))
         conn.commit()
         if cursor.rowcount == 0:
             return {"message": "Instructor not found"}, 404
+        events.publish(ChangeEvent(UPDATED, "instructor", instructor_id, payload=Instructor(name, age, email, instructor_id)))
         return {"message": "Instructor updated successfully"}, 200
     except sqlite3.IntegrityError:
+        conn.rollback()
         return {"message": "Email already exists"}, 400
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+@_serialized
+def assign_many(course_id: int, instructor_ids: list) -> tuple:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        conn.begin()
+        cursor.execute('SELECT id FROM courses WHERE id = ?', (course_id,))
+        if cursor.fetchone() is None:
+            conn.rollback()
+            return {"message": "Course not found"}, 404
+        ids = list(dict.fromkeys(instructor_ids))
+        known = _select_ids(cursor, 'SELECT id FROM instructors WHERE id IN ({placeholders})', ids)
+        assigned = _select_ids(cursor, 'SELECT instructor_id FROM course_instructors WHERE course_id = ? AND instructor_id IN ({placeholders})', ids, course_id)
+        conflicts = _schedule_conflicts(cursor, 'course_instructors', 'instructor_id', course_id, ids)
+        results, batch, seen = [], [], set()
+        for instructor_id in instructor_ids:
+            if instructor_id in seen:
+                results.append({"instructor_id": instructor_id, "message": "Instructor appears twice in batch", "status": 400})
+            elif instructor_id not in known:
+                results.append({"instructor_id": instructor_id, "message": "Instructor not found", "status": 404})
+            elif instructor_id in assigned:
+                results.append({"instructor_id": instructor_id, "message": "Instructor is already assigned to course", "status": 400})
+            elif instructor_id in conflicts:
+                results.append({"instructor_id": instructor_id, "message": "Course clashes with the instructor's schedule", "conflicts": conflicts[instructor_id], "status": 409})
+            else:
+                batch.append((instructor_id, course_id))
+                results.append({"instructor_id": instructor_id, "message": "Instructor added to course successfully", "status": 200})
+            seen.add(instructor_id)
+        cursor.executemany('INSERT INTO course_instructors (instructor_id, course_id) VALUES (?, ?)', batch)
+        conn.commit()
+        with events.batch():
+            for instructor_id, _ in batch:
+                events.publish(ChangeEvent(ENROLLED, "instructor", instructor_id, course_id))
+        return _batch_response(results, "instructors added to course")
+    except sqlite3.Error:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
+@_serialized
+def register_instructors(records, chunk_size: int = BULK_CHUNK_SIZE) -> tuple:
+    """
+    This function registers (name, age, email) records in bulk, reporting like register_students.
+    """
+    def inserted(cursor, pairs):
+        return [ChangeEvent(CREATED, "instructor", instructor_id, payload=Instructor(*record, instructor_id)) for record, instructor_id in pairs]
+    return _bulk_load('instructors', records, _person_row, 'INSERT INTO instructors (id, name, age, email) VALUES (?, ?, ?, ?)', chunk_size, inserted)
+
+
+def find_duplicate_people(threshold: float = 0.8):
+    conn = get_db_connection()
+    records = [("student", *row) for row in conn.execute('SELECT id, name, age, email FROM students')]
+    records += [("instructor", *row) for row in conn.execute('SELECT id, name, age, email FROM instructors')]
+    conn.close()
+    return {"candidates": find_duplicates(records, threshold)}, 200
+
 
 """
 COURSE CONTROLLERS
 """
 
 
-def add_course(name: str, description: str):
+@_serialized
+def add_course(name: str, description: str, capacity: int = None, meetings: list = None):
+    if capacity is not None and capacity < 0:
+        return {"message": "Invalid capacity"}, 400
+    if meetings and not valid_meetings(meetings):
+        return {"message": "Invalid meeting time"}, 400
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('INSERT INTO courses (name, description) VALUES (?, ?)', (name, description))
-    conn.commit()
-    course_id = cursor.lastrowid
-    conn.close()
+    try:
+        conn.begin()
+        cursor.execute('INSERT INTO courses (name, description, capacity) VALUES (?, ?, ?)', (name, description, capacity))
+        course_id = cursor.lastrowid
+        cursor.executemany('INSERT INTO course_meetings (course_id, starts_at, ends_at) VALUES (?, ?, ?)', [(course_id, start, end) for start, end in meetings or []])
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    events.publish(ChangeEvent(CREATED, "course", course_id, payload=Course(name, description, course_id, capacity, meetings)))
     return {"message": f'Course added successfully', "course_id": course_id}, 200
 
+@_serialized
+def add_courses(records, chunk_size: int = BULK_CHUNK_SIZE) -> tuple:
+    """
+    This function adds (name, description) records in bulk, optionally followed by a capacity
+    and a list of meetings, reporting like register_students.
+    """
+    def course_row(record, course_id):
+        name, description, capacity, meetings = (*record, None, None)[:4]
+        if capacity is not None and capacity < 0:
+            raise ValueError("Invalid capacity")
+        if meetings and not valid_meetings(meetings):
+            raise ValueError("Invalid meeting time")
+        return course_id, name, description, capacity
+
+    def inserted(cursor, pairs):
+        cursor.executemany('INSERT INTO course_meetings (course_id, starts_at, ends_at) VALUES (?, ?, ?)',
+                           [(course_id, start, end) for record, course_id in pairs if len(record) > 3 and record[3] for start, end in record[3]])
+        return [ChangeEvent(CREATED, "course", course_id, payload=Course(record[0], record[1], course_id, *record[2:4])) for record, course_id in pairs]
+    return _bulk_load('courses', records, course_row, 'INSERT INTO courses (id, name, description, capacity) VALUES (?, ?, ?, ?)', chunk_size, inserted)
+
+@_serialized
 def remove_course(course_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('DELETE FROM courses WHERE id = ?', (course_id,))
-    conn.commit()
+    try:
+        conn.begin()
+        # Registrations, instructor assignments, the waitlist and the meetings go with the
+        # course (ON DELETE CASCADE).
+        cursor.execute('DELETE FROM courses WHERE id = ?', (course_id,))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
     if cursor.rowcount == 0:
+        return {"message": "Course not found"}, 404
+    events.publish(ChangeEvent(DELETED, "course", course_id))
+    return {"message": "Course deleted successfully"}, 200
+
+@_serialized
+def set_course_capacity(course_id: int, capacity: int = None):
+    if capacity is not None and capacity < 0:
+        return {"message": "Invalid capacity"}, 400
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        conn.begin()
+        cursor.execute('UPDATE courses SET capacity = ? WHERE id = ?', (capacity, course_id))
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return {"message": "Course not found"}, 404
+        promoted = _promote_waitlisted(cursor, course_id)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    with events.batch():
+        events.publish(ChangeEvent(UPDATED, "course", course_id))
+        for student_id in promoted:
+            events.publish(ChangeEvent(ENROLLED, "student", student_id, course_id))
+    return {"message": "Course capacity updated successfully"}, 200
+
+@_serialized
+def set_course_meetings(course_id: int, meetings: list):
+    if not valid_meetings(meetings):
+        return {"message": "Invalid meeting time"}, 400
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        conn.begin()
+        cursor.execute('SELECT id FROM courses WHERE id = ?', (course_id,))
+        if cursor.fetchone() is None:
+            conn.rollback()
+            return {"message": "Course not found"}, 404
+        cursor.execute('DELETE FROM course_meetings WHERE course_id = ?', (course_id,))
+        cursor.executemany('INSERT INTO course_meetings (course_id, starts_at, ends_at) VALUES (?, ?, ?)', [(course_id, start, end) for start, end in meetings])
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    events.publish(ChangeEvent(UPDATED, "course", course_id))
+    return {"message": "Course meetings updated successfully"}, 200
+
+def find_schedule_conflicts():
+    conn = get_db_connection()
+    report = {}
+    for label, table, column in (("students", "registrations", "student_id"), ("instructors", "course_instructors", "instructor_id")):
+        meetings = conn.execute(f'''
+            SELECT course_meetings.starts_at, course_meetings.ends_at, member.{column}, member.course_id
+            FROM course_meetings JOIN {table} AS member ON member.course_id = course_meetings.course_id
+        ''').fetchall()
+        report[label] = [{column: person_id, "courses": [first, second]} for person_id, first, second in find_conflicts(map(tuple, meetings))]
+    conn.close()
+    return report, 200
+
+def similar_courses(course_id: int, k: int = 5):
+    return {"courses": [{"course_id": other, "shared_students": shared} for other, shared in recommender.similar_courses(course_id, k)]}, 200
+
+def get_statistics(top: int = 10):
+    return statistics.summary(top), 200
+
+def verify_statistics():
+    conn = get_db_connection()
+    recomputed = EnrollmentStatistics()
+    recomputed.load(*_statistics_source(conn))
+    conn.close()
+    differences = statistics.differences(recomputed)
+    if differences:
+        return {"message": "Statistics are out of date", "differences": differences}, 500
+    return {"message": "Statistics are up to date"}, 200
+
+@_serialized
+def verify_enrollment_counters(repair: bool = False):
+    """
+    This function recounts the memberships behind every counter column and reports the rows
+    whose stored count has drifted, as {table: {id: [stored, actual]}}. With repair=True the
+    drifted counters are also set to the recounted values.
+    """
+    conn = get_db_connection()
+    try:
+        if repair:
+            conn.begin()
+        drift = {}
+        for table, (counter, member_table, column) in ENROLLMENT_COUNTERS.items():
+            actual = f'(SELECT COUNT(*) FROM {member_table} WHERE {member_table}.{column} = {table}.id)'
+            rows = conn.execute(f'SELECT id, {counter}, {actual} FROM {table} WHERE {counter} != {actual}').fetchall()
+            if rows:
+                drift[table] = {row[0]: [row[1], row[2]] for row in rows}
+                if repair:
+                    conn.execute(f'UPDATE {table} SET {counter} = {actual} WHERE {counter} != {actual}')
+        if repair:
+            conn.commit()
+            if drift and _read_cache is not None:
+                _read_cache.bump(*drift)
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    if not drift:
+        return {"message": "Enrollment counters are up to date"}, 200
+    if repair:
+        return {"message": "Enrollment counters repaired", "differences": drift}, 200
+    return {"message": "Enrollment counters are out of date", "differences": drift}, 500
+
+@_cached_read("courses", "students", "waitlist")
+def get_waitlist(course_id: int):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT id FROM courses WHERE id = ?', (course_id,))
+    if cursor.fetchone() is None:
         conn.close()
         return {"message": "Course not found"}, 404
+    cursor.execute('''
+        SELECT students.* FROM waitlist
+        JOIN students ON students.id = waitlist.student_id
+        WHERE waitlist.course_id = ?
+        ORDER BY waitlist.position
+    ''', (course_id,))
+    students = cursor.fetchall()
     conn.close()
-    return {"message": "Course deleted successfully"}, 200
+    return {"waitlist": [Student(student['name'], student['age'], student['email'], student['id']) for student in students]}, 200
 
+@_cached_read("courses")
 def get_courses():
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM courses')
     courses = cursor.fetchall()
     conn.close()
-    courses = [Course(course['name'], course['description'], course['id']) for course in courses]
+    courses = [Course(course['name'], course['description'], course['id'], course['capacity']) for course in courses]
     return {"courses": courses}, 200
 
+@_cached_read("courses")
+def list_courses(sort_by: str = "name", limit: int = 50, cursor: str = None):
+    page, status = _list_page('courses', sort_by, limit, cursor)
+    if status != 200:
+        return page, status
+    courses = [Course(course['name'], course['description'], course['id'], course['capacity']) for course in page["rows"]]
+    return {"courses": courses, "next_cursor": page["next_cursor"]}, 200
+
+@_cached_read("courses")
+def get_course_enrollment(course_id: int):
+    conn = get_db_connection()
+    seats = _course_seats(conn.cursor(), course_id)
+    conn.close()
+    if seats is None:
+        return {"message": "Course not found"}, 404
+    seats_left = None if seats['capacity'] is None else max(0, seats['capacity'] - seats['enrolled'])
+    return {"course_id": course_id, "students": seats['enrolled'], "capacity": seats['capacity'], "seats_left": seats_left}, 200
+
+@_cached_read("courses")
+def most_popular_courses(k: int = 10):
+    """
+    This function returns the k courses with the most students as {"course_id", "name",
+    "students"} entries, read off the popularity index.
+    """
+    conn = get_db_connection()
+    rows = conn.execute('SELECT id, name, student_count FROM courses ORDER BY student_count DESC, id DESC LIMIT ?', (k,)).fetchall()
+    conn.close()
+    return {"courses": [{"course_id": row['id'], "name": row['name'], "students": row['student_count']} for row in rows]}, 200
+
+@_cached_read("courses")
 def get_course_id_by_name(course_name: str):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -398,11 +1782,12 @@ def get_course_id_by_name(course_name: str):
     conn.close()
     return {"course_id": course[0]}, 200
 
-def search_courses(search_type: str, search_term: str):
+@_cached_read("courses")
+def search_courses(search_type: str, search_term: str, limit: int = 50):
     conn = get_db_connection()
     cursor = conn.cursor()
-    if search_type == "name":
-        cursor.execute('SELECT * FROM courses WHERE name LIKE ?', (f'%{search_term}%',))
+    if search_type in ("name", "description", "text"):
+        cursor.execute(*_full_text_query('courses', search_type, search_term, limit))
     elif search_type == "id":
         cursor.execute('SELECT * FROM courses WHERE id = ?', (search_term,))
     else:
@@ -410,16 +1795,23 @@ def search_courses(search_type: str, search_term: str):
         return {"message": "Invalid search type"}, 400
     courses = cursor.fetchall()
     conn.close()
-    courses = [Course(course['name'], course['description'], course['id']) for course in courses]
+    courses = [Course(course['name'], course['description'], course['id'], course['capacity']) for course in courses]
     return {"courses": courses}, 200
 
+@_serialized
 def update_course(course_id: int, name: str, description: str):
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('UPDATE courses SET name = ?, description = ? WHERE id = ?', (name, description, course_id))
-    conn.commit()
-    if cursor.rowcount == 0:
+    try:
+        conn.begin()
+        cursor.execute('UPDATE courses SET name = ?, description = ? WHERE id = ?', (name, description, course_id))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
         conn.close()
+    if cursor.rowcount == 0:
         return {"message": "Course not found"}, 404
-    conn.close()
+    events.publish(ChangeEvent(UPDATED, "course", course_id, payload=Course(name, description, course_id)))
     return {"message": "Course updated successfully"}, 200
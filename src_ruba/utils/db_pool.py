@@ -0,0 +1,160 @@
+"""
+Persistent SQLite connections for db_controllers.py.
+
+Opening a connection costs more than most of the queries run on it, so ConnectionPool keeps
+one connection per thread and hands it out again on every borrow. Connections are opened with
+the pragmas in PRAGMAS: WAL journaling so readers never wait for the writer, synchronous=NORMAL
+(durable at every checkpoint, one fsync less per commit), a larger page cache, memory-mapped
+reads and enforced foreign keys, which SQLite leaves off unless every connection asks for them.
+
+Connections come from a sqlite3.Connection subclass whose close() gives the connection back
+instead of closing it. Borrows nest: only when the outermost borrower gives it back is any
+transaction it left open rolled back, so the next borrower always starts clean. A connection
+that has been idle for health_check_interval seconds is checked with a trivial query before it
+is handed out again and replaced if it no longer works. close_all() closes every connection.
+
+Writers start their transaction with begin(). While a unit of work is open on the connection
+(savepoints is a list), begin() opens a savepoint instead, and commit() and rollback() release
+or roll back to it, so the writer's statements join the surrounding transaction.
+"""
+import sqlite3
+import threading
+import time
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+)
+
+
+class PooledConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = None
+        self.borrowed = 0
+        self.last_used = time.monotonic()
+        self.savepoints = None
+
+    def begin(self) -> None:
+        """
+        This method starts a write transaction, or a savepoint inside an open unit of work.
+        """
+        if self.savepoints is None:
+            self.execute('BEGIN IMMEDIATE')
+        else:
+            name = f'step_{len(self.savepoints)}'
+            self.execute(f'SAVEPOINT {name}')
+            self.savepoints.append(name)
+
+    def commit(self) -> None:
+        if self.savepoints is None:
+            super().commit()
+        elif self.savepoints:
+            self.execute(f'RELEASE {self.savepoints.pop()}')
+
+    def rollback(self) -> None:
+        if self.savepoints is None:
+            super().rollback()
+        elif self.savepoints:
+            name = self.savepoints.pop()
+            self.execute(f'ROLLBACK TO {name}')
+            self.execute(f'RELEASE {name}')
+
+    def close(self) -> None:
+        """
+        This method gives the connection back to its pool, or closes it if it has none.
+        """
+        if self.pool is None:
+            super().close()
+        else:
+            self.pool.release(self)
+
+    def discard(self) -> None:
+        super().close()
+
+
+class ConnectionPool:
+    def __init__(self, path: str, pragmas: tuple = PRAGMAS, timeout: float = 5.0, health_check_interval: float = 30.0, uri: bool = False):
+        self.path = path
+        self.uri = uri
+        self.pragmas = pragmas
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}
+        self._closed = False
+
+    def acquire(self) -> PooledConnection:
+        """
+        This method returns the calling thread's connection, opening it on first use.
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and conn.borrowed == 0 and time.monotonic() - conn.last_used > self.health_check_interval and not self._healthy(conn):
+            self._forget(conn)
+            conn = None
+        if conn is None:
+            conn = self._open()
+        conn.borrowed += 1
+        return conn
+
+    def release(self, conn: PooledConnection) -> None:
+        if conn.borrowed == 0:
+            return
+        conn.borrowed -= 1
+        conn.last_used = time.monotonic()
+        if conn.borrowed == 0 and conn.in_transaction:
+            conn.savepoints = None
+            conn.rollback()
+
+    def close_all(self) -> None:
+        """
+        This method closes every connection of the pool. Borrowing from it afterwards raises
+        sqlite3.ProgrammingError.
+        """
+        with self._lock:
+            self._closed = True
+            connections, self._connections = list(self._connections.values()), {}
+        for conn in connections:
+            conn.discard()
+
+    def __len__(self):
+        return len(self._connections)
+
+    def _open(self) -> PooledConnection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, factory=PooledConnection, check_same_thread=False, uri=self.uri)
+        conn.row_factory = sqlite3.Row
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        conn.pool = self
+        self._local.conn = conn
+        thread = threading.current_thread()
+        with self._lock:
+            self._connections[thread] = conn
+            # Threads that have finished cannot borrow their connection again.
+            for other in [other for other in self._connections if not other.is_alive()]:
+                self._connections.pop(other).discard()
+        return conn
+
+    def _forget(self, conn: PooledConnection) -> None:
+        self._local.conn = None
+        with self._lock:
+            self._connections.pop(threading.current_thread(), None)
+        try:
+            conn.discard()
+        except sqlite3.Error:
+            pass
+
+    @staticmethod
+    def _healthy(conn: PooledConnection) -> bool:
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
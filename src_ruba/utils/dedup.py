@@ -0,0 +1,143 @@
+"""
+Duplicate-person detection with blocking.
+
+Comparing every pair of people is quadratic, so each person is first given a few blocking
+keys and only people sharing a key are compared:
+
+- the normalized local part of their email ("J.Smith+cs@x.edu" -> "jsmith"),
+- the Soundex codes of their name tokens together with an age band,
+- the Soundex codes of their names after the first, together with an age band, which still
+  match when the first name is abbreviated ("J. Smith") or misspelled.
+
+Each age is put in two overlapping bands, so people whose ages differ by up to two years
+always share one. Candidate pairs are scored from name similarity, email similarity and age
+difference, each text compared as the Dice coefficient of its sets of letter pairs.
+"""
+from itertools import combinations
+
+_SOUNDEX_CODES = {letter: str(code) for code, letters in enumerate(
+    ("aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r")) for letter in letters}
+
+
+def soundex(word: str) -> str:
+    letters = [letter for letter in word.lower() if letter in _SOUNDEX_CODES]
+    if not letters:
+        return ""
+    code, previous = letters[0].upper(), _SOUNDEX_CODES[letters[0]]
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES[letter]
+        if digit != '0' and digit != previous:
+            code += digit
+        if letter not in "hw":
+            previous = digit
+    return (code + "000")[:4]
+
+
+def normalize_name(name: str) -> str:
+    return " ".join("".join(char for char in token if char.isalpha()) for token in name.lower().split())
+
+
+def email_local_part(email: str) -> str:
+    local = email.lower().split('@')[0].split('+')[0]
+    return "".join(char for char in local if char.isalnum())
+
+
+def bigrams(tokens: list) -> frozenset:
+    return frozenset(padded[i:i + 2] for padded in (f' {token} ' for token in tokens) for i in range(len(padded) - 1))
+
+
+def dice(first: frozenset, second: frozenset) -> float:
+    if not first or not second:
+        return 0.0
+    return 2 * len(first & second) / (len(first) + len(second))
+
+
+class _Person:
+    __slots__ = ('kind', 'id', 'age', 'email', 'local', 'sorted_name')
+
+    def __init__(self, record: tuple):
+        self.kind, self.id, name, self.age, email = record
+        self.email = (email or "").lower()
+        self.local = email_local_part(self.email)
+        self.sorted_name = " ".join(sorted(normalize_name(name or "").split()))
+
+
+def blocking_keys(name: str, age, email: str) -> set:
+    keys = set()
+    local = email_local_part(email or "")
+    if local:
+        keys.add(("email", local))
+    tokens = normalize_name(name or "").split()
+    codes = [soundex(token) for token in tokens if len(token) > 1]
+    surnames = [soundex(token) for token in tokens[1:] if len(token) > 1]
+    if age is not None:
+        for band in {age // 5, (age + 2) // 5}:
+            if codes:
+                keys.add(("name", " ".join(sorted(codes)), band))
+            if surnames:
+                keys.add(("surname", " ".join(surnames), band))
+    return keys
+
+
+def _score(first: _Person, second: _Person, first_bigrams: tuple, second_bigrams: tuple) -> float:
+    if first.email and first.email == second.email:
+        email_score = 1.0
+    else:
+        email_score = dice(first_bigrams[1], second_bigrams[1])
+    name_score = dice(first_bigrams[0], second_bigrams[0])
+    if first.age is None or second.age is None:
+        age_score = 0.5
+    else:
+        age_score = max(0.0, 1 - abs(first.age - second.age) / 5)
+    return 0.5 * name_score + 0.35 * email_score + 0.15 * age_score
+
+
+def _pairs(members: list, people: list, window: int):
+    if len(members) <= window:
+        yield from combinations(members, 2)
+        return
+    members = sorted(members, key=lambda index: (people[index].sorted_name, people[index].local))
+    for position, first in enumerate(members):
+        for second in members[position + 1:position + 1 + window]:
+            yield (first, second) if first < second else (second, first)
+
+
+def find_duplicates(records, threshold: float = 0.8, window: int = 10) -> list:
+    """
+    This function takes (kind, id, name, age, email) records, where kind is "student" or
+    "instructor", and returns merge candidates as dictionaries with both records' kind and ID and
+    the score, best first. Within blocks larger than window people are sorted by name and only
+    compared with their next window neighbours, which keeps the work linear in the number of
+    records.
+
+    Blocks are keyed by the hash of their key and letter pairs are only built for the block being
+    compared, so memory stays at a few small objects per record even at a million records.
+    """
+    people, blocks = [], {}
+    for index, record in enumerate(records):
+        people.append(_Person(record))
+        for key in map(hash, blocking_keys(record[2], record[3], record[4])):
+            members = blocks.get(key)
+            if members is None:
+                blocks[key] = index
+            elif isinstance(members, int):
+                blocks[key] = [members, index]
+            else:
+                members.append(index)
+    scores = {}
+    for members in blocks.values():
+        if isinstance(members, int):
+            continue
+        features = {index: (bigrams(people[index].sorted_name.split()), bigrams([people[index].local])) for index in members}
+        for first, second in _pairs(members, people, window):
+            if (first, second) not in scores:
+                score = _score(people[first], people[second], features[first], features[second])
+                if score >= threshold:
+                    scores[first, second] = score
+    candidates = [{
+        "first": {"kind": people[first].kind, "id": people[first].id},
+        "second": {"kind": people[second].kind, "id": people[second].id},
+        "score": round(score, 3),
+    } for (first, second), score in scores.items()]
+    candidates.sort(key=lambda candidate: -candidate["score"])
+    return candidates
@@ -0,0 +1,160 @@
+import itertools
+import threading
+from contextlib import contextmanager
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+ENROLLED = "enrolled"
+UNENROLLED = "unenrolled"
+
+
+class ChangeEvent:
+    """
+    A single change published by the controllers. kind is one of CREATED, UPDATED, DELETED,
+    ENROLLED or UNENROLLED and entity is "student", "instructor" or "course". Enrollment
+    events also carry the course_id, and payload holds the affected object when there is one.
+    """
+    def __init__(self, kind: str, entity: str, entity_id: int, course_id: int = None, payload=None):
+        self.kind = kind
+        self.entity = entity
+        self.entity_id = entity_id
+        self.course_id = course_id
+        self.payload = payload
+
+    def key(self) -> tuple:
+        return (self.entity, self.entity_id, self.course_id)
+
+    def __eq__(self, other):
+        return isinstance(other, ChangeEvent) and (self.kind, self.key()) == (other.kind, other.key())
+
+    def __repr__(self):
+        return f"ChangeEvent(kind={self.kind}, entity={self.entity}, entity_id={self.entity_id}, course_id={self.course_id})"
+
+
+def coalesce(events: list) -> list:
+    """
+    This function collapses a sequence of events into the net changes, in order of each
+    entity's first change: created then deleted cancels out, repeated updates keep the last one,
+    an enrollment undone in the same batch disappears, and so on.
+    """
+    net = {}
+    for event in events:
+        key = event.key()
+        previous = net.get(key)
+        if previous is None:
+            net[key] = event
+        elif (previous.kind, event.kind) in ((CREATED, DELETED), (ENROLLED, UNENROLLED), (UNENROLLED, ENROLLED)):
+            del net[key]
+        elif (previous.kind, event.kind) == (CREATED, UPDATED):
+            net[key] = ChangeEvent(CREATED, event.entity, event.entity_id, event.course_id, event.payload)
+        elif (previous.kind, event.kind) == (DELETED, CREATED):
+            net[key] = ChangeEvent(UPDATED, event.entity, event.entity_id, event.course_id, event.payload)
+        else:
+            net[key] = event
+    return list(net.values())
+
+
+class EventBus:
+    """
+    Delivers ChangeEvents to subscribers in the publishing thread. Inside batch() delivery is
+    held back until the outermost batch ends, so subscribers never run while a controller
+    still holds its locks. Immediate subscribers are the exception: they get every event as it
+    is published, under those locks, and so in the order the changes were made.
+    """
+    def __init__(self):
+        self._subscribers = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def subscribe(self, callback, kinds: tuple = None, entities: tuple = None, coalesce: bool = False,
+                  immediate: bool = False) -> int:
+        """
+        This method registers a callback and returns a token for unsubscribe(). Optional kinds and
+        entities restrict which events it receives. Plain subscribers are called with one event at a
+        time; coalescing subscribers are called with the list of net changes of each batch.
+        Immediate subscribers are called with each event inside publish(), even within a batch. They
+        must be quick and must not call the controllers, and they also see events that
+        rollback_to() later drops.
+        """
+        assert not (coalesce and immediate), 'An immediate subscriber gets events one at a time.'
+        with self._lock:
+            token = next(self._ids)
+            subscribers = dict(self._subscribers)
+            subscribers[token] = (callback, kinds, entities, coalesce, immediate)
+            self._subscribers = subscribers
+        return token
+
+    def unsubscribe(self, token: int) -> bool:
+        with self._lock:
+            if token not in self._subscribers:
+                return False
+            subscribers = dict(self._subscribers)
+            del subscribers[token]
+            self._subscribers = subscribers
+        return True
+
+    def publish(self, event: ChangeEvent) -> None:
+        if not self._subscribers:
+            return
+        pending = getattr(self._local, 'pending', None)
+        if pending is not None:
+            self._deliver([event], immediate=True)
+            pending.append(event)
+        else:
+            self._deliver([event])
+
+    @contextmanager
+    def batch(self):
+        if getattr(self._local, 'pending', None) is not None:
+            yield
+            return
+        self._local.pending = []
+        try:
+            yield
+        finally:
+            events, self._local.pending = self._local.pending, None
+            if events:
+                self._deliver(events, immediate=False)
+
+    def batching(self) -> bool:
+        """
+        This method returns whether the calling thread is inside batch(), so that events it
+        publishes are not delivered yet.
+        """
+        return getattr(self._local, 'pending', None) is not None
+
+    def mark(self) -> int:
+        """
+        This method returns the position reached in the calling thread's current batch, for
+        rollback_to().
+        """
+        pending = getattr(self._local, 'pending', None)
+        return 0 if pending is None else len(pending)
+
+    def rollback_to(self, mark: int) -> None:
+        """
+        This method drops the events published in the current batch since mark, for changes that
+        were rolled back before the batch was delivered.
+        """
+        pending = getattr(self._local, 'pending', None)
+        if pending is not None:
+            del pending[mark:]
+
+    def _deliver(self, events: list, immediate: bool = None) -> None:
+        # immediate=True reaches only the immediate subscribers and False only the others.
+        net = None
+        for callback, kinds, entities, coalescing, on_publish in self._subscribers.values():
+            if immediate is not None and on_publish != immediate:
+                continue
+            if coalescing and net is None:
+                net = coalesce(events)
+            wanted = [event for event in (net if coalescing else events)
+                      if (kinds is None or event.kind in kinds) and (entities is None or event.entity in entities)]
+            if coalescing:
+                if wanted:
+                    callback(wanted)
+            else:
+                for event in wanted:
+                    callback(event)
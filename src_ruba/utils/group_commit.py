@@ -0,0 +1,130 @@
+"""
+Single-writer group commit for the SQLite controllers.
+
+Threads that write through db_controllers at the same time contend for SQLite's write lock:
+the losers sleep in the busy handler and retry, and throughput drops as callers are added.
+GroupCommitWriter gives the database a single writer instead. Callers put their write on a
+queue and wait on a Future; a dedicated thread takes the first queued write together with
+whatever else is queued behind it, up to max_batch writes, and runs them all in one transaction,
+each in a savepoint of its own. Writes that arrive while a batch commits form the next batch, so
+batches grow with the number of callers without any waiting. A max_delay above zero also holds
+each batch open for that many seconds to collect more writes, which only pays when commits are
+much slower than the writes themselves. Only after the transaction has committed are the
+callers' futures completed, so a result never reports a write that could still be lost.
+
+A write that raises is rolled back to its savepoint and its future gets the exception; the
+rest of the batch still commits. If the transaction cannot be opened or committed, every
+future of the batch gets that error. Once stop() has been called submit() refuses new writes,
+and anything still queued when the writer thread ends fails instead of waiting forever.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    def __init__(self, transaction, max_batch: int = 64, max_delay: float = 0.0):
+        """
+        transaction is a context manager factory that opens a transaction on the calling
+        thread's connection and, when nested, a savepoint, like db_controllers.unit_of_work.
+        """
+        assert max_batch > 0, 'A batch needs room for at least one write.'
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._transaction = transaction
+        self._queue = queue.Queue()
+        self._stopped = False
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='school-writer', daemon=True)
+        self.batches = 0
+        self.writes = 0
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """
+        This method stops the writer once the writes queued before it have been committed.
+        """
+        with self._submit_lock:
+            if not self._stopped:
+                self._stopped = True
+                self._queue.put(_STOP)
+        if wait and self._thread.is_alive() and not self.is_writer_thread():
+            self._thread.join()
+
+    def is_writer_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, function, *args, **kwargs) -> Future:
+        """
+        This method queues function(*args, **kwargs) for the writer thread and returns a Future
+        that completes with its return value once the batch it ran in has committed. It raises
+        RuntimeError once the writer has been stopped.
+        """
+        future = Future()
+        with self._submit_lock:
+            if self._stopped:
+                raise RuntimeError('The writer has been stopped.')
+            self._queue.put((future, function, args, kwargs))
+        return future
+
+    def _run(self) -> None:
+        try:
+            self._write_batches()
+        finally:
+            self._drain()
+
+    def _write_batches(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch, deadline = [first], time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _drain(self) -> None:
+        error = RuntimeError('The writer stopped before this write ran.')
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and item[0].set_running_or_notify_cancel():
+                item[0].set_exception(error)
+
+    def _commit(self, batch: list) -> None:
+        outcomes = []
+        try:
+            with self._transaction():
+                for future, function, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with self._transaction():
+                            outcomes.append((future, function(*args, **kwargs), None))
+                    except Exception as error:
+                        outcomes.append((future, None, error))
+        except Exception as error:
+            # The transaction failed as a whole, possibly before any write ran.
+            outcomes = [(future, None, error) for future, _, _, _ in batch if not future.cancelled()]
+        self.batches += 1
+        self.writes += len(outcomes)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
@@ -0,0 +1,45 @@
+from bisect import bisect_left, bisect_right, insort
+
+
+class SortedIndex:
+    """
+    Keeps the entities of one collection ordered by a sort key, with the entity ID as tie
+    breaker, so pages and ranges can be found with a binary search instead of a full sort.
+    """
+    def __init__(self, key):
+        self._key = key
+        self._entries = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entry(self, entity_id, entity) -> tuple:
+        return (self._key(entity), entity_id)
+
+    def add(self, entity_id, entity) -> None:
+        insort(self._entries, self.entry(entity_id, entity))
+
+    def remove(self, entity_id, entity) -> None:
+        entry = self.entry(entity_id, entity)
+        position = bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+
+    def rebuild(self, entities: dict) -> None:
+        self._entries = sorted(self.entry(entity_id, entity) for entity_id, entity in entities.items())
+
+    def page(self, after: tuple = None, limit: int = 50) -> list:
+        """
+        This method returns up to limit (key, ID) entries that come strictly after the given entry.
+        """
+        start = 0 if after is None else bisect_right(self._entries, tuple(after))
+        return self._entries[start:start + limit]
+
+    def ids_between(self, low=None, high=None) -> list:
+        """
+        This method returns the IDs whose key lies in the inclusive range [low, high].
+        A missing bound leaves that side of the range open.
+        """
+        start = 0 if low is None else bisect_left(self._entries, (low,))
+        end = len(self._entries) if high is None else bisect_left(self._entries, (high, float('inf')))
+        return [entity_id for _, entity_id in self._entries[start:end]]
@@ -0,0 +1,94 @@
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """
+    A lock that lets many readers in at once but gives writers exclusive access.
+    Waiting writers block new readers so a steady stream of reads cannot starve them.
+    """
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    def acquire_read(self) -> None:
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class LockStripes:
+    """
+    A fixed set of locks that keys are hashed onto, so unrelated keys rarely contend
+    without having to keep one lock per key.
+    """
+    def __init__(self, stripes: int = 64):
+        assert stripes > 0, 'At least one stripe is required.'
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def index(self, key) -> int:
+        return hash(key) % len(self._locks)
+
+    def lock_for(self, key) -> threading.RLock:
+        return self._locks[self.index(key)]
+
+    @contextmanager
+    def locked(self, *keys):
+        """
+        This method holds the stripes of all the given keys. Stripes are always taken
+        in index order so two callers locking overlapping keys cannot deadlock.
+        """
+        locks = [self._locks[i] for i in sorted({self.index(key) for key in keys})]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+
+@contextmanager
+def unlocked(*args):
+    yield
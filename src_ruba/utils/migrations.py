@@ -0,0 +1,71 @@
+"""
+Versioned schema migrations for the SQLite database.
+
+A migration is a function that takes a cursor and changes the schema. The database records how
+many migrations it has had in PRAGMA user_version, so migrate() applies only the ones that are
+newer, each in its own transaction together with the version bump. A failed migration is rolled
+back and leaves the version where it was. Migrations are written to also work on databases
+created before the schema was versioned (user_version 0), which already have some of the
+tables and indexes.
+
+unindexed_queries() runs EXPLAIN QUERY PLAN over a set of queries and reports the ones SQLite
+would answer by scanning a whole table or index.
+"""
+import sqlite3
+
+
+def schema_version(conn) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn, migrations: tuple) -> int:
+    """
+    This function applies the migrations the database has not had yet, in order, and returns
+    how many it applied. The version is read again after taking the write lock, so two processes
+    migrating the same file apply each migration once.
+    """
+    if schema_version(conn) > len(migrations):
+        raise sqlite3.DatabaseError(f'Database schema version {schema_version(conn)} is newer than the {len(migrations)} known migrations')
+    applied = 0
+    while True:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            version = schema_version(conn)
+            if version >= len(migrations):
+                conn.rollback()
+                return applied
+            migrations[version](conn.cursor())
+            conn.execute(f'PRAGMA user_version = {version + 1}')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        applied += 1
+
+
+def query_plan(conn, query: str, parameters: tuple = ()) -> list:
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {query}', parameters)]
+
+
+def _unindexed_step(step: str, ordered: bool) -> bool:
+    # Walking an index in order for ORDER BY ... LIMIT shows up as SCAN ... USING INDEX.
+    if ordered and ('USING INDEX' in step or 'USING COVERING INDEX' in step):
+        return False
+    return step.startswith('SCAN ')
+
+
+def unindexed_queries(conn, queries: dict, ordered_scans: tuple = ()) -> dict:
+    """
+    This function takes {name: (query, parameters)} and returns {name: plan} for the queries
+    whose plan scans a table or an index instead of searching one. The queries named in
+    ordered_scans are ORDER BY ... LIMIT pages and may also read an index in order, which stops
+    after LIMIT rows; they must have a LIMIT.
+    """
+    problems = {}
+    for name, (query, parameters) in queries.items():
+        ordered = name in ordered_scans
+        assert not ordered or 'LIMIT' in query.upper(), f'{name} reads an index in order without a LIMIT.'
+        plan = query_plan(conn, query, parameters)
+        if any(_unindexed_step(step, ordered) for step in plan):
+            problems[name] = plan
+    return problems
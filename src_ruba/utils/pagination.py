@@ -0,0 +1,26 @@
+import base64
+import binascii
+import json
+
+
+def encode_cursor(sort_by: str, key, entity_id: int) -> str:
+    """
+    This function turns the last entry of a page into an opaque cursor for the next page.
+    """
+    payload = json.dumps([sort_by, key, entity_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, sort_by: str):
+    """
+    This function returns the (key, ID) entry stored in a cursor, or None if the cursor is
+    malformed or was issued for a different sort order.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, key, entity_id = json.loads(payload)
+    except (ValueError, TypeError, binascii.Error):
+        return None
+    if cursor_sort != sort_by:
+        return None
+    return key, entity_id
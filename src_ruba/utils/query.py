@@ -0,0 +1,155 @@
+"""
+Compound filters over students and instructors.
+
+Filters are combined with & (AND), | (OR) and ~ (NOT) and can be evaluated two ways:
+against the in-memory indexes kept by controllers.py, where they become set algebra over
+ID sets, or compiled into a parameterised SQL WHERE clause for db_controllers.py.
+
+    (AgeBetween(18, 21) & EnrolledIn(3)) & ~EnrolledIn(5)
+"""
+from abc import ABC, abstractmethod
+
+ATTRIBUTES = ("id", "name", "email")
+
+
+class Filter(ABC):
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    @abstractmethod
+    def ids(self, scope) -> set:
+        """
+        This method returns the IDs of the entities in scope that match the filter.
+        """
+
+    @abstractmethod
+    def to_sql(self, person: str) -> tuple:
+        """
+        This method returns a (clause, parameters) pair for the students or instructors table.
+        """
+
+
+class AgeBetween(Filter):
+    def __init__(self, low: int = None, high: int = None):
+        self.low = low
+        self.high = high
+
+    def ids(self, scope) -> set:
+        return scope.age_between(self.low, self.high)
+
+    def to_sql(self, person: str) -> tuple:
+        if self.low is not None and self.high is not None:
+            return 'age BETWEEN ? AND ?', [self.low, self.high]
+        if self.low is not None:
+            return 'age >= ?', [self.low]
+        if self.high is not None:
+            return 'age <= ?', [self.high]
+        return '1', []
+
+    def __repr__(self):
+        return f"AgeBetween(low={self.low}, high={self.high})"
+
+
+class Equals(Filter):
+    def __init__(self, attribute: str, value):
+        assert attribute in ATTRIBUTES, f'Filters can only compare {", ".join(ATTRIBUTES)}.'
+        self.attribute = attribute
+        self.value = value
+
+    def ids(self, scope) -> set:
+        return scope.equals(self.attribute, self.value)
+
+    def to_sql(self, person: str) -> tuple:
+        return f'{self.attribute} = ?', [self.value]
+
+    def __repr__(self):
+        return f"Equals(attribute={self.attribute}, value={self.value})"
+
+
+class EnrolledIn(Filter):
+    def __init__(self, course_id: int):
+        self.course_id = course_id
+
+    def ids(self, scope) -> set:
+        return scope.enrolled_in(self.course_id)
+
+    def to_sql(self, person: str) -> tuple:
+        if person == "students":
+            return 'id IN (SELECT student_id FROM registrations WHERE course_id = ?)', [self.course_id]
+        return 'id IN (SELECT instructor_id FROM course_instructors WHERE course_id = ?)', [self.course_id]
+
+    def __repr__(self):
+        return f"EnrolledIn(course_id={self.course_id})"
+
+
+class Not(Filter):
+    def __init__(self, child: Filter):
+        self.child = child
+
+    def ids(self, scope) -> set:
+        return scope.all_ids() - self.child.ids(scope)
+
+    def to_sql(self, person: str) -> tuple:
+        clause, parameters = self.child.to_sql(person)
+        return f'NOT ({clause})', parameters
+
+    def __repr__(self):
+        return f"Not({self.child})"
+
+
+class And(Filter):
+    def __init__(self, *children: Filter):
+        assert children, 'And needs at least one filter.'
+        self.children = children
+
+    def ids(self, scope) -> set:
+        included = sorted((child.ids(scope) for child in self.children if not isinstance(child, Not)), key=len)
+        excluded = [child.child for child in self.children if isinstance(child, Not)]
+        result = set(included[0]) if included else scope.all_ids()
+        for ids in included[1:]:
+            result &= ids
+        for child in excluded:
+            if not result:
+                break
+            result -= child.ids(scope)
+        return result
+
+    def to_sql(self, person: str) -> tuple:
+        clauses, parameters = [], []
+        for child in self.children:
+            clause, child_parameters = child.to_sql(person)
+            clauses.append(f'({clause})')
+            parameters.extend(child_parameters)
+        return ' AND '.join(clauses), parameters
+
+    def __repr__(self):
+        return f"And{self.children}"
+
+
+class Or(Filter):
+    def __init__(self, *children: Filter):
+        assert children, 'Or needs at least one filter.'
+        self.children = children
+
+    def ids(self, scope) -> set:
+        result = set()
+        for child in self.children:
+            result |= child.ids(scope)
+        return result
+
+    def to_sql(self, person: str) -> tuple:
+        clauses, parameters = [], []
+        for child in self.children:
+            clause, child_parameters = child.to_sql(person)
+            clauses.append(f'({clause})')
+            parameters.extend(child_parameters)
+        return ' OR '.join(clauses), parameters
+
+    def __repr__(self):
+        return f"Or{self.children}"
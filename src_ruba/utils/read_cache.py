@@ -0,0 +1,70 @@
+"""
+Generation-tagged result cache for the SQLite read controllers.
+
+Every table has a generation counter that goes up whenever a write to it is delivered as a
+change event. A cached result is stored with the generations of the tables it was read from,
+taken before the query ran, and is only served while all of them are unchanged, so a write
+that lands during or after the query makes the entry unusable instead of stale. Entries are
+kept in least recently used order and the oldest are dropped beyond maxsize.
+
+Only changes made through the controllers of this process bump generations; a cache must not
+be used while another process writes to the same database.
+"""
+import threading
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class ReadCache:
+    def __init__(self, maxsize: int = 256):
+        assert maxsize > 0, 'The cache needs room for at least one result.'
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def attach(self, bus, tables_of) -> int:
+        """
+        This method subscribes the cache to an EventBus and returns the subscription token.
+        tables_of(event) returns the tables the change may have touched.
+        """
+        return bus.subscribe(lambda event: self.bump(*tables_of(event)))
+
+    def generations(self, tables: tuple) -> tuple:
+        return tuple(self._generations.get(table, 0) for table in tables)
+
+    def get(self, key, tables: tuple):
+        """
+        This method returns the result cached under key, or MISSING if there is none or any of
+        tables has changed since it was read.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == self.generations(tables):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return MISSING
+
+    def put(self, key, generations: tuple, result) -> None:
+        with self._lock:
+            self._entries[key] = (generations, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def bump(self, *tables) -> None:
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,142 @@
+"""
+Course recommendations from co-enrollment ("students who took X also took Y").
+
+CoEnrollmentRecommender keeps, for every course, how many students share it with each other
+course. build() computes those counts in one pass from the enrollments: with SciPy installed
+as the sparse product AᵀA of the student×course incidence matrix A, otherwise by counting the
+course pairs of each student. After that, attach() keeps them current from change events,
+touching only the other courses of the student whose enrollment changed.
+
+NumPy and SciPy are optional; everything works without them, only build() is slower.
+"""
+import heapq
+import threading
+from collections import Counter
+
+from src_ruba.utils.events import DELETED, ENROLLED, UNENROLLED
+
+try:
+    import numpy
+    from scipy import sparse
+except ImportError:
+    numpy = sparse = None
+
+
+class CoEnrollmentRecommender:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._courses_of = {}
+        self._students_of = {}
+        self._co_enrolled = {}
+
+    def attach(self, bus, immediate: bool = False) -> int:
+        """
+        This method subscribes the recommender to an EventBus and returns the subscription token.
+        immediate works as in EnrollmentStatistics.attach().
+        """
+        return bus.subscribe(self.apply, kinds=(ENROLLED, UNENROLLED, DELETED), entities=("student", "course"), immediate=immediate)
+
+    def build(self, enrollments) -> None:
+        """
+        This method replaces the co-enrollment counts with ones computed from an iterable of
+        (student_id, course_id) pairs.
+        """
+        courses_of, students_of = {}, {}
+        for student_id, course_id in enrollments:
+            courses_of.setdefault(student_id, set()).add(course_id)
+            students_of.setdefault(course_id, set()).add(student_id)
+        co_enrolled = _sparse_counts(courses_of) if sparse is not None else _pair_counts(courses_of)
+        with self._lock:
+            self._courses_of, self._students_of, self._co_enrolled = courses_of, students_of, co_enrolled
+
+    def apply(self, event) -> None:
+        with self._lock:
+            if event.kind == ENROLLED and event.entity == "student":
+                self._enroll(event.entity_id, event.course_id)
+            elif event.kind == UNENROLLED and event.entity == "student":
+                self._unenroll(event.entity_id, event.course_id)
+            elif event.kind == DELETED and event.entity == "student":
+                for course_id in list(self._courses_of.get(event.entity_id, ())):
+                    self._unenroll(event.entity_id, course_id)
+            elif event.kind == DELETED:
+                for student_id in list(self._students_of.get(event.entity_id, ())):
+                    self._unenroll(student_id, event.entity_id)
+                self._students_of.pop(event.entity_id, None)
+                self._co_enrolled.pop(event.entity_id, None)
+
+    def co_enrollment(self, course_id: int, other_course_id: int) -> int:
+        with self._lock:
+            return self._co_enrolled.get(course_id, Counter())[other_course_id]
+
+    def similar_courses(self, course_id: int, k: int = 5) -> list:
+        """
+        This method returns up to k (course_id, shared students) pairs for the given course.
+        """
+        with self._lock:
+            return self._co_enrolled.get(course_id, Counter()).most_common(k)
+
+    def recommend(self, student_id: int, k: int = 5) -> list:
+        """
+        This method returns up to k (course_id, score) pairs the student is not taking, where the
+        score counts how often each course was taken together with one of the student's courses.
+        """
+        with self._lock:
+            taken = self._courses_of.get(student_id, set())
+            scores = Counter()
+            for course_id in taken:
+                scores.update(self._co_enrolled.get(course_id, ()))
+            for course_id in taken:
+                scores.pop(course_id, None)
+        return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+
+    def _enroll(self, student_id: int, course_id: int) -> None:
+        courses = self._courses_of.setdefault(student_id, set())
+        if course_id in courses:
+            return
+        row = self._co_enrolled.setdefault(course_id, Counter())
+        for other in courses:
+            row[other] += 1
+            self._co_enrolled.setdefault(other, Counter())[course_id] += 1
+        courses.add(course_id)
+        self._students_of.setdefault(course_id, set()).add(student_id)
+
+    def _unenroll(self, student_id: int, course_id: int) -> None:
+        courses = self._courses_of.get(student_id)
+        if not courses or course_id not in courses:
+            return
+        courses.discard(course_id)
+        self._students_of[course_id].discard(student_id)
+        row = self._co_enrolled[course_id]
+        for other in courses:
+            _decrement(row, other)
+            _decrement(self._co_enrolled[other], course_id)
+
+
+def _decrement(counts: Counter, key) -> None:
+    counts[key] -= 1
+    if counts[key] <= 0:
+        del counts[key]
+
+
+def _pair_counts(courses_of: dict) -> dict:
+    co_enrolled = {}
+    for courses in courses_of.values():
+        for course_id in courses:
+            row = co_enrolled.setdefault(course_id, Counter())
+            row.update(other for other in courses if other != course_id)
+    return co_enrolled
+
+
+def _sparse_counts(courses_of: dict) -> dict:
+    course_ids = sorted({course_id for courses in courses_of.values() for course_id in courses})
+    column = {course_id: index for index, course_id in enumerate(course_ids)}
+    rows = numpy.repeat(numpy.arange(len(courses_of)), [len(courses) for courses in courses_of.values()])
+    columns = numpy.fromiter((column[course_id] for courses in courses_of.values() for course_id in courses), dtype=numpy.int64, count=len(rows))
+    incidence = sparse.csr_matrix((numpy.ones(len(rows), dtype=numpy.int32), (rows, columns)), shape=(len(courses_of), len(course_ids)))
+    product = (incidence.T @ incidence).tocoo()
+    off_diagonal = product.row != product.col
+    co_enrolled = {course_id: Counter() for course_id in course_ids}
+    ids = numpy.asarray(course_ids)
+    for course_id, other, count in zip(ids[product.row[off_diagonal]].tolist(), ids[product.col[off_diagonal]].tolist(), product.data[off_diagonal].tolist()):
+        co_enrolled[course_id][other] = count
+    return co_enrolled
@@ -0,0 +1,155 @@
+"""
+Course meeting times and schedule conflict detection.
+
+A meeting is a (start, end) pair of minutes since Monday 00:00, so a week runs from 0 to
+WEEK and every interval is half-open: a class ending at 10:00 does not clash with one
+starting at 10:00. meeting_slot() builds them from readable times:
+
+    meeting_slot("Mon", "09:00", "10:30")  # (540, 630)
+"""
+import heapq
+import random
+
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+WEEK = 7 * 24 * 60
+
+
+def meeting_slot(day: str, start: str, end: str) -> tuple:
+    """
+    This function turns a day name and two HH:MM times into a (start, end) meeting.
+    """
+    offset = DAYS.index(day[:3].lower()) * 24 * 60
+    minutes = [int(hours) * 60 + int(mins) for hours, mins in (start.split(':'), end.split(':'))]
+    return offset + minutes[0], offset + minutes[1]
+
+
+def valid_meetings(meetings) -> bool:
+    return all(0 <= start < end <= WEEK for start, end in meetings)
+
+
+class _Node:
+    __slots__ = ('start', 'end', 'key', 'priority', 'max_end', 'left', 'right')
+
+    def __init__(self, start: int, end: int, key):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.priority = random.random()
+        self.max_end = end
+        self.left = None
+        self.right = None
+
+    def order(self) -> tuple:
+        return (self.start, self.end, self.key)
+
+    def update(self) -> None:
+        self.max_end = max(self.end,
+                           self.left.max_end if self.left else self.end,
+                           self.right.max_end if self.right else self.end)
+
+
+def _rotate_right(node: _Node) -> _Node:
+    child = node.left
+    node.left, child.right = child.right, node
+    node.update()
+    child.update()
+    return child
+
+
+def _rotate_left(node: _Node) -> _Node:
+    child = node.right
+    node.right, child.left = child.left, node
+    node.update()
+    child.update()
+    return child
+
+
+class IntervalTree:
+    """
+    An interval tree kept as a treap ordered by start time, where each node also records the
+    latest end time in its subtree. Insertion and removal take O(log n) expected time and
+    overlapping() takes O(log n + k) for k matches. Each interval carries a key, here the ID
+    of the course it belongs to.
+    """
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, start: int, end: int, key) -> None:
+        self._root = self._insert(self._root, _Node(start, end, key))
+        self._size += 1
+
+    def remove(self, start: int, end: int, key) -> bool:
+        size = self._size
+        self._root = self._delete(self._root, (start, end, key))
+        return self._size < size
+
+    def overlapping(self, start: int, end: int) -> list:
+        """
+        This method returns the keys of the intervals that overlap [start, end).
+        """
+        keys, stack = [], [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end <= start:
+                continue
+            stack.append(node.left)
+            if node.start < end:
+                if start < node.end:
+                    keys.append(node.key)
+                stack.append(node.right)
+        return keys
+
+    def _insert(self, node: _Node, new: _Node) -> _Node:
+        if node is None:
+            return new
+        if new.order() < node.order():
+            node.left = self._insert(node.left, new)
+            if node.left.priority > node.priority:
+                return _rotate_right(node)
+        else:
+            node.right = self._insert(node.right, new)
+            if node.right.priority > node.priority:
+                return _rotate_left(node)
+        node.update()
+        return node
+
+    def _delete(self, node: _Node, order: tuple) -> _Node:
+        if node is None:
+            return None
+        if order < node.order():
+            node.left = self._delete(node.left, order)
+        elif order > node.order():
+            node.right = self._delete(node.right, order)
+        elif node.left is None or node.right is None:
+            self._size -= 1
+            return node.left or node.right
+        elif node.left.priority > node.right.priority:
+            node = _rotate_right(node)
+            node.right = self._delete(node.right, order)
+        else:
+            node = _rotate_left(node)
+            node.left = self._delete(node.left, order)
+        node.update()
+        return node
+
+
+def find_conflicts(meetings) -> list:
+    """
+    This function takes (start, end, person_id, course_id) meetings for any number of people and
+    returns the sorted (person_id, course_id, other_course_id) clashes, found in one sweep over the
+    meetings ordered by start time. Each person keeps a heap of their meetings still in progress.
+    """
+    in_progress, conflicts = {}, set()
+    for start, end, person_id, course_id in sorted(meetings):
+        active = in_progress.setdefault(person_id, [])
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, other in active:
+            if other != course_id:
+                conflicts.add((person_id, min(course_id, other), max(course_id, other)))
+        heapq.heappush(active, (end, course_id))
+    return sorted(conflicts)
@@ -0,0 +1,285 @@
+"""
+Enrollment statistics kept up to date from change events.
+
+EnrollmentStatistics subscribes to a controller EventBus and adjusts its counters on every
+event, so dashboards read students per course, courses per student, instructor load, age
+distributions and the most popular courses without scanning the data. load() seeds it from
+existing data and snapshot() lets a freshly loaded copy be compared with the live one.
+"""
+import threading
+from collections import Counter
+
+from src_ruba.utils.events import CREATED, UPDATED, DELETED, ENROLLED, UNENROLLED
+
+
+class _Bucket:
+    __slots__ = ('count', 'keys', 'higher', 'lower')
+
+    def __init__(self, count: int):
+        self.count = count
+        self.keys = {}
+        self.higher = None
+        self.lower = None
+
+
+class RankedCounter:
+    """
+    Counts per key, grouped into buckets of equal count that are linked from the highest count
+    down. Counts only ever move by one, so a key always moves to a neighbouring bucket: increments
+    and decrements take O(1), top(k) takes O(k) and histogram() is one step per distinct count.
+    """
+    def __init__(self):
+        self._bucket_of = {}
+        self._highest = None
+        self._lowest = None
+
+    def __len__(self):
+        return len(self._bucket_of)
+
+    def __contains__(self, key):
+        return key in self._bucket_of
+
+    def count(self, key) -> int:
+        bucket = self._bucket_of.get(key)
+        return 0 if bucket is None else bucket.count
+
+    def add(self, key) -> None:
+        if key in self._bucket_of:
+            return
+        lowest = self._lowest
+        if lowest is not None and lowest.count == 0:
+            self._place(key, lowest)
+        else:
+            self._place(key, self._link(_Bucket(0), higher=lowest, lower=None))
+
+    def discard(self, key) -> None:
+        bucket = self._bucket_of.pop(key, None)
+        if bucket is not None:
+            self._leave(key, bucket)
+
+    def increment(self, key) -> None:
+        if key not in self._bucket_of:
+            self.add(key)
+        bucket = self._bucket_of[key]
+        target = bucket.higher
+        if target is None or target.count != bucket.count + 1:
+            target = self._link(_Bucket(bucket.count + 1), higher=bucket.higher, lower=bucket)
+        self._leave(key, bucket)
+        self._place(key, target)
+
+    def decrement(self, key) -> None:
+        bucket = self._bucket_of.get(key)
+        if bucket is None or bucket.count == 0:
+            return
+        target = bucket.lower
+        if target is None or target.count != bucket.count - 1:
+            target = self._link(_Bucket(bucket.count - 1), higher=bucket, lower=bucket.lower)
+        self._leave(key, bucket)
+        self._place(key, target)
+
+    def top(self, k: int) -> list:
+        """
+        This method returns up to k (key, count) pairs with the highest counts, highest first.
+        """
+        result, bucket = [], self._highest
+        while bucket is not None and len(result) < k:
+            for key in bucket.keys:
+                result.append((key, bucket.count))
+                if len(result) == k:
+                    break
+            bucket = bucket.lower
+        return result
+
+    def histogram(self) -> dict:
+        histogram, bucket = {}, self._highest
+        while bucket is not None:
+            histogram[bucket.count] = len(bucket.keys)
+            bucket = bucket.lower
+        return histogram
+
+    def items(self) -> dict:
+        return {key: bucket.count for key, bucket in self._bucket_of.items()}
+
+    def _link(self, bucket: _Bucket, higher: _Bucket, lower: _Bucket) -> _Bucket:
+        bucket.higher, bucket.lower = higher, lower
+        if higher is not None:
+            higher.lower = bucket
+        else:
+            self._highest = bucket
+        if lower is not None:
+            lower.higher = bucket
+        else:
+            self._lowest = bucket
+        return bucket
+
+    def _place(self, key, bucket: _Bucket) -> None:
+        bucket.keys[key] = None
+        self._bucket_of[key] = bucket
+
+    def _leave(self, key, bucket: _Bucket) -> None:
+        del bucket.keys[key]
+        if bucket.keys:
+            return
+        if bucket.higher is not None:
+            bucket.higher.lower = bucket.lower
+        else:
+            self._highest = bucket.lower
+        if bucket.lower is not None:
+            bucket.lower.higher = bucket.higher
+        else:
+            self._lowest = bucket.higher
+
+
+class EnrollmentStatistics:
+    """
+    Counters for students per course, courses per student, courses per instructor and the age
+    distribution of students and instructors. Every event is applied in O(1), except deleting a
+    person or a course, which touches each of their enrollments once.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._course_students = RankedCounter()
+        self._loads = {"student": RankedCounter(), "instructor": RankedCounter()}
+        self._ages = {"student": Counter(), "instructor": Counter()}
+        self._age_of = {}
+        self._courses_of = {}
+        self._members_of = {}
+
+    def attach(self, bus, immediate: bool = False) -> int:
+        """
+        This method subscribes the statistics to an EventBus and returns the subscription token.
+        With immediate the counters are updated as each event is published, while the publisher
+        still holds its locks, so concurrent changes reach them in the order they were made.
+        """
+        return bus.subscribe(self.apply, entities=("student", "instructor", "course"), immediate=immediate)
+
+    def load(self, people, course_ids, memberships) -> None:
+        """
+        This method replaces the counters with ones built from existing data: people is an
+        iterable of (entity, person_id, age), course_ids the existing courses and memberships an
+        iterable of (entity, person_id, course_id) enrollments.
+        """
+        with self._lock:
+            self._reset()
+            for entity, person_id, age in people:
+                self._add_person(entity, person_id, age)
+            for course_id in course_ids:
+                self._course_students.add(course_id)
+            for entity, person_id, course_id in memberships:
+                self._enroll(entity, person_id, course_id)
+
+    def apply(self, event) -> None:
+        with self._lock:
+            if event.entity == "course":
+                if event.kind == CREATED:
+                    self._course_students.add(event.entity_id)
+                elif event.kind == DELETED:
+                    for entity, person_id in list(self._members_of.get(event.entity_id, ())):
+                        self._unenroll(entity, person_id, event.entity_id)
+                    self._members_of.pop(event.entity_id, None)
+                    self._course_students.discard(event.entity_id)
+            elif event.kind == ENROLLED:
+                self._enroll(event.entity, event.entity_id, event.course_id)
+            elif event.kind == UNENROLLED:
+                self._unenroll(event.entity, event.entity_id, event.course_id)
+            elif event.kind == CREATED:
+                self._add_person(event.entity, event.entity_id, getattr(event.payload, 'age', None))
+            elif event.kind == UPDATED and event.payload is not None:
+                self._set_age(event.entity, event.entity_id, event.payload.age)
+            elif event.kind == DELETED:
+                for course_id in list(self._courses_of.get((event.entity, event.entity_id), ())):
+                    self._unenroll(event.entity, event.entity_id, course_id)
+                self._courses_of.pop((event.entity, event.entity_id), None)
+                self._loads[event.entity].discard(event.entity_id)
+                self._set_age(event.entity, event.entity_id, None)
+
+    def students_per_course(self, course_id: int) -> int:
+        return self._course_students.count(course_id)
+
+    def courses_per_student(self, student_id: int) -> int:
+        return self._loads["student"].count(student_id)
+
+    def instructor_load(self, instructor_id: int) -> int:
+        return self._loads["instructor"].count(instructor_id)
+
+    def top_courses(self, k: int = 10) -> list:
+        with self._lock:
+            return self._course_students.top(k)
+
+    def top_instructors(self, k: int = 10) -> list:
+        with self._lock:
+            return self._loads["instructor"].top(k)
+
+    def age_histogram(self, entity: str = "student") -> dict:
+        with self._lock:
+            return dict(sorted(self._ages[entity].items()))
+
+    def load_histogram(self, entity: str = "student") -> dict:
+        """
+        This method returns {number of courses: number of people taking or teaching that many}.
+        """
+        with self._lock:
+            return dict(sorted(self._loads[entity].histogram().items()))
+
+    def summary(self, top: int = 10) -> dict:
+        return {
+            "student_ages": self.age_histogram("student"),
+            "instructor_ages": self.age_histogram("instructor"),
+            "courses_per_student": self.load_histogram("student"),
+            "courses_per_instructor": self.load_histogram("instructor"),
+            "top_courses": self.top_courses(top),
+            "top_instructors": self.top_instructors(top),
+        }
+
+    def differences(self, other) -> list:
+        """
+        This method returns the names of the counters that differ from another instance, typically
+        one freshly loaded to verify the incremental updates.
+        """
+        mine, theirs = self.snapshot(), other.snapshot()
+        return [name for name in mine if mine[name] != theirs[name]]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "students_per_course": self._course_students.items(),
+                "courses_per_student": self._loads["student"].items(),
+                "instructor_load": self._loads["instructor"].items(),
+                "student_ages": dict(+self._ages["student"]),
+                "instructor_ages": dict(+self._ages["instructor"]),
+            }
+
+    def _add_person(self, entity: str, person_id: int, age) -> None:
+        self._loads[entity].add(person_id)
+        self._set_age(entity, person_id, age)
+
+    def _set_age(self, entity: str, person_id: int, age) -> None:
+        previous = self._age_of.pop((entity, person_id), None)
+        if previous is not None:
+            self._ages[entity][previous] -= 1
+        if age is not None:
+            self._age_of[(entity, person_id)] = age
+            self._ages[entity][age] += 1
+
+    def _enroll(self, entity: str, person_id: int, course_id: int) -> None:
+        courses = self._courses_of.setdefault((entity, person_id), set())
+        if course_id in courses:
+            return
+        courses.add(course_id)
+        self._members_of.setdefault(course_id, set()).add((entity, person_id))
+        self._loads[entity].increment(person_id)
+        if entity == "student":
+            self._course_students.increment(course_id)
+
+    def _unenroll(self, entity: str, person_id: int, course_id: int) -> None:
+        courses = self._courses_of.get((entity, person_id))
+        if not courses or course_id not in courses:
+            return
+        courses.discard(course_id)
+        self._members_of[course_id].discard((entity, person_id))
+        self._loads[entity].decrement(person_id)
+        if entity == "student":
+            self._course_students.decrement(course_id)
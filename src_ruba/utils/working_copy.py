@@ -0,0 +1,123 @@
+"""
+In-memory working copy of the SQLite database.
+
+WorkingCopy loads the database file into memory and serves every connection from there, so
+reads and writes never wait on the disk. The copy lives in SQLite's memdb VFS under a
+process-unique name, which lets the per-thread connections of a ConnectionPool share it with
+the usual locking; one anchor connection keeps it alive.
+
+Changes reach the file only when the copy is flushed: every max_data_loss seconds by a
+background thread, and on close(). A crash therefore loses at most the writes of the last
+max_data_loss seconds, plus those of a flush that was still running. A flush first snapshots
+the copy into a private in-memory database, which holds writers back only for a memory-to-
+memory copy, and then writes the snapshot to the file with the backup API, durably and in one
+transaction, while the working copy takes writes again. The backup API cannot copy changed
+pages alone, so each flush writes the whole database; flushes are skipped while nothing has
+changed. Other processes must not write to the file while a working copy of it is open, since
+the next flush would overwrite their changes.
+"""
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+from src_ruba.utils.db_pool import ConnectionPool
+
+MEMORY_PRAGMAS = (
+    "PRAGMA cache_size = -16000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+)
+
+_names = itertools.count(1)
+
+
+class WorkingCopy:
+    def __init__(self, path: str, max_data_loss: float = 5.0, pragmas: tuple = MEMORY_PRAGMAS, timeout: float = 5.0):
+        assert max_data_loss > 0, 'The data-loss window must be positive.'
+        self.path = path
+        self.max_data_loss = max_data_loss
+        self.timeout = timeout
+        self.uri = f'file:/school-working-copy-{next(_names)}?vfs=memdb'
+        self._anchor = sqlite3.connect(self.uri, uri=True, timeout=timeout, check_same_thread=False)
+        self._load()
+        self.pool = ConnectionPool(self.uri, pragmas, timeout, uri=True)
+        self._flush_lock = threading.Lock()
+        self._flushed_version = self._data_version()
+        self._closed = threading.Event()
+        self.flushes = 0
+        self.last_flush = time.monotonic()
+        self.last_error = None
+        self._thread = threading.Thread(target=self._run, name='school-flush', daemon=True)
+        self._thread.start()
+
+    def flush(self) -> bool:
+        """
+        This method writes the working copy to the database file if it changed since the last
+        flush and returns whether it did.
+        """
+        with self._flush_lock:
+            version = self._data_version()
+            if version == self._flushed_version:
+                return False
+            snapshot = sqlite3.connect(':memory:')
+            try:
+                self._anchor.backup(snapshot)
+                disk = sqlite3.connect(self.path, timeout=self.timeout)
+                try:
+                    snapshot.backup(disk)
+                finally:
+                    disk.close()
+            finally:
+                snapshot.close()
+            self._flushed_version = version
+            self.flushes += 1
+            self.last_flush = time.monotonic()
+            self.last_error = None
+            return True
+
+    def close(self) -> None:
+        """
+        This method stops the flush timer, flushes the last changes and frees the working copy.
+        If the final flush fails the copy stays open, so nothing is lost, and the error is raised.
+        """
+        self.flush()
+        self._closed.set()
+        if self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join()
+        self.flush()
+        self.pool.close_all()
+        self._anchor.close()
+
+    def _load(self) -> None:
+        # A missing file is left for the first flush to create.
+        if not os.path.exists(self.path):
+            return
+        disk = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            if disk.execute('PRAGMA page_count').fetchone()[0] == 0:
+                return
+            image = bytearray(disk.serialize())
+        finally:
+            disk.close()
+        # The memdb VFS cannot open a database marked for WAL, so the copy is marked as a
+        # rollback-journal database. The file itself keeps its journal mode.
+        image[18:20] = b'\x01\x01'
+        staging = sqlite3.connect(':memory:')
+        try:
+            staging.deserialize(bytes(image))
+            staging.backup(self._anchor)
+        finally:
+            staging.close()
+
+    def _data_version(self) -> int:
+        # Changes whenever another connection commits to the working copy.
+        return self._anchor.execute('PRAGMA data_version').fetchone()[0]
+
+    def _run(self) -> None:
+        while not self._closed.wait(self.max_data_loss):
+            try:
+                self.flush()
+            except sqlite3.Error as error:
+                self.last_error = error